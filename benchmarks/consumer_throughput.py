@@ -0,0 +1,313 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from benchmarks.results import environment_metadata, percentile, write_results
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUBLISHED_AT_HEADER = "x-benchmark-published-at"
+PASSWORD = "benchmark-password"
+
+
+def int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def run_environment(args: argparse.Namespace, batch_size: int, prefetch: int, database_url: str) -> dict:
+    """
+    Returns the settings one benchmark run executes with.
+    """
+    return {
+        "DATABASE_URL": database_url,
+        "MESSAGE_BUS_BACKEND": "memory",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "USER_CACHE_ENABLED": "false",
+        "USER_COMMAND_PARTITIONS": str(args.partitions),
+        "CONSUMER_BATCH_SIZE": str(batch_size),
+        "CONSUMER_BATCH_PREFETCH_COUNT": str(prefetch),
+        "CONSUMER_BATCH_LINGER_MS": str(args.linger_ms),
+    }
+
+
+async def publish_messages(
+    channel, count: int, commands_per_message: int, rate: float, hashed_password: str
+):
+    """
+    Publishes `count` create user messages, all at once or at `rate` per second.
+
+    Commands are grouped per partition the way the publisher groups them, and
+    every message carries its publish time for the lag measurement.
+    """
+    import aio_pika
+
+    from src.users.infraestructure.models import CreateUserCommand
+    from users.infraestructure.messaging import (
+        USER_COMMAND_EXCHANGE,
+        create_user_partition,
+        create_user_routing_key,
+        encode_create_user_commands,
+    )
+
+    exchange = await channel.get_exchange(USER_COMMAND_EXCHANGE)
+    emails = (f"bench-{index}@example.com" for index in itertools.count())
+    started = time.perf_counter()
+    for index in range(count):
+        first = next(emails)
+        partition = create_user_partition(first)
+        group = [first]
+        while len(group) < commands_per_message:
+            email = next(emails)
+            if create_user_partition(email) == partition:
+                group.append(email)
+        commands = [
+            CreateUserCommand(name="Benchmark", email=email, hashed_password=hashed_password)
+            for email in group
+        ]
+        body, content_type, headers = encode_create_user_commands(commands)
+        await exchange.publish(
+            aio_pika.Message(
+                body=body,
+                content_type=content_type,
+                headers={**headers, PUBLISHED_AT_HEADER: time.time()},
+            ),
+            routing_key=create_user_routing_key(partition),
+        )
+        if rate:
+            delay = started + (index + 1) / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+async def run_once(args: argparse.Namespace) -> dict:
+    """
+    Runs the create user consumers over a burst or stream of synthetic messages.
+
+    Must run in a fresh process whose environment holds the run settings, since
+    the settings, the engine and the in-memory broker are created on import.
+    """
+    from sqlalchemy import event, func, select
+
+    from shared.application.security import close_password_hasher, get_password_hash
+    from shared.infrastructure.messaging import (
+        ConsumerRuntime,
+        close_rabbitmq_connection,
+        get_rabbitmq_connection,
+    )
+    from src.shared.infrastructure.database import (
+        AsyncSessionFactory,
+        close_db,
+        engine,
+        init_db,
+    )
+    from src.users.domain.user import User
+    from users.interfaces.consumers.user_consumer import (
+        process_create_user_batch,
+        register_user_consumers,
+    )
+
+    await init_db()
+    commits = 0
+
+    def count_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    event.listen(engine.sync_engine, "commit", count_commit)
+
+    lags: list[float] = []
+    handled = 0
+    done = asyncio.Event()
+
+    async def measured_batch(messages):
+        nonlocal handled
+        failed = await process_create_user_batch(messages)
+        finished = time.time()
+        failed_ids = {id(message) for message in failed}
+        for message in messages:
+            if id(message) not in failed_ids:
+                lags.append(finished - float(message.headers[PUBLISHED_AT_HEADER]))
+        handled += len(messages)
+        if handled >= args.messages:
+            done.set()
+        return failed
+
+    runtime = ConsumerRuntime(stats_interval=0)
+    register_user_consumers(runtime, handler=measured_batch)
+    connection = await get_rabbitmq_connection()
+    channel = await connection.channel()
+    for registration in runtime.handlers.values():
+        exchange = await channel.declare_exchange(
+            registration.exchange_name, **registration.exchange_declaration
+        )
+        queue = await channel.declare_queue(
+            registration.queue_name,
+            durable=registration.durable,
+            arguments=registration.queue_arguments,
+        )
+        await queue.bind(exchange, routing_key=registration.routing_key)
+
+    hashed_password = get_password_hash(PASSWORD)
+    publishing = None
+    if args.rate:
+        await runtime.start()
+        started = time.perf_counter()
+        publishing = asyncio.create_task(
+            publish_messages(channel, args.messages, args.commands_per_message, args.rate, hashed_password)
+        )
+    else:
+        await publish_messages(channel, args.messages, args.commands_per_message, 0, hashed_password)
+        started = time.perf_counter()
+        await runtime.start()
+
+    try:
+        await asyncio.wait_for(done.wait(), args.timeout)
+    finally:
+        elapsed = time.perf_counter() - started
+        if publishing is not None:
+            publishing.cancel()
+        stats = runtime.stats()
+        await runtime.stop()
+
+    async with AsyncSessionFactory() as session:
+        rows = await session.scalar(select(func.count()).select_from(User))
+    await channel.close()
+    await close_rabbitmq_connection()
+    await close_db()
+    close_password_hasher()
+
+    ordered = sorted(lags)
+    failed = sum(handler["failed"] for handler in stats.values())
+    return {
+        "messages": args.messages,
+        "commands": args.messages * args.commands_per_message,
+        "rows_inserted": rows,
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 4),
+        "messages_per_second": round(args.messages / elapsed, 2),
+        "commands_per_second": round(args.messages * args.commands_per_message / elapsed, 2),
+        "lag_p50_ms": round(1000 * percentile(ordered, 0.50), 3),
+        "lag_p95_ms": round(1000 * percentile(ordered, 0.95), 3),
+        "lag_p99_ms": round(1000 * percentile(ordered, 0.99), 3),
+        "commits": commits,
+        "commits_per_message": round(commits / args.messages, 4),
+        "batches": sum(handler.get("batches", 0) for handler in stats.values()),
+    }
+
+
+def run_configuration(
+    args: argparse.Namespace, batch_size: int, prefetch: int, directory: str
+) -> dict:
+    """
+    Runs one batch size and prefetch combination in a fresh interpreter.
+    """
+    database_url = args.database_url or (
+        f"sqlite+aiosqlite:///{os.path.join(directory, f'batch{batch_size}-prefetch{prefetch}.db')}"
+    )
+    output = os.path.join(directory, f"batch{batch_size}-prefetch{prefetch}.json")
+    env = {
+        **os.environ,
+        **run_environment(args, batch_size, prefetch, database_url),
+        "PYTHONPATH": os.pathsep.join([REPOSITORY_ROOT, os.path.join(REPOSITORY_ROOT, "src")]),
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.consumer_throughput",
+        f"--messages={args.messages}",
+        f"--commands-per-message={args.commands_per_message}",
+        f"--rate={args.rate}",
+        f"--timeout={args.timeout}",
+        f"--run-one={output}",
+    ]
+    subprocess.run(command, cwd=REPOSITORY_ROOT, env=env, check=True)
+    with open(output, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """
+    Runs every batch size and prefetch combination and collects the results.
+
+    Each combination gets a fresh process and, unless `--database-url` is given,
+    a fresh SQLite database. Results are keyed `batch<size>:prefetch<count>`,
+    where a prefetch of 0 means the default of twice the batch size.
+    """
+    scenarios = {}
+    with tempfile.TemporaryDirectory(prefix="consumer-benchmark-") as directory:
+        for batch_size, prefetch in itertools.product(args.batch_size, args.prefetch):
+            scenarios[f"batch{batch_size}:prefetch{prefetch}"] = run_configuration(
+                args, batch_size, prefetch, directory
+            )
+    return {
+        "benchmark": "consumer",
+        "meta": environment_metadata(
+            messages=args.messages,
+            commands_per_message=args.commands_per_message,
+            rate=args.rate,
+            partitions=args.partitions,
+            batch_size=args.batch_size,
+            prefetch=args.prefetch,
+            linger_ms=args.linger_ms,
+            database=(args.database_url or "sqlite+aiosqlite").split("://", 1)[0],
+        ),
+        "scenarios": scenarios,
+    }
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line of the consumer benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure create user consumer throughput, lag and commits per message."
+    )
+    parser.add_argument("--messages", type=int, default=5000, help="Messages per run.")
+    parser.add_argument("--commands-per-message", type=int, default=1)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0,
+        help="Messages published per second while consuming. 0 preloads them all first.",
+    )
+    parser.add_argument("--batch-size", type=int_list, default=[200], help="Comma separated.")
+    parser.add_argument(
+        "--prefetch",
+        type=int_list,
+        default=[0],
+        help="Comma separated. 0 prefetches twice the batch size.",
+    )
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--linger-ms", type=int, default=50)
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Database to run against. Defaults to a throwaway SQLite file per run.",
+    )
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a run fails.")
+    parser.add_argument("--output", default=None, help="JSON results file. Defaults to stdout.")
+    parser.add_argument("--run-one", default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None):
+    """
+    Command line entry point of the consumer benchmark.
+    """
+    args = parse_args(argv)
+    if args.run_one:
+        result = asyncio.run(run_once(args))
+        with open(args.run_one, "w", encoding="utf-8") as file:
+            json.dump(result, file)
+        return
+    write_results(run_benchmark(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from benchmarks.results import environment_metadata, run_closed_loop, write_results
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "benchmark-password"
+SCENARIOS = ("get_user", "token", "register")
+MODES = ("inprocess", "uvicorn")
+REQUEST_TIMEOUT_SECONDS = 60
+
+
+def benchmark_environment(database_url: str) -> dict[str, str]:
+    """
+    Returns the settings the application runs with during a benchmark.
+
+    The message bus is the in-memory broker, so no RabbitMQ is needed, and the
+    log level is raised to keep log output out of the measurements.
+    """
+    return {
+        "DATABASE_URL": database_url,
+        "MESSAGE_BUS_BACKEND": "memory",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "ENVIRONMENT": "benchmark",
+    }
+
+
+class UserFixtures:
+    """
+    Users registered before the measured scenarios run.
+    """
+
+    def __init__(self, run_id: str):
+        """
+        Initializes the UserFixtures for a run.
+        """
+        self.run_id = run_id
+        self.user_ids: list[int] = []
+        self.emails: list[str] = []
+
+    def email(self, prefix: str, index: int) -> str:
+        """
+        Returns an email address unique to this run.
+        """
+        return f"{prefix}-{self.run_id}-{index}@example.com"
+
+    async def seed(self, client: httpx.AsyncClient, count: int, concurrency: int):
+        """
+        Registers `count` users and remembers their IDs and emails.
+        """
+
+        async def register(index: int) -> bool:
+            email = self.email("seed", index)
+            response = await client.post(
+                "/users/register",
+                json={"name": f"Seed {index}", "email": email, "password": PASSWORD},
+            )
+            user = registered_user(response)
+            if user is None:
+                return False
+            self.user_ids.append(user["user_id"])
+            self.emails.append(email)
+            return True
+
+        await run_closed_loop(register, count, concurrency)
+        if not self.user_ids:
+            raise RuntimeError("Could not register any benchmark user.")
+
+
+def registered_user(response: httpx.Response) -> Optional[dict]:
+    """
+    Returns the user from a registration response, or `None` if it failed.
+    """
+    if response.status_code != 201:
+        return None
+    payload = response.json()
+    if payload.get("state") != 1:
+        return None
+    return payload["data"]["data"]
+
+
+def build_scenario(
+    name: str, client: httpx.AsyncClient, fixtures: UserFixtures
+) -> Callable[[int], Awaitable[bool]]:
+    """
+    Returns the operation a scenario runs once per request.
+    """
+
+    async def get_user(index: int) -> bool:
+        user_id = fixtures.user_ids[index % len(fixtures.user_ids)]
+        response = await client.get(f"/users/{user_id}")
+        return response.status_code == 200
+
+    async def token(index: int) -> bool:
+        email = fixtures.emails[index % len(fixtures.emails)]
+        response = await client.post(
+            "/auth/token", data={"username": email, "password": PASSWORD}
+        )
+        return response.status_code == 200
+
+    async def register(index: int) -> bool:
+        response = await client.post(
+            "/users/register",
+            json={
+                "name": f"User {index}",
+                "email": fixtures.email(f"register-{uuid.uuid4().hex[:6]}", index),
+                "password": PASSWORD,
+            },
+        )
+        return registered_user(response) is not None
+
+    return {"get_user": get_user, "token": token, "register": register}[name]
+
+
+async def run_scenarios(
+    client: httpx.AsyncClient, mode: str, args: argparse.Namespace
+) -> dict:
+    """
+    Seeds users, then runs every scenario at every concurrency level.
+
+    Results are keyed `<mode>:<scenario>:c<concurrency>`.
+    """
+    fixtures = UserFixtures(uuid.uuid4().hex[:8])
+    await fixtures.seed(client, args.users, max(args.concurrency))
+    results = {}
+    for name in args.scenarios:
+        for concurrency in args.concurrency:
+            operation = build_scenario(name, client, fixtures)
+            if args.warmup:
+                await run_closed_loop(operation, args.warmup, concurrency)
+            results[f"{mode}:{name}:c{concurrency}"] = await run_closed_loop(
+                operation, args.requests, concurrency
+            )
+    return results
+
+
+async def run_in_process(args: argparse.Namespace, database_url: str) -> dict:
+    """
+    Drives the application in this process through an ASGI transport.
+
+    Measures the application and its dependencies without any network or
+    server overhead. Startup and shutdown handlers run as under a server.
+    """
+    os.environ.update(benchmark_environment(database_url))
+    from src.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark", timeout=REQUEST_TIMEOUT_SECONDS
+        ) as client:
+            return await run_scenarios(client, "inprocess", args)
+
+
+def free_port() -> int:
+    """
+    Returns a TCP port that is free on the loopback interface.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float):
+    """
+    Waits for the server to answer on `/`, failing if it exits or times out.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}.")
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn did not become ready in time.")
+
+
+async def run_with_uvicorn(args: argparse.Namespace, database_url: str) -> dict:
+    """
+    Drives a single uvicorn worker serving the application over TCP.
+    """
+    port = free_port()
+    env = {
+        **os.environ,
+        **benchmark_environment(database_url),
+        "PYTHONPATH": os.pathsep.join([REPOSITORY_ROOT, os.path.join(REPOSITORY_ROOT, "src")]),
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            "--host=127.0.0.1",
+            f"--port={port}",
+            "--workers=1",
+            "--log-level=warning",
+            "--no-access-log",
+        ],
+        cwd=REPOSITORY_ROOT,
+        env=env,
+    )
+    connections = max(args.concurrency)
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=REQUEST_TIMEOUT_SECONDS
+        ) as client:
+            await wait_until_ready(client, server, timeout=30)
+            return await run_scenarios(client, "uvicorn", args)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    """
+    Runs the selected modes and returns the results with their metadata.
+
+    Each mode gets its own SQLite database unless `--database-url` points to a
+    database to use instead, such as a local Postgres.
+    """
+    scenarios = {}
+    with tempfile.TemporaryDirectory(prefix="http-benchmark-") as directory:
+        for mode in args.modes:
+            database_url = args.database_url or (
+                f"sqlite+aiosqlite:///{os.path.join(directory, mode + '.db')}"
+            )
+            runner = run_in_process if mode == "inprocess" else run_with_uvicorn
+            scenarios.update(await runner(args, database_url))
+    return {
+        "benchmark": "http",
+        "meta": environment_metadata(
+            modes=args.modes,
+            scenarios=args.scenarios,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            warmup=args.warmup,
+            users=args.users,
+            database=(args.database_url or "sqlite+aiosqlite").split("://", 1)[0],
+        ),
+        "scenarios": scenarios,
+    }
+
+
+def comma_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line of the HTTP benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Load test the auth and user endpoints and report latency percentiles."
+    )
+    parser.add_argument(
+        "--modes",
+        type=comma_list,
+        default=list(MODES),
+        help="Comma separated: inprocess (ASGI transport) and/or uvicorn (one worker).",
+    )
+    parser.add_argument(
+        "--scenarios",
+        type=comma_list,
+        default=list(SCENARIOS),
+        help=f"Comma separated scenarios out of {', '.join(SCENARIOS)}.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(item) for item in comma_list(value)],
+        default=[1, 16],
+        help="Comma separated numbers of requests kept in flight.",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario run.")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests first.")
+    parser.add_argument("--users", type=int, default=20, help="Users registered up front.")
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Database to run against. Defaults to a throwaway SQLite file per mode.",
+    )
+    parser.add_argument("--output", default=None, help="JSON results file. Defaults to stdout.")
+    args = parser.parse_args(argv)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"Unknown scenario '{name}'.")
+    for mode in args.modes:
+        if mode not in MODES:
+            parser.error(f"Unknown mode '{mode}'.")
+    return args
+
+
+def main(argv: Optional[list[str]] = None):
+    """
+    Command line entry point of the HTTP benchmark.
+    """
+    args = parse_args(argv)
+    write_results(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
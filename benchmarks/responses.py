@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import time
+from typing import Any, Callable, Optional
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from benchmarks.results import environment_metadata, write_results
+from src.shared.domain.helpers import exit_json
+from src.shared.infrastructure.responses import EnvelopeResponse
+from src.users.infraestructure.models import UserFindModel
+
+PAYLOADS = ("user", "users")
+
+
+class LegacyEnvelope(BaseModel):
+    """
+    The response model every envelope was validated into before the fast path.
+    """
+
+    state: int
+    msg: str
+    data: Optional[Any] = None
+
+
+def legacy_exit_json(state: int, data: dict) -> dict[str, Any]:
+    """
+    The envelope as it was built before the fast path: validated into a model, then dumped.
+
+    Dumps with `model_dump`, which `.dict()` wraps, so the deprecation warning
+    does not count against the legacy pipeline.
+    """
+    return LegacyEnvelope(state=state, msg="success" if state == 1 else "error", data=data).model_dump()
+
+
+def build_payload(name: str, size: int) -> dict:
+    """
+    Returns the data of a single user or of a batch lookup of `size` users.
+    """
+    users = [
+        UserFindModel(user_id=index, name=f"User {index}", email=f"user{index}@example.com")
+        for index in range(size)
+    ]
+    if name == "user":
+        return {"user": users[0]}
+    return {"users": users, "missing": []}
+
+
+def build_app(envelope: Callable[[int, dict], Any], payload: dict, fast: bool) -> FastAPI:
+    """
+    Returns an application with one route answering the payload as the user routes do.
+    """
+    app = FastAPI()
+
+    if fast:
+
+        @app.get("/payload", response_model=dict)
+        async def fast_route():
+            return EnvelopeResponse(envelope(1, payload))
+
+    else:
+
+        @app.get("/payload", response_model=dict)
+        async def legacy_route():
+            return envelope(1, payload)
+
+    return app
+
+
+async def call(app: FastAPI) -> bytes:
+    """
+    Sends one GET /payload straight to the ASGI application and returns the body.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/payload",
+        "raw_path": b"/payload",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "server": ("benchmark", 80),
+    }
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+
+def cpu_per_call(operation: Callable[[], Any], iterations: int) -> float:
+    """
+    Returns the process CPU time one call of the operation takes, in microseconds.
+    """
+    started = time.process_time()
+    for _ in range(iterations):
+        operation()
+    return 1_000_000 * (time.process_time() - started) / iterations
+
+
+async def async_cpu_per_call(operation: Callable[[], Any], iterations: int) -> float:
+    """
+    Returns the process CPU time one awaited call takes, in microseconds.
+    """
+    started = time.process_time()
+    for _ in range(iterations):
+        await operation()
+    return 1_000_000 * (time.process_time() - started) / iterations
+
+
+def legacy_serialize(payload: dict) -> bytes:
+    """
+    Legacy envelope plus the encoding FastAPI applied to it for `response_model=dict`.
+    """
+    return JSONResponse(jsonable_encoder(legacy_exit_json(1, payload))).body
+
+
+def fast_serialize(payload: dict) -> bytes:
+    """
+    Fast envelope encoded by `EnvelopeResponse`.
+    """
+    return EnvelopeResponse(exit_json(1, payload)).body
+
+
+async def measure(name: str, size: int, iterations: int) -> dict:
+    """
+    Measures one payload through both pipelines, serialization alone and per request.
+    """
+    payload = build_payload(name, size)
+    legacy_app = build_app(legacy_exit_json, payload, fast=False)
+    fast_app = build_app(exit_json, payload, fast=True)
+    for app in (legacy_app, fast_app):
+        await call(app)
+
+    serialize_legacy = cpu_per_call(lambda: legacy_serialize(payload), iterations)
+    serialize_fast = cpu_per_call(lambda: fast_serialize(payload), iterations)
+    request_legacy = await async_cpu_per_call(lambda: call(legacy_app), iterations)
+    request_fast = await async_cpu_per_call(lambda: call(fast_app), iterations)
+    return {
+        "iterations": iterations,
+        "identical_json": await call(legacy_app) == await call(fast_app),
+        "envelope_legacy_us": round(serialize_legacy, 3),
+        "envelope_fast_us": round(serialize_fast, 3),
+        "request_legacy_us": round(request_legacy, 3),
+        "request_fast_us": round(request_fast, 3),
+        "request_cpu_saved_percent": round(100 * (request_legacy - request_fast) / request_legacy, 1),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    """
+    Measures every payload and size and collects the results.
+
+    Results are keyed `<payload>:n<size>`; a single user payload is only
+    measured once whatever the sizes.
+    """
+    scenarios = {}
+    for name in args.payloads:
+        for size in [1] if name == "user" else args.sizes:
+            scenarios[f"{name}:n{size}"] = await measure(name, size, args.iterations)
+    return {
+        "benchmark": "responses",
+        "meta": environment_metadata(
+            payloads=args.payloads, sizes=args.sizes, iterations=args.iterations
+        ),
+        "scenarios": scenarios,
+    }
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line of the response benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare the CPU cost of the legacy and fast JSON response pipelines."
+    )
+    parser.add_argument(
+        "--payloads",
+        type=lambda value: [item.strip() for item in value.split(",") if item.strip()],
+        default=list(PAYLOADS),
+        help=f"Comma separated payloads out of {', '.join(PAYLOADS)}.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(item) for item in value.split(",") if item.strip()],
+        default=[10, 100],
+        help="Comma separated numbers of users in the batch payload.",
+    )
+    parser.add_argument("--iterations", type=int, default=5000, help="Calls per measurement.")
+    parser.add_argument("--output", default=None, help="JSON results file. Defaults to stdout.")
+    args = parser.parse_args(argv)
+    for name in args.payloads:
+        if name not in PAYLOADS:
+            parser.error(f"Unknown payload '{name}'.")
+    return args
+
+
+def main(argv: Optional[list[str]] = None):
+    """
+    Command line entry point of the response benchmark.
+    """
+    args = parse_args(argv)
+    write_results(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
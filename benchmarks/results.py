@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+SCHEMA_VERSION = 1
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of values sorted in ascending order.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """
+    Summarizes the latencies, in seconds, of one scenario run.
+
+    Throughput counts successful operations only; latencies are reported in
+    milliseconds.
+    """
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered) + errors,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_per_second": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(1000 * percentile(ordered, 0.50), 3),
+        "p95_ms": round(1000 * percentile(ordered, 0.95), 3),
+        "p99_ms": round(1000 * percentile(ordered, 0.99), 3),
+        "max_ms": round(1000 * ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+async def run_closed_loop(
+    operation: Callable[[int], Awaitable[bool]], total: int, concurrency: int
+) -> dict:
+    """
+    Runs `total` operations with `concurrency` of them in flight at all times.
+
+    `operation` receives the index of the operation and returns whether it
+    succeeded; exceptions count as errors. Returns the summary of the run.
+    """
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                succeeded = await operation(index)
+            except Exception:
+                succeeded = False
+            if succeeded:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def git_commit() -> Optional[str]:
+    """
+    Returns the commit checked out in the working directory, if any.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_metadata(**parameters) -> dict:
+    """
+    Describes where and how a benchmark ran, so results can be compared.
+    """
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "parameters": parameters,
+    }
+
+
+def write_results(results: dict, output: Optional[str]):
+    """
+    Writes results as JSON to `output`, or to stdout when it is not given.
+    """
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if output:
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+COMPARED_METRICS = ("throughput_per_second", "p50_ms", "p95_ms", "p99_ms")
+
+
+def compare_results(baseline: dict, candidate: dict) -> list[dict]:
+    """
+    Compares the scenarios two result files have in common.
+
+    Returns one row per scenario and metric with both values and the relative
+    change in percent. Higher is better for throughput, lower for latencies.
+    """
+    rows = []
+    for scenario, before in baseline.get("scenarios", {}).items():
+        after = candidate.get("scenarios", {}).get(scenario)
+        if after is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            rows.append(
+                {
+                    "scenario": scenario,
+                    "metric": metric,
+                    "baseline": old,
+                    "candidate": new,
+                    "change_percent": round(100 * (new - old) / old, 1) if old else None,
+                }
+            )
+    return rows
+
+
+def main(argv: Optional[list[str]] = None):
+    """
+    Prints the differences between two benchmark result files.
+    """
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline", help="Results of the reference commit.")
+    parser.add_argument("candidate", help="Results of the commit under test.")
+    args = parser.parse_args(argv)
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(args.candidate, encoding="utf-8") as file:
+        candidate = json.load(file)
+
+    print(f"{'scenario':<28} {'metric':<22} {'baseline':>12} {'candidate':>12} {'change':>8}")
+    for row in compare_results(baseline, candidate):
+        change = "n/a" if row["change_percent"] is None else f"{row['change_percent']:+.1f}%"
+        print(
+            f"{row['scenario']:<28} {row['metric']:<22} "
+            f"{row['baseline']:>12} {row['candidate']:>12} {change:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,8 +1,13 @@
+import logging
+
 from auth.infrastructure.models import AuthenticateUserRequest
+from auth.infrastructure.token_versions import token_versions
 from shared.application.security import create_access_token
 from shared.domain.base_errores import AuthorizationError
 from users.infraestructure.repositories import UserRepository
 
+logger = logging.getLogger(__name__)
+
 
 class AuthenticateUserUseCase:
     """
@@ -22,18 +27,25 @@ class AuthenticateUserUseCase:
         Authenticates the user and returns an access token upon success.
 
         This method validates the user's credentials by checking the email and password.
-        If the credentials are valid, it generates a JWT access token.
+        If the credentials are valid, it generates a JWT access token carrying the
+        user's token version, which is recorded for stateless authentication.
         """
-        print(f"Authenticating user: {request.username}")
+        logger.debug("Authenticating user: %s", request.username)
 
         user = await self.user_repository.get_user_by_email(request.username)
         if not user:
             raise AuthorizationError("Incorrect email or password.")
 
-        if not user.verify_password(request.password):
+        if not await user.verify_password_async(request.password):
             raise AuthorizationError("Incorrect email or password.")
 
-        access_token_data = {"sub": str(user.user_id), "email": user.email}
+        version = user.token_version or 0
+        token_versions.observe(user.user_id, version)
+        access_token_data = {
+            "sub": str(user.user_id),
+            "email": user.email,
+            "ver": version,
+        }
         access_token = create_access_token(data=access_token_data)
 
         return {"access_token": access_token, "token_type": "bearer"}
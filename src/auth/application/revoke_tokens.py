@@ -0,0 +1,39 @@
+import logging
+
+from auth.infrastructure.token_versions import broadcast_token_version, token_versions
+from shared.domain.base_errores import EntityNotFoundError
+from src.users.domain.repositories import UserRepositoryInterface
+
+logger = logging.getLogger(__name__)
+
+
+class RevokeTokensUseCase:
+    """
+    Use case for revoking every access token issued to a user.
+
+    This class bumps the user's token version, so tokens minted before are
+    rejected, records the new version for stateless authentication and
+    broadcasts it to the other workers.
+    """
+
+    def __init__(self, user_repository: UserRepositoryInterface):
+        """
+        Initializes the RevokeTokensUseCase with a user repository.
+        """
+        self.user_repository = user_repository
+
+    async def execute(self, user_id: int) -> int:
+        """
+        Revokes the tokens of a user and returns the new token version.
+        """
+        user = await self.user_repository.get_user_by_id(user_id)
+        if user is None:
+            raise EntityNotFoundError(f"User with ID {user_id} not found.")
+
+        user.revoke_tokens()
+        saved_user = await self.user_repository.save_user(user)
+        version = saved_user.token_version
+        token_versions.observe(saved_user.user_id, version)
+        await broadcast_token_version(saved_user.user_id, version)
+        logger.info("Revoked tokens of user %s up to version %s.", saved_user.user_id, version)
+        return version
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class Principal(BaseModel):
+    """
+    Represents the authenticated caller as asserted by a signed access token.
+
+    This lightweight model carries only the claims minted by
+    `AuthenticateUserUseCase`, so it can be built without a database lookup.
+    The `token_version` is compared against the user's current version to
+    reject revoked tokens.
+    """
+
+    user_id: int
+    email: str
+    token_version: int = 0
@@ -0,0 +1,90 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from shared.configuration.config import settings
+from shared.infrastructure.messaging import get_channel_pool
+from users.infraestructure.messaging import TokenVersionPublisher
+
+logger = logging.getLogger(__name__)
+
+
+class TokenVersionRegistry:
+    """
+    In-process view of the minimum accepted token version per user.
+
+    Stateless authentication does not load the user on every request, so this
+    registry remembers the latest `token_version` observed for each user.
+    Tokens minted with an older version are rejected. Versions are observed at
+    login, on stateful requests, when tokens are revoked on this or, through
+    `broadcast_token_version`, any other worker, and when a stateless request
+    finds no entry and loads the user. Entries expire after `ttl_seconds`, so
+    a missed broadcast is corrected by the next load. The registry is bounded
+    and forgets the least recently touched users first.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 60):
+        """
+        Initializes the TokenVersionRegistry with a size bound and entry lifetime.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._versions: OrderedDict[int, tuple[int, float]] = OrderedDict()
+
+    def current(self, user_id: int) -> Optional[int]:
+        """
+        Returns the latest known token version for a user, unless it has expired.
+        """
+        entry = self._versions.get(user_id)
+        if entry is None:
+            return None
+        version, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._versions[user_id]
+            return None
+        return version
+
+    def observe(self, user_id: int, version: int):
+        """
+        Records a token version, keeping the highest one seen for the user.
+
+        Every observation comes from the database or a revocation, so it also
+        renews the entry's lifetime.
+        """
+        known = self.current(user_id)
+        if known is not None and known > version:
+            version = known
+        self._versions[user_id] = (version, time.monotonic() + self.ttl_seconds)
+        self._versions.move_to_end(user_id)
+        while len(self._versions) > self.max_size:
+            self._versions.popitem(last=False)
+
+    def is_revoked(self, user_id: int, version: int) -> bool:
+        """
+        Checks whether a token version is older than the latest known one.
+        """
+        known = self.current(user_id)
+        return known is not None and version < known
+
+
+token_versions = TokenVersionRegistry(
+    max_size=settings.TOKEN_VERSION_CACHE_SIZE, ttl_seconds=settings.TOKEN_VERSION_TTL_SECONDS
+)
+"""
+Global registry of token versions used by the authentication dependencies.
+"""
+
+
+async def broadcast_token_version(user_id: int, version: int):
+    """
+    Publishes a token version bump so every worker rejects the revoked tokens.
+
+    Broadcast failures are logged and swallowed; other workers then learn the
+    new version once their registry entry for the user expires and is reloaded.
+    """
+    try:
+        async with get_channel_pool().acquire() as channel:
+            await TokenVersionPublisher(channel).publish_token_version(user_id, version)
+    except Exception as e:
+        logger.warning("Failed to broadcast token version of user %s: %s", user_id, e)
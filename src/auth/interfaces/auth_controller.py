@@ -1,3 +1,4 @@
+import logging
 from typing import Annotated
 
 from fastapi import APIRouter, HTTPException, status
@@ -5,8 +6,14 @@ from fastapi.params import Depends
 from fastapi.security import OAuth2PasswordRequestForm
 
 from auth.infrastructure.models import AuthenticateUserRequest, TokenModel
-from auth.interfaces.dependencies import AuthenticateUser
-from shared.domain.base_errores import AuthorizationError, EntityNotFoundError
+from auth.interfaces.dependencies import AuthenticateUser, Current_user, RevokeTokens
+from shared.domain.base_errores import (
+    AuthorizationError,
+    CapacityExceededError,
+    EntityNotFoundError,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -35,15 +42,49 @@ async def login_for_access_token(
         token = await authenticate_use_case.execute(auth_request)
         return TokenModel(**token)
     except (AuthorizationError, EntityNotFoundError) as e:
-        print(f"Unauthorized, wrong credentials {e}")
+        logger.info("Unauthorized, wrong credentials %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except CapacityExceededError as e:
+        logger.warning("Authentication rejected, hashing pool saturated: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The service is busy, please retry.",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
-        print(f"Unexpected error during authentication: {e}")
+        logger.exception("Unexpected error during authentication: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An internal error occurred during authentication.",
         )
+
+
+@router.post(
+    "/revoke",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke every access token of the current user",
+    description=(
+        "Invalidates all tokens issued to the caller so far, including the one "
+        "used for this request, on every worker and in stateless mode."
+    ),
+)
+async def revoke_tokens(current_user: Current_user, revoke_use_case: RevokeTokens):
+    """
+    Revokes every access token issued to the authenticated user.
+
+    The caller is loaded from the database, so an already revoked token cannot
+    revoke again.
+    """
+    try:
+        await revoke_use_case.execute(current_user.user_id)
+    except EntityNotFoundError as e:
+        logger.info("Token revocation for a missing user: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -1,16 +1,22 @@
-from http.client import HTTPException
+import logging
 from typing import Annotated
 
-from fastapi import status
+from fastapi import HTTPException, status
 from fastapi.params import Depends
 from fastapi.security import OAuth2PasswordBearer
 
 from auth.application.authenticate_user import AuthenticateUserUseCase
+from auth.application.revoke_tokens import RevokeTokensUseCase
+from auth.domain.principal import Principal
+from auth.infrastructure.token_versions import token_versions
 from shared.application.security import decode_access_token
+from shared.configuration.config import settings
 from users.infraestructure.models import UserModel
 from users.infraestructure.repositories import UserRepository
 from users.interfaces.dependencies import get_user_repository
 
+logger = logging.getLogger(__name__)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 
@@ -28,45 +34,133 @@ AuthenticateUser = Annotated[
 ]
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
+def get_revoke_tokens_use_case(
     user_repo: Annotated[UserRepository, Depends(get_user_repository)],
-) -> UserModel:
+) -> RevokeTokensUseCase:
     """
-    Dependency to get the current authenticated user based on the token.
+    Dependency injection for the RevokeTokensUseCase.
+    """
+    return RevokeTokensUseCase(user_repo)
 
-    This function validates the provided JWT token, decodes it to extract user information,
-    and retrieves the corresponding user from the database.
+
+RevokeTokens = Annotated[RevokeTokensUseCase, Depends(get_revoke_tokens_use_case)]
+
+
+def credentials_exception() -> HTTPException:
+    """
+    Builds the 401 error raised for any invalid or revoked token.
     """
-    credentials_exception = HTTPException(
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def get_token_principal(token: str) -> Principal:
+    """
+    Decodes a bearer token into a `Principal` without touching the database.
+
+    This function validates the token signature and expiry, extracts the user ID,
+    email and token version claims, and rejects tokens whose version is older
+    than the latest version known to this process.
+    """
     token_data = decode_access_token(token)
     if token_data is None:
-        print("Token decode failed or token invalid.")
-        raise credentials_exception
+        logger.info("Token decode failed or token invalid.")
+        raise credentials_exception()
 
     user_id = token_data.get("sub")
     if user_id is None:
-        print("Token does not contain user ID.")
-        raise credentials_exception
+        logger.info("Token does not contain user ID.")
+        raise credentials_exception()
     try:
         user_id = int(user_id)
     except ValueError:
-        print(f"Invalid user ID format in token's 'sub' claim: {user_id}")
-        raise credentials_exception
+        logger.info("Invalid user ID format in token's 'sub' claim: %s", user_id)
+        raise credentials_exception()
+
+    principal = Principal(
+        user_id=user_id,
+        email=token_data.get("email", ""),
+        token_version=token_data.get("ver", 0),
+    )
+    if token_versions.is_revoked(principal.user_id, principal.token_version):
+        logger.info("Token version %s revoked for user %s.", principal.token_version, user_id)
+        raise credentials_exception()
+    return principal
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    user_repo: Annotated[UserRepository, Depends(get_user_repository)],
+) -> UserModel:
+    """
+    Dependency to get the current authenticated user based on the token.
+
+    This function validates the provided JWT token, decodes it to extract user information,
+    and retrieves the corresponding user from the database. Tokens minted before the
+    user's current token version are rejected.
+    """
+    principal = get_token_principal(token)
 
-    user = await user_repo.get_user_by_id(user_id)
+    user = await user_repo.get_user_by_id(principal.user_id)
     if user is None:
-        print(f"User with ID {user_id} not found.")
-        raise credentials_exception
+        logger.info("User with ID %s not found.", principal.user_id)
+        raise credentials_exception()
+
+    current_version = user.token_version or 0
+    token_versions.observe(user.user_id, current_version)
+    if principal.token_version != current_version:
+        logger.info("Stale token version for user ID: %s.", user.user_id)
+        raise credentials_exception()
 
-    print(f"Successfully authenticated user ID: {user.user_id} from token.")
+    logger.debug("Successfully authenticated user ID: %s from token.", user.user_id)
     return user
 
 
+async def load_token_version(principal: Principal, user_repo: UserRepository):
+    """
+    Loads the user's token version into the registry and rejects the principal
+    if its token is revoked or the user no longer exists.
+    """
+    user = await user_repo.get_user_by_id(principal.user_id)
+    if user is None:
+        logger.info("User with ID %s not found.", principal.user_id)
+        raise credentials_exception()
+
+    token_versions.observe(user.user_id, user.token_version or 0)
+    if token_versions.is_revoked(principal.user_id, principal.token_version):
+        logger.info(
+            "Token version %s revoked for user %s.", principal.token_version, principal.user_id
+        )
+        raise credentials_exception()
+
+
+async def get_current_principal(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    user_repo: Annotated[UserRepository, Depends(get_user_repository)],
+) -> Principal:
+    """
+    Dependency to get the authenticated caller as a lightweight `Principal`.
+
+    When `AUTH_STATELESS` is enabled the signed claims are trusted, and the user
+    is only loaded when this process has no current token version for them, so
+    a restart, an eviction or a lost broadcast never lets a revoked token
+    through. Otherwise the user is loaded through `get_current_user` first.
+    """
+    if settings.AUTH_STATELESS:
+        principal = get_token_principal(token)
+        if token_versions.current(principal.user_id) is None:
+            await load_token_version(principal, user_repo)
+        return principal
+
+    user = await get_current_user(token, user_repo)
+    return Principal(
+        user_id=user.user_id, email=user.email, token_version=user.token_version or 0
+    )
+
+
 TokenDep = Annotated[str, Depends(oauth2_scheme)]
 """
 Annotated type for injecting the OAuth2 token dependency.
@@ -82,3 +176,12 @@ Annotated type for injecting the current authenticated user dependency.
 This annotation is used in FastAPI endpoints to automatically resolve and inject
 the authenticated user model instance.
 """
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+"""
+Annotated type for injecting the authenticated caller as a `Principal`.
+
+This annotation is the default for endpoints that only need the user's ID and
+email. It avoids most database lookups when stateless authentication is enabled;
+use `Current_user` when the fresh user record is required.
+"""
@@ -1,12 +1,38 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
+from shared.application.security import close_password_hasher
 from shared.configuration.config import settings
-from shared.infrastructure.messaging import close_rabbitmq_connection
+from shared.infrastructure.logger import configure_logging, shutdown_logging
+from shared.infrastructure.messaging import (
+    close_buffered_publisher,
+    close_channel_pool,
+    close_rabbitmq_connection,
+)
+from shared.infrastructure.metrics import (
+    CONTENT_TYPE,
+    MetricsMiddleware,
+    metrics_registry,
+)
+from shared.infrastructure.outbox import start_outbox_relay, stop_outbox_relay
 from src.shared.infrastructure.database import close_db, init_db
 from src.shared.infrastructure.routes_manager import RoutesManager
+from users.infraestructure.email_filter import rebuild_user_email_filter
+from users.infraestructure.messaging import USER_EXCHANGE_DECLARATIONS
+from users.infraestructure.search import rebuild_user_search_index
+from users.interfaces.consumers.token_version_consumer import consume_token_versions
+from users.interfaces.consumers.user_cache_consumer import (
+    consume_user_cache_invalidations,
+)
+from users.interfaces.consumers.user_consumer import build_user_consumer_runtime
+from users.interfaces.consumers.user_search_consumer import consume_user_events
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="User Service API",
@@ -26,6 +52,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms, exposed with the other metrics on /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+background_tasks: set[asyncio.Task] = set()
+
+# In-process consumers, only started with the in-memory message bus
+consumer_runtime = (
+    build_user_consumer_runtime() if settings.MESSAGE_BUS_BACKEND == "memory" else None
+)
+
+
+async def start_user_cache_listener():
+    """
+    Subscribes to user cache invalidations without failing startup.
+    """
+    try:
+        await consume_user_cache_invalidations()
+    except Exception as e:
+        logger.warning("User cache invalidation listener unavailable: %s", e)
+
+
+async def start_token_version_listener():
+    """
+    Subscribes to token version bumps without failing startup.
+    """
+    try:
+        await consume_token_versions()
+    except Exception as e:
+        logger.warning("Token version listener unavailable: %s", e)
+
+
+async def start_user_lookup_structures():
+    """
+    Subscribes to user events, then builds the search index and the email filter.
+
+    Subscribing first means users created during the builds are not missed.
+    Without the subscription the email filter is left unbuilt, so it never
+    rules out users registered on other workers. Failures are logged without
+    failing startup.
+    """
+    subscribed = True
+    try:
+        await consume_user_events()
+    except Exception as e:
+        subscribed = False
+        logger.warning("User event listener unavailable: %s", e)
+    builds = []
+    if settings.USER_SEARCH_ENABLED:
+        builds.append(rebuild_user_search_index())
+    if settings.USER_EMAIL_FILTER_ENABLED:
+        if subscribed:
+            builds.append(rebuild_user_email_filter())
+        else:
+            logger.warning("User email filter left unbuilt without the user event listener.")
+    await asyncio.gather(*builds)
+
 
 # --- Event Handlers ---
 @app.on_event("startup")
@@ -36,9 +120,26 @@ async def startup_event():
     This function is executed when the application starts. It initializes
     the database connection and performs any necessary setup.
     """
-    print("Starting up User Service application...")
+    configure_logging()
+    logger.info("Starting up User Service application...")
     await init_db()
-    print("Application startup complete.")
+    if settings.USER_CACHE_ENABLED:
+        task = asyncio.create_task(start_user_cache_listener())
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+    if settings.USER_SEARCH_ENABLED or settings.USER_EMAIL_FILTER_ENABLED:
+        task = asyncio.create_task(start_user_lookup_structures())
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+    if settings.AUTH_STATELESS:
+        task = asyncio.create_task(start_token_version_listener())
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+    if consumer_runtime is not None:
+        await consumer_runtime.start()
+    if settings.OUTBOX_ENABLED or settings.PUBLISHER_OVERFLOW_POLICY == "drop":
+        start_outbox_relay(USER_EXCHANGE_DECLARATIONS)
+    logger.info("Application startup complete.")
 
 
 @app.on_event("shutdown")
@@ -49,10 +150,17 @@ async def shutdown_event():
     This function is executed when the application shuts down. It closes
     database connections and other resources gracefully.
     """
-    print("Shutting down User Service application...")
+    logger.info("Shutting down User Service application...")
+    await stop_outbox_relay()
+    await close_buffered_publisher()
+    if consumer_runtime is not None:
+        await consumer_runtime.stop()
     await close_db()
+    await close_channel_pool()
     await close_rabbitmq_connection()
-    print("Application shutdown complete.")
+    close_password_hasher()
+    logger.info("Application shutdown complete.")
+    shutdown_logging()
 
 
 # --- Exception Handlers ---
@@ -90,3 +198,14 @@ async def redirect_to_docs():
         "version": app.version,
         "docs_url": app.docs_url,
     }
+
+
+# --- Metrics Endpoint ---
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """
+        Metrics endpoint in the Prometheus text format.
+        """
+        return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
@@ -1,13 +1,31 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from shared.configuration.config import settings
+from shared.domain.base_errores import CapacityExceededError
+from shared.infrastructure.cache import MISSING, TTLCache
+from shared.infrastructure.metrics import CollectedMetric, Sample, metrics_registry
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+PASSWORD_HASHING_SECONDS = metrics_registry.histogram(
+    "password_hashing_duration_seconds",
+    "Time a hashing pool worker spent on a bcrypt job, by function.",
+    ("function",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5),
+)
+PASSWORD_HASHING_WAIT_SECONDS = metrics_registry.histogram(
+    "password_hashing_queue_wait_seconds",
+    "Time a bcrypt job waited for a hashing pool worker.",
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -23,12 +41,263 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _run_timed(func: Callable[..., Any], *args: Any) -> tuple[Any, float, float]:
+    """
+    Runs a hashing function inside a worker and reports when it started and
+    how long it took.
+
+    Defined at module level so it can be pickled into a process pool.
+    """
+    started_at = time.monotonic()
+    return func(*args), started_at, time.monotonic() - started_at
+
+
+class PasswordHasherPool:
+    """
+    Bounded worker pool for bcrypt hashing and verification.
+
+    bcrypt is deliberately slow and would block the event loop for every login
+    and registration. This pool runs the work in a thread or process executor,
+    caps the number of pending jobs and rejects new ones with
+    `CapacityExceededError` once the queue is full.
+    """
+
+    def __init__(self, backend: str = "thread", workers: int = 4, max_queue: int = 64):
+        """
+        Initializes the pool with the given executor backend and limits.
+        """
+        if backend not in ("thread", "process"):
+            raise ValueError("Password hasher backend must be 'thread' or 'process'.")
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of jobs submitted but not yet picked up by a worker.
+        """
+        return max(0, self._pending - self.workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.backend == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs `func(*args)` in the pool, failing fast when the pool is saturated.
+        """
+        if self._pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise CapacityExceededError("Password hashing pool is saturated.")
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.monotonic()
+        self._pending += 1
+        try:
+            result, started_at, duration = await loop.run_in_executor(
+                self._get_executor(), _run_timed, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+        wait = max(0.0, started_at - submitted_at)
+        self.completed += 1
+        self.total_wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        PASSWORD_HASHING_WAIT_SECONDS.observe(wait)
+        PASSWORD_HASHING_SECONDS.observe(duration, func.__name__)
+        return result
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the pool counters.
+        """
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_seconds": (
+                self.total_wait_seconds / self.completed if self.completed else 0.0
+            ),
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shuts down the underlying executor.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_password_hasher: Optional[PasswordHasherPool] = None
+
+
+def get_password_hasher() -> PasswordHasherPool:
+    """
+    Gets or creates the global password hashing pool.
+    """
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasherPool(
+            backend=settings.PASSWORD_HASHER_BACKEND,
+            workers=settings.PASSWORD_HASHER_WORKERS,
+            max_queue=settings.PASSWORD_HASHER_MAX_QUEUE,
+        )
+    return _password_hasher
+
+
+def collect_password_hasher_metrics() -> list[CollectedMetric]:
+    """
+    Reads the counters of the global password hashing pool.
+    """
+    if _password_hasher is None:
+        return []
+    stats = _password_hasher.stats()
+    return [
+        CollectedMetric(
+            "password_hashing_in_flight",
+            "gauge",
+            "bcrypt jobs submitted and not yet finished.",
+            [Sample({}, stats["in_flight"])],
+        ),
+        CollectedMetric(
+            "password_hashing_rejected_total",
+            "counter",
+            "bcrypt jobs rejected because the pool was saturated.",
+            [Sample({}, stats["rejected"])],
+        ),
+    ]
+
+
+metrics_registry.register_collector(collect_password_hasher_metrics)
+
+
+def close_password_hasher():
+    """
+    Shuts down the global password hashing pool if it exists.
+    """
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.shutdown()
+        _password_hasher = None
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password in the hashing pool without blocking the event loop.
+    """
+    return await get_password_hasher().run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hashes a password in the hashing pool without blocking the event loop.
+    """
+    return await get_password_hasher().run(get_password_hash, password)
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    """
+    Hashes many passwords in parallel, one job per pool worker at a time.
+
+    Keeping at most `workers` jobs in flight leaves the pool queue free for
+    interactive logins while a bulk import is running.
+    """
+    pool = get_password_hasher()
+    semaphore = asyncio.Semaphore(pool.workers)
+
+    async def hash_one(password: str) -> str:
+        async with semaphore:
+            return await pool.run(get_password_hash, password)
+
+    return list(await asyncio.gather(*(hash_one(password) for password in passwords)))
+
+
 # JWT Token Handling
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWT claims.
+
+    Entries are keyed by a SHA-256 digest of the raw token, so bearer tokens are
+    never kept in memory as-is. An entry expires at the earlier of the token's
+    `exp` claim and the configured TTL, and the least recently used entry is
+    evicted once `max_size` is reached.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300):
+        """
+        Initializes the TokenCache with a size bound and a TTL.
+        """
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """
+        Returns a copy of the cached claims, or `None` on a miss or expiry.
+        """
+        claims = self._cache.get(self._key(token))
+        if claims is MISSING:
+            return None
+        return dict(claims)
+
+    def put(self, token: str, claims: dict):
+        """
+        Stores verified claims until the token's expiry or the TTL, whichever is first.
+        """
+        ttl = self._cache.ttl_seconds
+        if "exp" in claims:
+            ttl = min(ttl, float(claims["exp"]) - time.time())
+        if ttl <= 0:
+            return
+        self._cache.set(self._key(token), dict(claims), ttl_seconds=ttl)
+
+    def clear(self):
+        """
+        Removes every cached entry.
+        """
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the cache counters.
+        """
+        return self._cache.stats()
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_SIZE, ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Creates a JWT access token with the given payload data and expiration time.
@@ -48,13 +317,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 def decode_access_token(token: str) -> Optional[dict]:
     """
     Decodes and validates a JWT access token.
+
+    Verified claims are served from `token_cache` when the same token is seen
+    again, skipping signature verification until the token expires.
     """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         if "exp" in payload:
             expire = datetime.fromtimestamp(payload["exp"])
             if expire < datetime.utcnow():
                 return None
+        token_cache.put(token, payload)
         return payload
     except JWTError:
         return None
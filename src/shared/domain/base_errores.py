@@ -99,3 +99,33 @@ class MessagingError(InfrastructureError):
         Initializes the MessagingError.
         """
         super().__init__(message)
+
+
+class CapacityExceededError(InfrastructureError):
+    """
+    Exception raised when a bounded resource cannot accept more work.
+
+    This exception is used to fail fast instead of queueing indefinitely when a
+    worker pool, buffer or connection pool is saturated.
+    """
+
+    def __init__(self, message: str = "The service is at capacity, try again later."):
+        """
+        Initializes the CapacityExceededError.
+        """
+        super().__init__(message)
+
+
+class IndexNotReadyError(InfrastructureError):
+    """
+    Exception raised when an in-process index is queried before it is built.
+
+    This exception is used while an index is still loading at startup, so callers
+    can ask clients to retry instead of returning incomplete results.
+    """
+
+    def __init__(self, message: str = "The index is still being built, try again later."):
+        """
+        Initializes the IndexNotReadyError.
+        """
+        super().__init__(message)
@@ -1,6 +1,6 @@
-from typing import Any
-
-from src.shared.domain.base_out import BaseM, Out
+import base64
+import json
+from typing import Any, AsyncIterable, AsyncIterator
 
 
 def exit_json(state: int, data: dict) -> dict[str, Any]:
@@ -8,11 +8,55 @@ def exit_json(state: int, data: dict) -> dict[str, Any]:
     Creates a standardized JSON response with state and data information.
 
     This function generates a consistent JSON response structure for success or error states.
+    The envelope holds `state`, `msg` and `data`; `data` is kept as given, pydantic
+    models included, and is only encoded when the response is serialized.
     """
     if state < 0 or state > 1:
         raise ValueError("Output only accepts 0 or 1 as state values.")
-    msg = "success" if state == 1 else "error"
-    output = Out(state=state, msg=msg)
-    output.data = data
-    salida_model = BaseM(**output.__dict__)
-    return salida_model.dict()
+    return {"state": state, "msg": "success" if state == 1 else "error", "data": data}
+
+
+def encode_cursor(after_id: int) -> str:
+    """
+    Encodes the last key of a page into an opaque pagination cursor.
+    """
+    payload = json.dumps({"after": after_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodes a cursor built by `encode_cursor` back into the last key of a page.
+
+    Raises a `ValueError` for cursors that were not produced by `encode_cursor`.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid pagination cursor.") from e
+    if not isinstance(after_id, int) or isinstance(after_id, bool):
+        raise ValueError("Invalid pagination cursor.")
+    return after_id
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = 65536
+) -> AsyncIterator[bytes]:
+    """
+    Splits a stream of byte chunks into lines, without the trailing newline.
+
+    Blank lines are skipped. A line longer than `max_line_bytes` raises a
+    `ValueError`, so a malformed stream cannot grow the buffer without bound.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"Line exceeds {max_line_bytes} bytes.")
+    if buffer.strip():
+        yield buffer
@@ -0,0 +1,100 @@
+import math
+from hashlib import blake2b
+
+HASH_MASK = (1 << 64) - 1
+
+
+def optimal_size(capacity: int, false_positive_rate: float) -> tuple[int, int]:
+    """
+    Returns the number of bits and of hash functions for a Bloom filter.
+
+    The sizes give `false_positive_rate` once `capacity` keys have been added:
+    `-capacity * ln(rate) / ln(2)^2` bits, about 9.6 bits per key at 1%, and
+    `bits / capacity * ln(2)` hash functions.
+    """
+    if capacity < 1:
+        raise ValueError("Bloom filter capacity must be at least 1.")
+    if not 0 < false_positive_rate < 1:
+        raise ValueError("Bloom filter false positive rate must be between 0 and 1.")
+    bits = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Lookups have no false negatives: a key reported absent was never added. A
+    key reported present may not have been, with about the configured false
+    positive rate while at most `capacity` keys have been added, rising beyond
+    it. Memory is fixed at construction. Keys cannot be removed.
+
+    Bit positions come from one 128-bit BLAKE2b digest per key, split into two
+    64-bit hashes and combined by double hashing.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        """
+        Initializes the BloomFilter sized for `capacity` keys at the given rate.
+        """
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.bits, self.hashes = optimal_size(capacity, false_positive_rate)
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> list[int]:
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [((first + index * second) & HASH_MASK) % self.bits for index in range(self.hashes)]
+
+    def add(self, key: str) -> bool:
+        """
+        Adds a key. Returns `False` when every bit of the key was already set.
+        """
+        added = False
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self._array[byte] & mask:
+                self._array[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        array = self._array
+        return all(array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of keys added, not counting keys already reported present.
+        """
+        return self.count
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        Memory held by the bit array.
+        """
+        return len(self._array)
+
+    def estimated_false_positive_rate(self) -> float:
+        """
+        Returns the false positive rate expected for the keys added so far.
+        """
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def stats(self) -> dict:
+        """
+        Returns the size and load of the filter.
+        """
+        return {
+            "keys": self.count,
+            "capacity": self.capacity,
+            "bytes": self.size_bytes,
+            "hashes": self.hashes,
+            "false_positive_rate": self.estimated_false_positive_rate(),
+        }
@@ -1,13 +1,108 @@
+import logging
+import time
 from typing import AsyncGenerator
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from shared.configuration.config import settings
+from shared.infrastructure.metrics import CollectedMetric, Sample, metrics_registry
+
+logger = logging.getLogger(__name__)
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True, pool_pre_ping=True)
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=False, pool_pre_ping=True)
+
+SQL_STATEMENT_SECONDS = metrics_registry.histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time by statement kind.",
+    ("statement",),
+)
+SQL_ERRORS = metrics_registry.counter(
+    "db_statement_errors_total", "SQL statements that raised an error."
+)
+POOL_CHECKOUT_SECONDS = metrics_registry.histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time spent waiting for a connection from the pool.",
+)
+SQL_STATEMENT_KINDS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK"})
+
+
+def _statement_kind(statement: str) -> str:
+    kind = statement.lstrip()[:8].split(None, 1)[0].upper() if statement.strip() else ""
+    return kind if kind in SQL_STATEMENT_KINDS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    SQL_STATEMENT_SECONDS.observe(time.perf_counter() - started, _statement_kind(statement))
+
+
+def _handle_error(exception_context):
+    SQL_ERRORS.inc()
+    started = exception_context.connection and exception_context.connection.info.get(
+        "query_started"
+    )
+    if started:
+        started.pop()
+
+
+def _time_pool_checkout(sync_engine: Engine):
+    # The pool has no event before a checkout starts, so its `connect` is wrapped.
+    # `dispose` replaces the pool, which is why this runs again on `engine_disposed`.
+    pool = sync_engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+
+def instrument_engine(sync_engine: Engine):
+    """
+    Records statement timings, errors and pool checkout waits of an engine.
+    """
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    event.listen(sync_engine, "engine_disposed", _time_pool_checkout)
+    _time_pool_checkout(sync_engine)
+
+
+def collect_pool_metrics() -> list[CollectedMetric]:
+    """
+    Reads the connection pool occupancy, for pools that track it.
+    """
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [
+        CollectedMetric(
+            "db_pool_checked_out_connections",
+            "gauge",
+            "Connections currently checked out of the pool.",
+            [Sample({}, pool.checkedout())],
+        ),
+        CollectedMetric(
+            "db_pool_size", "gauge", "Configured size of the pool.", [Sample({}, pool.size())]
+        ),
+    ]
+
+
+instrument_engine(engine.sync_engine)
+metrics_registry.register_collector(collect_pool_metrics)
 
 AsyncSessionFactory = async_sessionmaker(
     bind=engine,
@@ -71,13 +166,13 @@ async def init_db():
     It is primarily used for development or testing purposes. In production, use
     Alembic migrations for database schema management.
     """
-    print("Database connection initialized.")
+    logger.info("Database connection initialized.")
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
-            print("Database connection successful.")
+            logger.info("Database connection successful.")
     except Exception as e:
-        print(f"Database connection failed: {e}")
+        logger.error("Database connection failed: %s", e)
 
 
 async def close_db():
@@ -87,4 +182,4 @@ async def close_db():
     This function disposes of the database engine, closing all active connections.
     """
     await engine.dispose()
-    print("Database connections closed.")
+    logger.info("Database connections closed.")
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Coalesces concurrent key lookups into batched calls.
+
+    Keys requested during the same event loop iteration are collected and
+    resolved with a single call to `batch_fn`, which must return one value per
+    key in the same order. Keys that are already queued or in flight share the
+    pending result instead of triggering another lookup.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[K]], Awaitable[list[V]]],
+        max_batch_size: int = 500,
+    ):
+        """
+        Initializes the DataLoader with a batch function and a batch size cap.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue: dict[K, asyncio.Future] = {}
+        self._in_flight: dict[K, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.loads = 0
+        self.coalesced = 0
+        self.batches = 0
+
+    async def load(self, key: K) -> V:
+        """
+        Loads a value, batching with other keys requested in the same tick.
+        """
+        self.loads += 1
+        future = self._queue.get(key) or self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue[key] = future
+        # Shield the shared future so one cancelled caller does not cancel the others.
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        batch, self._queue = self._queue, {}
+        self._in_flight.update(batch)
+        keys = list(batch)
+        for start in range(0, len(keys), self.max_batch_size):
+            end = start + self.max_batch_size
+            chunk = {key: batch[key] for key in keys[start:end]}
+            task = asyncio.ensure_future(self._run_batch(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: dict[K, asyncio.Future]):
+        self.batches += 1
+        try:
+            values = await self.batch_fn(list(batch))
+            if len(values) != len(batch):
+                raise ValueError("DataLoader batch function returned a wrong number of values.")
+            for future, value in zip(batch.values(), values):
+                if not future.done():
+                    future.set_result(value)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for key, future in batch.items():
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the loader counters.
+        """
+        return {
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "queued": len(self._queue),
+            "in_flight": len(self._in_flight),
+        }
@@ -3,8 +3,8 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from shared.infrastructure.messaging import Channel, get_rabbitmq_channel
 from src.shared.infrastructure.database import get_db_session
-from src.shared.infrastructure.messaging import Channel, get_rabbitmq_channel
 
 # Type hint for database session dependency
 DbSession = Annotated[AsyncSession, Depends(get_db_session)]
@@ -0,0 +1,230 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Optional, TextIO
+
+from shared.configuration.config import settings
+from shared.infrastructure.metrics import CollectedMetric, Sample, metrics_registry
+
+_RECORD_ATTRIBUTES = set(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    Fields passed with `extra=` are added to the object next to the standard
+    timestamp, level, logger and message fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Formats a record as a JSON line.
+        """
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the records of chosen loggers.
+
+    `rates` maps logger name prefixes to the fraction of records kept, and the
+    longest matching prefix wins. Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rates: Optional[dict[str, float]] = None):
+        """
+        Initializes the SamplingFilter with per-logger keep rates.
+        """
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._cache: dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        """
+        Returns the fraction of records kept for a logger name.
+        """
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            matched = -1
+            for prefix, prefix_rate in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > matched:
+                    rate, matched = prefix_rate, len(prefix)
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decides whether a record is kept.
+        """
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1 or random.random() < rate
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a bounded queue without ever blocking the caller.
+
+    Records arriving while the queue is full are dropped and counted; the count
+    is reported by the next record that gets through.
+    """
+
+    def __init__(self, record_queue: queue.Queue):
+        """
+        Initializes the BoundedQueueHandler with its queue.
+        """
+        super().__init__(record_queue)
+        self.dropped = 0
+        self._reported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merges the message arguments so the record can be formatted later.
+
+        Unlike the standard `QueueHandler`, the record is not formatted here;
+        only an exception traceback is rendered, since it cannot cross threads.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """
+        Enqueues a record, dropping it if the queue is full.
+        """
+        unreported = self.dropped - self._reported
+        if unreported:
+            record.dropped_records = unreported
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self._reported += unreported
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[BoundedQueueHandler] = None
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    log_format: Optional[str] = None,
+    queue_size: Optional[int] = None,
+    sampling: Optional[dict[str, float]] = None,
+    sql_echo: Optional[bool] = None,
+    stream: Optional[TextIO] = None,
+):
+    """
+    Routes every log record through a bounded queue to a writer thread.
+
+    Callers only pay for the level check and an enqueue; formatting and the
+    write to `stream`, stdout by default, happen off the event loop. The other
+    arguments default to the `LOG_*` and `SQL_ECHO` settings. Calling it again
+    replaces the handler installed by the previous call.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    if (log_format or settings.LOG_FORMAT) == "json":
+        stream_handler.setFormatter(StructuredFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+
+    record_queue: queue.Queue = queue.Queue(maxsize=queue_size or settings.LOG_QUEUE_SIZE)
+    _queue_handler = BoundedQueueHandler(record_queue)
+    _queue_handler.addFilter(
+        SamplingFilter(settings.LOG_SAMPLING if sampling is None else sampling)
+    )
+    _listener = logging.handlers.QueueListener(
+        record_queue, stream_handler, respect_handler_level=True
+    )
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level or settings.LOG_LEVEL)
+    echo = settings.SQL_ECHO if sql_echo is None else sql_echo
+    logging.getLogger("sqlalchemy.engine").setLevel(
+        logging.INFO if echo else logging.WARNING
+    )
+    _listener.start()
+
+
+def shutdown_logging():
+    """
+    Writes out the queued records and stops the writer thread.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def logging_stats() -> dict:
+    """
+    Returns the depth of the log queue and the number of dropped records.
+    """
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {
+        "queued": _queue_handler.queue.qsize(),
+        "dropped": _queue_handler.dropped,
+    }
+
+
+def collect_logging_metrics() -> list[CollectedMetric]:
+    """
+    Reads the log queue depth and the number of dropped records.
+    """
+    stats = logging_stats()
+    return [
+        CollectedMetric(
+            "log_queue_depth",
+            "gauge",
+            "Log records waiting to be written.",
+            [Sample({}, stats["queued"])],
+        ),
+        CollectedMetric(
+            "log_records_dropped_total",
+            "counter",
+            "Log records dropped because the queue was full.",
+            [Sample({}, stats["dropped"])],
+        ),
+    ]
+
+
+metrics_registry.register_collector(collect_logging_metrics)
@@ -0,0 +1,680 @@
+import asyncio
+import logging
+import re
+import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator, Awaitable, Callable, Optional, Union
+
+import aio_pika
+from aio_pika.exceptions import (
+    ChannelClosed,
+    ChannelNotFoundEntity,
+    MessageProcessError,
+    QueueEmpty,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryEnvelope:
+    """
+    A published message as it sits in an in-memory queue.
+
+    The message body is shared by reference with the publisher, so routing a
+    message to one or more queues never copies it.
+    """
+
+    __slots__ = ("message", "exchange", "routing_key", "redelivered", "expires_at")
+
+    def __init__(
+        self,
+        message: aio_pika.Message,
+        exchange: str,
+        routing_key: str,
+        expires_at: Optional[float] = None,
+    ):
+        self.message = message
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.redelivered = False
+        self.expires_at = expires_at
+
+
+class InMemoryIncomingMessage:
+    """
+    A delivered message with the acknowledgement API of aio-pika's `IncomingMessage`.
+    """
+
+    def __init__(
+        self,
+        channel: "InMemoryChannel",
+        queue: "InMemoryQueue",
+        envelope: InMemoryEnvelope,
+        delivery_tag: int,
+        no_ack: bool,
+        consumer_tag: Optional[str] = None,
+    ):
+        """
+        Initializes the InMemoryIncomingMessage for one delivery of an envelope.
+        """
+        message = envelope.message
+        self.channel = channel
+        self.queue = queue
+        self.envelope = envelope
+        self.body = message.body
+        self.headers = message.headers or {}
+        self.content_type = message.content_type
+        self.content_encoding = message.content_encoding
+        self.delivery_mode = message.delivery_mode
+        self.message_id = message.message_id
+        self.correlation_id = message.correlation_id
+        self.timestamp = message.timestamp
+        self.exchange = envelope.exchange
+        self.routing_key = envelope.routing_key
+        self.redelivered = envelope.redelivered
+        self.delivery_tag = delivery_tag
+        self.consumer_tag = consumer_tag
+        self.no_ack = no_ack
+        self.processed = no_ack
+
+    def _settle(self):
+        if self.no_ack:
+            raise TypeError('Can\'t settle message with "no_ack" flag')
+        if self.processed:
+            raise MessageProcessError("Message already processed", self)
+        self.processed = True
+
+    async def ack(self, multiple: bool = False):
+        """
+        Acknowledges the message, and every earlier one on the channel if `multiple`.
+        """
+        self._settle()
+        self.channel._settle(self.delivery_tag, multiple, requeue=None)
+
+    async def nack(self, multiple: bool = False, requeue: bool = True):
+        """
+        Negatively acknowledges the message, requeueing or dead-lettering it.
+        """
+        self._settle()
+        self.channel._settle(self.delivery_tag, multiple, requeue=requeue)
+
+    async def reject(self, requeue: bool = False):
+        """
+        Rejects the message, requeueing or dead-lettering it.
+        """
+        await self.nack(requeue=requeue)
+
+    @asynccontextmanager
+    async def process(
+        self,
+        requeue: bool = False,
+        reject_on_redelivered: bool = False,
+        ignore_processed: bool = False,
+    ) -> AsyncGenerator["InMemoryIncomingMessage", None]:
+        """
+        Acknowledges the message on exit, or rejects it if the block raises.
+        """
+        try:
+            yield self
+        except BaseException:
+            if not (ignore_processed and self.processed):
+                await self.reject(
+                    requeue=requeue and not (reject_on_redelivered and self.redelivered)
+                )
+            raise
+        if not (ignore_processed and self.processed):
+            await self.ack()
+
+
+class InMemoryExchange:
+    """
+    An exchange routing messages to the queues bound to it.
+
+    Supports the `direct`, `fanout` and `topic` exchange types. The default
+    exchange, named `""`, routes to the queue named by the routing key.
+    """
+
+    def __init__(self, broker: "InMemoryBroker", name: str, type: str = "direct"):
+        """
+        Initializes the InMemoryExchange.
+        """
+        if type not in ("direct", "fanout", "topic"):
+            raise NotImplementedError(f"Exchange type '{type}' is not supported.")
+        self.broker = broker
+        self.name = name
+        self.type = type
+        self.bindings: list[tuple["InMemoryQueue", str]] = []
+
+    def matches(self, binding_key: str, routing_key: str) -> bool:
+        """
+        Returns whether a routing key matches a binding key for this exchange type.
+        """
+        if self.type == "fanout":
+            return True
+        if self.type == "direct":
+            return binding_key == routing_key
+        pattern = (
+            re.escape(binding_key).replace(r"\*", r"[^.]+").replace(r"\#", r".*")
+        )
+        return re.fullmatch(pattern, routing_key) is not None
+
+    def route(self, routing_key: str) -> list["InMemoryQueue"]:
+        """
+        Returns the distinct queues a routing key is delivered to.
+        """
+        if self.name == "":
+            queue = self.broker.queues.get(routing_key)
+            return [queue] if queue is not None else []
+        queues: dict[str, InMemoryQueue] = {}
+        for queue, binding_key in self.bindings:
+            if self.matches(binding_key, routing_key):
+                queues[queue.name] = queue
+        return list(queues.values())
+
+    async def publish(
+        self, message: aio_pika.Message, routing_key: str, **kwargs
+    ) -> int:
+        """
+        Routes a message to the matching queues. Returns the number of queues.
+
+        Publishing is synchronous, so a returned publish is already confirmed.
+        """
+        return self.broker.route(self.name, routing_key, message)
+
+
+class InMemoryQueue:
+    """
+    A FIFO queue with per-channel prefetch, requeueing and dead-lettering.
+
+    `x-message-ttl`, `x-dead-letter-exchange`, `x-dead-letter-routing-key` and
+    `x-single-active-consumer` arguments behave as they do in RabbitMQ.
+    """
+
+    def __init__(
+        self,
+        broker: "InMemoryBroker",
+        name: str,
+        durable: bool = False,
+        exclusive: bool = False,
+        auto_delete: bool = False,
+        arguments: Optional[dict] = None,
+        owner: Optional["InMemoryConnection"] = None,
+    ):
+        """
+        Initializes the InMemoryQueue.
+        """
+        self.broker = broker
+        self.name = name
+        self.durable = durable
+        self.exclusive = exclusive
+        self.auto_delete = auto_delete
+        self.arguments = arguments or {}
+        self.owner = owner
+        self.messages: deque[InMemoryEnvelope] = deque()
+        self.consumers: OrderedDict[str, tuple] = OrderedDict()
+        self.ttl_ms: Optional[int] = self.arguments.get("x-message-ttl")
+
+    @property
+    def message_count(self) -> int:
+        """
+        Number of messages waiting to be delivered.
+        """
+        return len(self.messages)
+
+    def put(self, envelope: InMemoryEnvelope):
+        """
+        Enqueues an envelope and delivers it if a consumer has capacity.
+        """
+        if self.ttl_ms is not None:
+            loop = asyncio.get_running_loop()
+            envelope.expires_at = loop.time() + self.ttl_ms / 1000
+            loop.call_later(self.ttl_ms / 1000, self._expire)
+        self.messages.append(envelope)
+        self.dispatch()
+
+    def requeue(self, envelope: InMemoryEnvelope):
+        """
+        Puts an envelope back at the head of the queue as a redelivery.
+        """
+        envelope.redelivered = True
+        self.messages.appendleft(envelope)
+        self.dispatch()
+
+    def dead_letter(self, envelope: InMemoryEnvelope):
+        """
+        Routes an envelope to the dead-letter exchange, or drops it if there is none.
+        """
+        exchange = self.arguments.get("x-dead-letter-exchange")
+        if exchange is None:
+            return
+        routing_key = self.arguments.get(
+            "x-dead-letter-routing-key", envelope.routing_key
+        )
+        self.broker.route(exchange, routing_key, envelope.message)
+
+    def _expire(self):
+        now = asyncio.get_running_loop().time()
+        while self.messages and self.messages[0].expires_at <= now:
+            self.dead_letter(self.messages.popleft())
+
+    def dispatch(self):
+        """
+        Delivers waiting messages to consumers whose channels have capacity.
+
+        Consumers take turns, except on a single-active-consumer queue, where
+        the first registered consumer gets every message until it cancels.
+        """
+        single_active = self.arguments.get("x-single-active-consumer")
+        while self.messages and self.consumers:
+            candidates = list(self.consumers.items())
+            if single_active:
+                candidates = candidates[:1]
+            for tag, (channel, callback, no_ack) in candidates:
+                if channel.has_capacity() or no_ack:
+                    if not single_active:
+                        self.consumers.move_to_end(tag)
+                    channel._deliver(self, self.messages.popleft(), callback, no_ack, tag)
+                    break
+            else:
+                return
+
+    async def bind(
+        self,
+        exchange: Union[InMemoryExchange, str],
+        routing_key: Optional[str] = None,
+        **kwargs,
+    ):
+        """
+        Binds the queue to an exchange, given as an object or by name.
+        """
+        name = exchange if isinstance(exchange, str) else exchange.name
+        target = self.broker.get_exchange(name)
+        target.bindings.append((self, self.name if routing_key is None else routing_key))
+
+    async def unbind(
+        self,
+        exchange: Union[InMemoryExchange, str],
+        routing_key: Optional[str] = None,
+        **kwargs,
+    ):
+        """
+        Removes a binding of the queue to an exchange.
+        """
+        name = exchange if isinstance(exchange, str) else exchange.name
+        target = self.broker.get_exchange(name)
+        key = self.name if routing_key is None else routing_key
+        target.bindings = [
+            binding for binding in target.bindings if binding != (self, key)
+        ]
+
+
+class InMemoryQueueHandle:
+    """
+    A queue as seen through one channel, mirroring aio-pika's `Queue`.
+    """
+
+    def __init__(self, channel: "InMemoryChannel", queue: InMemoryQueue):
+        """
+        Initializes the InMemoryQueueHandle.
+        """
+        self.channel = channel
+        self.queue = queue
+        self.name = queue.name
+        self.declaration_result = SimpleNamespace(
+            message_count=queue.message_count, consumer_count=len(queue.consumers)
+        )
+
+    async def bind(self, exchange, routing_key: Optional[str] = None, **kwargs):
+        """
+        Binds the queue to an exchange, given as an object or by name.
+        """
+        await self.queue.bind(exchange, routing_key)
+
+    async def unbind(self, exchange, routing_key: Optional[str] = None, **kwargs):
+        """
+        Removes a binding of the queue to an exchange.
+        """
+        await self.queue.unbind(exchange, routing_key)
+
+    async def consume(
+        self,
+        callback: Callable[[Any], Awaitable[Any]],
+        no_ack: bool = False,
+        exclusive: bool = False,
+        arguments: Optional[dict] = None,
+        consumer_tag: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Starts delivering messages to a callback. Returns the consumer tag.
+
+        Each delivery runs the callback in its own task, like aio-pika does.
+        """
+        self.channel._ensure_open()
+        consumer_tag = consumer_tag or f"ctag-{uuid.uuid4().hex}"
+        self.queue.consumers[consumer_tag] = (self.channel, callback, no_ack)
+        self.channel.consumers[consumer_tag] = self.queue
+        self.queue.dispatch()
+        return consumer_tag
+
+    async def cancel(self, consumer_tag: str, timeout: Optional[float] = None, nowait: bool = False):
+        """
+        Stops a consumer. Messages it has not settled stay unacknowledged.
+        """
+        self.channel._cancel(consumer_tag)
+
+    async def get(
+        self, *, no_ack: bool = False, fail: bool = True, timeout: Optional[float] = 5
+    ) -> Optional[InMemoryIncomingMessage]:
+        """
+        Fetches one message, or returns `None` (raises if `fail`) when empty.
+        """
+        self.channel._ensure_open()
+        if not self.queue.messages:
+            if fail:
+                raise QueueEmpty()
+            return None
+        return self.channel._track(
+            self.queue, self.queue.messages.popleft(), no_ack, consumer_tag=None
+        )
+
+
+class InMemoryChannel:
+    """
+    A channel on an in-memory connection, mirroring aio-pika's `Channel`.
+
+    Deliveries are tracked per channel: `set_qos(prefetch_count)` bounds how
+    many may be unacknowledged at once, and closing the channel requeues them.
+    """
+
+    def __init__(self, connection: "InMemoryConnection"):
+        """
+        Initializes the InMemoryChannel.
+        """
+        self.connection = connection
+        self.broker = connection.broker
+        self.prefetch_count = 0
+        self.consumers: dict[str, InMemoryQueue] = {}
+        self._unacked: OrderedDict[int, tuple[InMemoryQueue, InMemoryEnvelope]] = OrderedDict()
+        self._next_tag = 0
+        self._closed = False
+
+    @property
+    def is_closed(self) -> bool:
+        """
+        Whether the channel has been closed.
+        """
+        return self._closed
+
+    @property
+    def default_exchange(self) -> InMemoryExchange:
+        """
+        The default exchange, routing to queues by name.
+        """
+        return self.broker.exchanges[""]
+
+    def _ensure_open(self):
+        if self._closed:
+            raise ChannelClosed(406, "Channel is closed")
+
+    def has_capacity(self) -> bool:
+        """
+        Whether another message may be delivered within the prefetch limit.
+        """
+        return self.prefetch_count == 0 or len(self._unacked) < self.prefetch_count
+
+    async def set_qos(self, prefetch_count: int = 0, **kwargs):
+        """
+        Sets how many deliveries may be unacknowledged on this channel at once.
+        """
+        self.prefetch_count = prefetch_count
+        for queue in set(self.consumers.values()):
+            queue.dispatch()
+
+    async def declare_exchange(
+        self,
+        name: str,
+        type: Union[aio_pika.ExchangeType, str] = aio_pika.ExchangeType.DIRECT,
+        durable: bool = False,
+        **kwargs,
+    ) -> InMemoryExchange:
+        """
+        Declares an exchange, returning the existing one if already declared.
+        """
+        self._ensure_open()
+        exchange_type = aio_pika.ExchangeType(type).value
+        if name not in self.broker.exchanges:
+            self.broker.exchanges[name] = InMemoryExchange(self.broker, name, exchange_type)
+        return self.broker.exchanges[name]
+
+    async def get_exchange(self, name: str, ensure: bool = True) -> InMemoryExchange:
+        """
+        Returns a declared exchange.
+        """
+        self._ensure_open()
+        return self.broker.get_exchange(name)
+
+    async def declare_queue(
+        self,
+        name: Optional[str] = None,
+        *,
+        durable: bool = False,
+        exclusive: bool = False,
+        passive: bool = False,
+        auto_delete: bool = False,
+        arguments: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ) -> InMemoryQueueHandle:
+        """
+        Declares a queue, returning the existing one if already declared.
+
+        Queues declared without a name get a unique server-style name.
+        """
+        self._ensure_open()
+        name = name or f"amq.gen-{uuid.uuid4().hex}"
+        queue = self.broker.queues.get(name)
+        if queue is None:
+            if passive:
+                raise ChannelNotFoundEntity(404, f"NOT_FOUND - no queue '{name}'")
+            queue = InMemoryQueue(
+                self.broker,
+                name,
+                durable=durable,
+                exclusive=exclusive,
+                auto_delete=auto_delete,
+                arguments=arguments,
+                owner=self.connection if exclusive else None,
+            )
+            self.broker.queues[name] = queue
+        return InMemoryQueueHandle(self, queue)
+
+    async def get_queue(self, name: str, ensure: bool = True) -> InMemoryQueueHandle:
+        """
+        Returns a declared queue.
+        """
+        return await self.declare_queue(name, passive=True)
+
+    def _track(
+        self,
+        queue: InMemoryQueue,
+        envelope: InMemoryEnvelope,
+        no_ack: bool,
+        consumer_tag: Optional[str],
+    ) -> InMemoryIncomingMessage:
+        self._next_tag += 1
+        if not no_ack:
+            self._unacked[self._next_tag] = (queue, envelope)
+        return InMemoryIncomingMessage(
+            self, queue, envelope, self._next_tag, no_ack, consumer_tag
+        )
+
+    def _deliver(
+        self,
+        queue: InMemoryQueue,
+        envelope: InMemoryEnvelope,
+        callback: Callable[[Any], Awaitable[Any]],
+        no_ack: bool,
+        consumer_tag: str,
+    ):
+        message = self._track(queue, envelope, no_ack, consumer_tag)
+        task = asyncio.get_running_loop().create_task(callback(message))
+        self.broker.tasks.add(task)
+        task.add_done_callback(self.broker._on_delivery_done)
+
+    def _settle(self, delivery_tag: int, multiple: bool, requeue: Optional[bool]):
+        if multiple:
+            tags = [tag for tag in self._unacked if tag <= delivery_tag]
+        else:
+            tags = [delivery_tag] if delivery_tag in self._unacked else []
+        queues = set()
+        for tag in tags:
+            queue, envelope = self._unacked.pop(tag)
+            queues.add(queue)
+            if requeue:
+                queue.requeue(envelope)
+            elif requeue is False:
+                queue.dead_letter(envelope)
+        for queue in set(self.consumers.values()) | queues:
+            queue.dispatch()
+
+    def _cancel(self, consumer_tag: str):
+        queue = self.consumers.pop(consumer_tag, None)
+        if queue is None:
+            return
+        queue.consumers.pop(consumer_tag, None)
+        if queue.auto_delete and not queue.consumers:
+            self.broker.delete_queue(queue.name)
+        else:
+            queue.dispatch()
+
+    async def close(self, exc: Optional[BaseException] = None):
+        """
+        Closes the channel, cancelling its consumers and requeueing unsettled messages.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for consumer_tag in list(self.consumers):
+            self._cancel(consumer_tag)
+        unacked, self._unacked = self._unacked, OrderedDict()
+        for queue, envelope in reversed(unacked.values()):
+            queue.requeue(envelope)
+        self.connection.channels.discard(self)
+
+
+class InMemoryConnection:
+    """
+    A connection to an `InMemoryBroker`, mirroring aio-pika's `RobustConnection`.
+    """
+
+    def __init__(self, broker: "InMemoryBroker"):
+        """
+        Initializes the InMemoryConnection.
+        """
+        self.broker = broker
+        self.channels: set[InMemoryChannel] = set()
+        self._closed = False
+
+    @property
+    def is_closed(self) -> bool:
+        """
+        Whether the connection has been closed.
+        """
+        return self._closed
+
+    async def channel(self, publisher_confirms: bool = True, **kwargs) -> InMemoryChannel:
+        """
+        Opens a channel. Publishes are always confirmed once they return.
+        """
+        if self._closed:
+            raise ChannelClosed(320, "Connection is closed")
+        channel = InMemoryChannel(self)
+        self.channels.add(channel)
+        return channel
+
+    async def close(self, exc: Optional[BaseException] = None):
+        """
+        Closes every channel and deletes the exclusive queues of this connection.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for channel in list(self.channels):
+            await channel.close()
+        for queue in list(self.broker.queues.values()):
+            if queue.owner is self:
+                self.broker.delete_queue(queue.name)
+
+
+class InMemoryBroker:
+    """
+    Process-local message broker with the AMQP semantics the service relies on.
+
+    It lets the publisher, the outbox relay and the consumers run in one process
+    without RabbitMQ: messages are dispatched to consumers in the same event
+    loop, with the same publish, consume, ack and nack behaviour.
+    """
+
+    def __init__(self):
+        """
+        Initializes the InMemoryBroker with only the default exchange declared.
+        """
+        self.exchanges: dict[str, InMemoryExchange] = {"": InMemoryExchange(self, "")}
+        self.queues: dict[str, InMemoryQueue] = {}
+        self.tasks: set[asyncio.Task] = set()
+
+    def _on_delivery_done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("In-memory consumer callback failed: %s", task.exception())
+
+    def connect(self) -> InMemoryConnection:
+        """
+        Opens a connection to the broker.
+        """
+        return InMemoryConnection(self)
+
+    def get_exchange(self, name: str) -> InMemoryExchange:
+        """
+        Returns a declared exchange, failing like a passive AMQP declare.
+        """
+        exchange = self.exchanges.get(name)
+        if exchange is None:
+            raise ChannelNotFoundEntity(404, f"NOT_FOUND - no exchange '{name}'")
+        return exchange
+
+    def route(self, exchange_name: str, routing_key: str, message: aio_pika.Message) -> int:
+        """
+        Routes a message through an exchange. Returns the number of queues reached.
+        """
+        queues = self.get_exchange(exchange_name).route(routing_key)
+        for queue in queues:
+            queue.put(InMemoryEnvelope(message, exchange_name, routing_key))
+        return len(queues)
+
+    def delete_queue(self, name: str):
+        """
+        Deletes a queue and its bindings. Waiting messages are discarded.
+        """
+        queue = self.queues.pop(name, None)
+        if queue is None:
+            return
+        for exchange in self.exchanges.values():
+            exchange.bindings = [
+                binding for binding in exchange.bindings if binding[0] is not queue
+            ]
+
+
+memory_broker = InMemoryBroker()
+"""
+The broker shared by every in-memory connection of this process.
+"""
+
+
+async def connect_in_memory() -> InMemoryConnection:
+    """
+    Opens a connection to the process-wide in-memory broker.
+    """
+    return memory_broker.connect()
@@ -1,15 +1,38 @@
 import asyncio
+import hashlib
+import logging
+import signal
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import partial
 
 import aio_pika.exceptions
-from aio_pika.abc import AbstractRobustChannel, AbstractRobustConnection
+from aio_pika.abc import (
+    AbstractIncomingMessage,
+    AbstractQueue,
+    AbstractRobustChannel,
+    AbstractRobustConnection,
+)
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
-from typing_extensions import AsyncGenerator, Optional, TypeAlias
+from typing_extensions import AsyncGenerator, Awaitable, Callable, Optional, TypeAlias
 
 from shared.configuration.config import settings
-from src.shared.domain.base_errores import MessagingError
+from shared.infrastructure.memory_bus import connect_in_memory
+from shared.infrastructure.metrics import CollectedMetric, Sample, metrics_registry
+from src.shared.domain.base_errores import CapacityExceededError, MessagingError
+
+logger = logging.getLogger(__name__)
 
 RABBITMQ_URL = settings.RABBITMQ_URL
 
+PUBLISH_SECONDS = metrics_registry.histogram(
+    "rabbitmq_publish_duration_seconds",
+    "Time until the broker accepted a published message, by exchange.",
+    ("exchange",),
+)
+CONSUMER_OUTCOMES = ("processed", "failed", "requeued", "retried", "parked")
+
 Channel: TypeAlias = AbstractRobustChannel
 
 _connection: Optional[AbstractRobustConnection] = None
@@ -18,12 +41,19 @@ _connection: Optional[AbstractRobustConnection] = None
 async def get_rabbitmq_connection() -> AbstractRobustConnection:
     """
     Gets or creates the global RabbitMQ connection.
+
+    With `MESSAGE_BUS_BACKEND` set to `memory`, the connection goes to the
+    process-wide in-memory broker instead, so every channel, publisher and
+    consumer built on it runs without RabbitMQ.
     """
     global _connection
     if _connection is None or _connection.is_closed:
-        print("Attempting to create a new RabbitMQ connection.")
+        if settings.MESSAGE_BUS_BACKEND == "memory":
+            _connection = await connect_in_memory()
+            return _connection
+        logger.info("Attempting to create a new RabbitMQ connection.")
         _connection = await connection_to_rabbitmq()
-        print("RabbitMQ connection established.")
+        logger.info("RabbitMQ connection established.")
     return _connection
 
 
@@ -49,7 +79,7 @@ async def connection_to_rabbitmq() -> AbstractRobustConnection:
         asyncio.TimeoutError,
         aio_pika.exceptions.AMQPConnectionError,
     ) as e:
-        print(f"Failed to connect to RabbitMQ: {e}. Retrying...")
+        logger.warning("Failed to connect to RabbitMQ: %s. Retrying...", e)
         raise
 
 
@@ -59,7 +89,7 @@ def on_connection_close(
     """
     Callback for when the RabbitMQ connection is closed.
     """
-    print(f"RabbitMQ connection closed: {exc}")
+    logger.warning("RabbitMQ connection closed: %s", exc)
     global _connection
     _connection = None
 
@@ -68,7 +98,7 @@ def on_connection_reconnect(connection: AbstractRobustConnection):
     """
     Callback for when the RabbitMQ connection is reconnected.
     """
-    print("RabbitMQ connection reconnected")
+    logger.info("RabbitMQ connection reconnected")
 
 
 async def close_rabbitmq_connection():
@@ -79,21 +109,164 @@ async def close_rabbitmq_connection():
     if _connection and not _connection.is_closed:
         await _connection.close()
         _connection = None
-        print("RabbitMQ connection closed.")
+        logger.info("RabbitMQ connection closed.")
 
 
-async def get_rabbitmq_channel() -> AsyncGenerator[Channel, None]:
+class ChannelPool:
     """
-    Provides a RabbitMQ channel for a request.
+    Bounded pool of RabbitMQ channels on the global connection.
+
+    Channels are leased with `acquire()` as an async context manager and handed
+    back on exit. Closed channels are discarded on return and replaced lazily,
+    so callers always receive an open channel. At most `max_size` channels are
+    leased at once; waiting longer than `acquire_timeout` raises
+    `CapacityExceededError`.
     """
-    try:
-        connection = await get_rabbitmq_connection()
+
+    def __init__(
+        self,
+        connection_factory: Optional[
+            Callable[[], Awaitable[AbstractRobustConnection]]
+        ] = None,
+        max_size: int = 10,
+        acquire_timeout: float = 5,
+    ):
+        """
+        Initializes the ChannelPool with a size bound and an acquire timeout.
+        """
+        self.connection_factory = connection_factory or get_rabbitmq_connection
+        self.max_size = max(1, max_size)
+        self.acquire_timeout = acquire_timeout
+        self._slots = asyncio.Semaphore(self.max_size)
+        self._idle: deque[Channel] = deque()
+        self._leased = 0
+        self.created = 0
+        self.discarded = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncGenerator[Channel, None]:
+        """
+        Leases an open channel for the duration of the `async with` block.
+        """
+        started_at = time.monotonic()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise CapacityExceededError("Timed out waiting for a RabbitMQ channel.")
+        wait = time.monotonic() - started_at
+        self.acquired += 1
+        self.total_wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+        try:
+            channel = await self._take()
+        except BaseException:
+            self._slots.release()
+            raise
+        self._leased += 1
+        try:
+            yield channel
+        finally:
+            self._leased -= 1
+            self._give_back(channel)
+            self._slots.release()
+
+    async def _take(self) -> Channel:
+        while self._idle:
+            channel = self._idle.pop()
+            if not channel.is_closed:
+                return channel
+            self.discarded += 1
+        connection = await self.connection_factory()
         channel = await connection.channel()
         await channel.set_qos(prefetch_count=1)
-        print("RabbitMQ channel acquired.")
+        self.created += 1
         return channel
+
+    def _give_back(self, channel: Channel):
+        if channel.is_closed:
+            self.discarded += 1
+            return
+        self._idle.append(channel)
+
+    async def close(self):
+        """
+        Closes every idle channel. Leased channels are closed when returned.
+        """
+        while self._idle:
+            channel = self._idle.pop()
+            if not channel.is_closed:
+                await channel.close()
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the pool counters.
+        """
+        return {
+            "max_size": self.max_size,
+            "leased": self._leased,
+            "idle": len(self._idle),
+            "created": self.created,
+            "discarded": self.discarded,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "avg_wait_seconds": (
+                self.total_wait_seconds / self.acquired if self.acquired else 0.0
+            ),
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+
+_channel_pool: Optional[ChannelPool] = None
+
+
+def get_channel_pool() -> ChannelPool:
+    """
+    Gets or creates the global RabbitMQ channel pool.
+    """
+    global _channel_pool
+    if _channel_pool is None:
+        _channel_pool = ChannelPool(
+            max_size=settings.RABBITMQ_CHANNEL_POOL_SIZE,
+            acquire_timeout=settings.RABBITMQ_CHANNEL_ACQUIRE_TIMEOUT,
+        )
+    return _channel_pool
+
+
+async def close_channel_pool():
+    """
+    Closes the global RabbitMQ channel pool if it exists.
+    """
+    global _channel_pool
+    if _channel_pool is not None:
+        await _channel_pool.close()
+        _channel_pool = None
+        logger.info("RabbitMQ channel pool closed.")
+
+
+async def get_rabbitmq_channel() -> AsyncGenerator[Channel, None]:
+    """
+    Provides a pooled RabbitMQ channel for a request.
+
+    The channel is leased from the global `ChannelPool` and returned to it when
+    the request finishes.
+    """
+    acquired = False
+    try:
+        async with get_channel_pool().acquire() as channel:
+            acquired = True
+            yield channel
+    except CapacityExceededError:
+        raise
     except Exception as e:
-        print(f"Error obtaining RabbitMQ channel: {e}")
+        if acquired:
+            raise
+        logger.error("Error obtaining RabbitMQ channel: %s", e)
         raise MessagingError(f"Failed to get or use RabbitMQ channel: {e}")
 
 
@@ -106,8 +279,8 @@ async def declare_exchange(
     """
     Declares an exchange in RabbitMQ.
     """
-    print(
-        f"Declaring exchange: {exchange_name} (type: {exchange_type}, durable: {durable})"
+    logger.debug(
+        "Declaring exchange: %s (type: %s, durable: %s)", exchange_name, exchange_type, durable
     )
     await channel.declare_exchange(
         name=exchange_name, type=aio_pika.ExchangeType(exchange_type), durable=durable
@@ -123,7 +296,7 @@ async def declare_queue(
     """
     Declares a queue in RabbitMQ.
     """
-    print(f"Declaring queue: {queue_name} (durable: {durable})")
+    logger.debug("Declaring queue: %s (durable: %s)", queue_name, durable)
     await channel.declare_queue(
         name=queue_name,
         durable=durable,
@@ -137,8 +310,8 @@ async def bind_queue(
     """
     Binds a queue to an exchange in RabbitMQ.
     """
-    print(
-        f"Binding queue '{queue_name}' to exchange '{exchange_name}' with key '{routing_key}'"
+    logger.debug(
+        "Binding queue '%s' to exchange '%s' with key '%s'", queue_name, exchange_name, routing_key
     )
     queue = await channel.get_queue(queue_name)
     await queue.bind(exchange=exchange_name, routing_key=routing_key)
@@ -155,12 +328,942 @@ async def publish_message(
     """
     Publishes a message to an exchange in RabbitMQ.
     """
-    print(f"Publishing message to exchange '{exchange_name}' with key '{routing_key}'")
+    logger.debug("Publishing message to exchange '%s' with key '%s'", exchange_name, routing_key)
     message = aio_pika.Message(
         body=body,
         content_type=content_type,
         delivery_mode=delivery_mode,
     )
     exchange = await channel.get_exchange(exchange_name)
+    started = time.perf_counter()
     await exchange.publish(message, routing_key=routing_key)
-    print("Message published successfully.")
+    PUBLISH_SECONDS.observe(time.perf_counter() - started, exchange_name or "default")
+    logger.debug("Message published successfully.")
+
+
+def partition_for_key(key: str, partitions: int) -> int:
+    """
+    Maps a key to one of `partitions` buckets with a jump consistent hash.
+
+    The same key always maps to the same bucket, and growing the partition count
+    from N to N + 1 only moves about 1 / (N + 1) of the keys.
+    """
+    if partitions <= 1:
+        return 0
+    state = int.from_bytes(
+        hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+    bucket, candidate = -1, 0
+    while candidate < partitions:
+        bucket = candidate
+        state = (state * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((state >> 33) + 1)))
+    return bucket
+
+
+OVERFLOW_POLICIES = ("block", "drop", "fail")
+
+
+class BufferedPublisher:
+    """
+    Long-lived publisher that batches messages over a single confirmed channel.
+
+    Callers only await an enqueue into a bounded in-memory buffer. A background
+    task drains the buffer in batches of up to `batch_size` messages, waiting at
+    most `linger_ms` for a batch to fill, and publishes each batch concurrently
+    so broker confirms are pipelined instead of awaited one by one.
+
+    When the buffer is full, the `overflow` policy decides what happens:
+    `block` waits for room, `drop` discards the message and returns `False`,
+    and `fail` raises `CapacityExceededError`.
+
+    Messages that are nacked, fail to publish, or cannot get a channel are
+    retried up to `max_retries` times, ahead of new messages and after a
+    backoff doubling from `retry_backoff_ms`. Messages still failing after that
+    are counted as `failed` and logged with their exchange and routing key.
+    `close` waits for pending retries as well as buffered messages.
+    """
+
+    def __init__(
+        self,
+        channel_factory: Optional[Callable[[], Awaitable[Channel]]] = None,
+        batch_size: int = 100,
+        linger_ms: int = 5,
+        max_buffer: int = 10000,
+        overflow: str = "block",
+        max_retries: int = 5,
+        retry_backoff_ms: int = 100,
+    ):
+        """
+        Initializes the BufferedPublisher with batching and backpressure limits.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Overflow policy must be one of {OVERFLOW_POLICIES}.")
+        self.channel_factory = channel_factory or open_confirmed_channel
+        self.batch_size = max(1, batch_size)
+        self.linger = linger_ms / 1000
+        self.overflow = overflow
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffer)
+        self._retries: deque[tuple[str, str, aio_pika.Message, int]] = deque()
+        self._exchange_declarations: dict[str, dict] = {}
+        self._exchanges: dict[str, aio_pika.abc.AbstractExchange] = {}
+        self._channel: Optional[Channel] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.published = 0
+        self.dropped = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+
+    def register_exchange(self, exchange_name: str, **declare_kwargs):
+        """
+        Declares an exchange with the given arguments whenever a channel is opened.
+
+        Unregistered exchanges are looked up passively and must already exist.
+        """
+        self._exchange_declarations[exchange_name] = declare_kwargs
+
+    @property
+    def buffer_depth(self) -> int:
+        """
+        Number of messages waiting to be published.
+        """
+        return self._queue.qsize()
+
+    async def publish(
+        self,
+        exchange_name: str,
+        routing_key: str,
+        body: bytes,
+        content_type: str = "application/json",
+        delivery_mode: aio_pika.DeliveryMode = aio_pika.DeliveryMode.PERSISTENT,
+        headers: Optional[dict] = None,
+    ) -> bool:
+        """
+        Enqueues a message for publishing, applying the overflow policy when full.
+
+        Returns `True` once the message is buffered, or `False` if it was dropped.
+        """
+        self._ensure_running()
+        message = aio_pika.Message(
+            body=body,
+            content_type=content_type,
+            delivery_mode=delivery_mode,
+            headers=headers,
+        )
+        item = (exchange_name, routing_key, message)
+        if self.overflow == "block":
+            await self._queue.put(item)
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                if self.overflow == "fail":
+                    raise CapacityExceededError("Publisher buffer is full.")
+                self.dropped += 1
+                return False
+        self.enqueued += 1
+        return True
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            if self._retries:
+                attempt = self._retries[0][3]
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+                batch = []
+                while self._retries and len(batch) < self.batch_size:
+                    batch.append(self._retries.popleft())
+            else:
+                batch = [(*await self._queue.get(), 0)]
+                if self.linger and self._queue.qsize() < self.batch_size - 1:
+                    await asyncio.sleep(self.linger)
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append((*self._queue.get_nowait(), 0))
+            failures = await self._flush(batch)
+            finished = len(batch) - len(failures)
+            for exchange_name, routing_key, message, attempt in failures:
+                if attempt < self.max_retries:
+                    self.retried += 1
+                    self._retries.append((exchange_name, routing_key, message, attempt + 1))
+                    continue
+                self.failed += 1
+                finished += 1
+                logger.error(
+                    "Giving up on message to exchange '%s' with key '%s' after %s attempts.",
+                    exchange_name,
+                    routing_key,
+                    attempt + 1,
+                )
+            for _ in range(finished):
+                self._queue.task_done()
+
+    async def _get_exchange(self, exchange_name: str) -> aio_pika.abc.AbstractExchange:
+        if self._channel is None or self._channel.is_closed:
+            self._channel = await self.channel_factory()
+            self._exchanges = {}
+        exchange = self._exchanges.get(exchange_name)
+        if exchange is None:
+            if exchange_name == "":
+                exchange = self._channel.default_exchange
+            elif exchange_name in self._exchange_declarations:
+                exchange = await self._channel.declare_exchange(
+                    exchange_name, **self._exchange_declarations[exchange_name]
+                )
+            else:
+                exchange = await self._channel.get_exchange(exchange_name)
+            self._exchanges[exchange_name] = exchange
+        return exchange
+
+    async def _flush(
+        self, batch: list[tuple[str, str, aio_pika.Message, int]]
+    ) -> list[tuple[str, str, aio_pika.Message, int]]:
+        """
+        Publishes a batch and returns the items that were not confirmed.
+        """
+        self.batches += 1
+        try:
+            exchanges = [await self._get_exchange(name) for name, _, _, _ in batch]
+        except Exception as e:
+            logger.error("Failed to prepare publisher channel: %s", e)
+            return batch
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                exchange.publish(message, routing_key=routing_key)
+                for exchange, (_, routing_key, message, _) in zip(exchanges, batch)
+            ),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+        for exchange_name, _, _, _ in batch:
+            PUBLISH_SECONDS.observe(elapsed, exchange_name or "default")
+        failures = [
+            item for item, result in zip(batch, results) if isinstance(result, BaseException)
+        ]
+        self.published += len(batch) - len(failures)
+        if failures:
+            error = next(result for result in results if isinstance(result, BaseException))
+            logger.warning("Failed to publish %s of %s messages: %s", len(failures), len(batch), error)
+        return failures
+
+    async def close(self, timeout: float = 10):
+        """
+        Flushes buffered messages, then stops the background task and the channel.
+        """
+        if self._task is not None and not self._task.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Publisher closed with %s messages unsent.", self.buffer_depth)
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self._channel is not None and not self._channel.is_closed:
+            await self._channel.close()
+        self._channel = None
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the publisher counters.
+        """
+        return {
+            "buffer_depth": self.buffer_depth,
+            "enqueued": self.enqueued,
+            "published": self.published,
+            "dropped": self.dropped,
+            "retried": self.retried,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+async def open_confirmed_channel() -> Channel:
+    """
+    Opens a channel with publisher confirms on the global RabbitMQ connection.
+    """
+    connection = await get_rabbitmq_connection()
+    return await connection.channel(publisher_confirms=True)
+
+
+_buffered_publisher: Optional[BufferedPublisher] = None
+
+
+def get_buffered_publisher() -> BufferedPublisher:
+    """
+    Gets or creates the global buffered publisher.
+    """
+    global _buffered_publisher
+    if _buffered_publisher is None:
+        _buffered_publisher = BufferedPublisher(
+            batch_size=settings.PUBLISHER_BATCH_SIZE,
+            linger_ms=settings.PUBLISHER_LINGER_MS,
+            max_buffer=settings.PUBLISHER_MAX_BUFFER,
+            overflow=settings.PUBLISHER_OVERFLOW_POLICY,
+            max_retries=settings.PUBLISHER_MAX_RETRIES,
+            retry_backoff_ms=settings.PUBLISHER_RETRY_BACKOFF_MS,
+        )
+    return _buffered_publisher
+
+
+def collect_publisher_metrics() -> list[CollectedMetric]:
+    """
+    Reads the counters of the global buffered publisher.
+    """
+    if _buffered_publisher is None:
+        return []
+    stats = _buffered_publisher.stats()
+    return [
+        CollectedMetric(
+            "publisher_buffer_depth",
+            "gauge",
+            "Messages waiting in the buffered publisher.",
+            [Sample({}, stats["buffer_depth"])],
+        ),
+        CollectedMetric(
+            "publisher_messages_total",
+            "counter",
+            "Messages handled by the buffered publisher, by outcome.",
+            [
+                Sample({"outcome": outcome}, stats[outcome])
+                for outcome in ("published", "dropped", "retried", "failed")
+            ],
+        ),
+    ]
+
+
+metrics_registry.register_collector(collect_publisher_metrics)
+
+
+async def close_buffered_publisher():
+    """
+    Flushes and closes the global buffered publisher if it exists.
+    """
+    global _buffered_publisher
+    if _buffered_publisher is not None:
+        await _buffered_publisher.close()
+        _buffered_publisher = None
+        logger.info("Buffered publisher closed.")
+
+
+RETRY_ATTEMPTS_HEADER = "x-retry-attempts"
+RETRY_ERROR_HEADER = "x-retry-last-error"
+
+
+def retry_queue_name(queue_name: str, delay_ms: int) -> str:
+    """
+    Returns the name of the delay queue holding retries of a queue for `delay_ms`.
+    """
+    return f"{queue_name}.retry.{delay_ms}ms"
+
+
+def parking_queue_name(queue_name: str) -> str:
+    """
+    Returns the name of the parking-lot queue of a queue.
+    """
+    return f"{queue_name}.parking"
+
+
+class RetryPolicy:
+    """
+    Delayed retries with exponential backoff for a consumer queue.
+
+    A failed message is republished to a delay queue whose TTL matches the
+    backoff for its attempt; when the TTL expires, the queue dead-letters it
+    back to the work queue through the default exchange. The number of failed
+    attempts travels in the `x-retry-attempts` header. Once `max_attempts` is
+    reached the message is moved to the queue's parking lot instead, where it
+    stays until it is re-driven.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        initial_delay_ms: int = 1000,
+        multiplier: float = 2,
+        max_delay_ms: int = 60000,
+    ):
+        """
+        Initializes the RetryPolicy with its attempt limit and backoff curve.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.initial_delay_ms = max(1, initial_delay_ms)
+        self.multiplier = max(1, multiplier)
+        self.max_delay_ms = max(self.initial_delay_ms, max_delay_ms)
+
+    def delay_ms(self, attempt: int) -> int:
+        """
+        Returns the backoff before retrying a message that failed `attempt` times.
+        """
+        delay = self.initial_delay_ms * self.multiplier ** (attempt - 1)
+        return int(min(delay, self.max_delay_ms))
+
+    @property
+    def delays(self) -> list[int]:
+        """
+        The distinct delays in use, one delay queue each.
+        """
+        return sorted(
+            {self.delay_ms(attempt) for attempt in range(1, self.max_attempts)}
+        )
+
+    async def declare(self, channel: Channel, queue_name: str):
+        """
+        Declares the delay queues and the parking lot of a work queue.
+        """
+        for delay in self.delays:
+            await channel.declare_queue(
+                retry_queue_name(queue_name, delay),
+                durable=True,
+                arguments={
+                    "x-message-ttl": delay,
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": queue_name,
+                },
+            )
+        await channel.declare_queue(parking_queue_name(queue_name), durable=True)
+
+
+MessageHandler: TypeAlias = Callable[[AbstractIncomingMessage], Awaitable[None]]
+BatchMessageHandler: TypeAlias = Callable[
+    [list[AbstractIncomingMessage]], Awaitable[list[AbstractIncomingMessage]]
+]
+
+
+class ConsumerHandler:
+    """
+    A message handler registered with a `ConsumerRuntime` and its counters.
+
+    The handler is bound to one queue. Up to `prefetch_count` unacknowledged
+    messages are delivered to the worker at once, and at most `concurrency` of
+    them are handled concurrently; the rest wait for a free slot. Failed messages
+    are retried according to `retry_policy`, or rejected if there is none.
+    """
+
+    def __init__(
+        self,
+        queue_name: str,
+        handler: MessageHandler,
+        exchange_name: Optional[str] = None,
+        routing_key: str = "",
+        exchange_declaration: Optional[dict] = None,
+        queue_arguments: Optional[dict] = None,
+        durable: bool = True,
+        prefetch_count: int = 64,
+        concurrency: int = 16,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """
+        Initializes the ConsumerHandler with its queue binding and limits.
+        """
+        self.queue_name = queue_name
+        self.handler = handler
+        self.exchange_name = exchange_name
+        self.routing_key = routing_key
+        self.exchange_declaration = exchange_declaration or {}
+        self.queue_arguments = queue_arguments
+        self.durable = durable
+        self.prefetch_count = max(1, prefetch_count)
+        self.concurrency = max(1, min(concurrency, self.prefetch_count))
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.retry_policy = retry_policy
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self.requeued = 0
+        self.retried = 0
+        self.parked = 0
+        self.total_seconds = 0.0
+        self.started_at: Optional[float] = None
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the handler counters and its throughput.
+        """
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        handled = self.processed + self.failed
+        return {
+            "queue": self.queue_name,
+            "prefetch_count": self.prefetch_count,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "failed": self.failed,
+            "requeued": self.requeued,
+            "retried": self.retried,
+            "parked": self.parked,
+            "avg_handle_seconds": self.total_seconds / handled if handled else 0.0,
+            "messages_per_second": handled / elapsed if elapsed else 0.0,
+        }
+
+
+class BatchConsumerHandler(ConsumerHandler):
+    """
+    A batch handler registered with a `ConsumerRuntime` and its counters.
+
+    Deliveries are accumulated until `batch_size` messages are waiting or
+    `linger_ms` has passed since the first one, then handed to the handler as a
+    list. The handler returns the messages it could not process; those are
+    retried or rejected individually and the rest of the batch is acknowledged
+    with a single `multiple=True` ack. Batches on a queue are handled one at a
+    time, which keeps the multiple ack from covering messages of another batch.
+    """
+
+    def __init__(
+        self,
+        queue_name: str,
+        handler: BatchMessageHandler,
+        batch_size: int = 100,
+        linger_ms: int = 50,
+        **kwargs,
+    ):
+        """
+        Initializes the BatchConsumerHandler with its batching limits.
+        """
+        super().__init__(queue_name, handler, concurrency=1, **kwargs)
+        self.batch_size = max(1, batch_size)
+        self.linger = linger_ms / 1000
+        self.pending: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.batches = 0
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the handler counters, including the batch count.
+        """
+        return {
+            **super().stats(),
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+        }
+
+
+class ConsumerRuntime:
+    """
+    Runs registered message handlers concurrently on the global connection.
+
+    Each handler gets its own channel, so its prefetch limit is independent of
+    the others. A handler succeeds by returning and the message is acknowledged;
+    if it raises, the message is retried with the handler's `RetryPolicy`, or
+    rejected without requeueing if it has none. Handlers may also settle
+    messages themselves. Handlers registered with `register_batch()`
+    receive lists of messages instead, see `BatchConsumerHandler`.
+
+    `stop()` drains gracefully: consumers are cancelled so no new deliveries
+    arrive, prefetched messages that have not started are requeued, and
+    in-flight handlers get up to `shutdown_timeout` seconds to finish before the
+    channels close. `run()` starts the runtime and drains it on SIGTERM or
+    SIGINT.
+    """
+
+    def __init__(
+        self,
+        connection_factory: Optional[
+            Callable[[], Awaitable[AbstractRobustConnection]]
+        ] = None,
+        prefetch_count: int = 64,
+        concurrency: int = 16,
+        shutdown_timeout: float = 30,
+        stats_interval: float = 0,
+    ):
+        """
+        Initializes the ConsumerRuntime with default limits for its handlers.
+        """
+        self.connection_factory = connection_factory or get_rabbitmq_connection
+        self.prefetch_count = prefetch_count
+        self.concurrency = concurrency
+        self.shutdown_timeout = shutdown_timeout
+        self.stats_interval = stats_interval
+        self.handlers: dict[str, ConsumerHandler] = {}
+        self._consumers: list[tuple[Channel, AbstractQueue, str]] = []
+        self._retry_channel: Optional[Channel] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._draining = False
+        self._stop_event: Optional[asyncio.Event] = None
+
+    def register(
+        self,
+        queue_name: str,
+        handler: MessageHandler,
+        exchange_name: Optional[str] = None,
+        routing_key: str = "",
+        exchange_declaration: Optional[dict] = None,
+        queue_arguments: Optional[dict] = None,
+        durable: bool = True,
+        prefetch_count: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> ConsumerHandler:
+        """
+        Registers a handler for a queue, optionally bound to an exchange.
+
+        The queue, and the exchange if given, are declared when the runtime
+        starts. Limits default to the runtime's own.
+        """
+        if queue_name in self.handlers:
+            raise ValueError(f"A handler is already registered for queue '{queue_name}'.")
+        registration = ConsumerHandler(
+            queue_name,
+            handler,
+            exchange_name=exchange_name,
+            routing_key=routing_key,
+            exchange_declaration=exchange_declaration,
+            queue_arguments=queue_arguments,
+            durable=durable,
+            prefetch_count=prefetch_count or self.prefetch_count,
+            concurrency=concurrency or self.concurrency,
+            retry_policy=retry_policy,
+        )
+        self.handlers[queue_name] = registration
+        return registration
+
+    def register_batch(
+        self,
+        queue_name: str,
+        handler: BatchMessageHandler,
+        batch_size: int = 100,
+        linger_ms: int = 50,
+        exchange_name: Optional[str] = None,
+        routing_key: str = "",
+        exchange_declaration: Optional[dict] = None,
+        queue_arguments: Optional[dict] = None,
+        durable: bool = True,
+        prefetch_count: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> BatchConsumerHandler:
+        """
+        Registers a batch handler for a queue, optionally bound to an exchange.
+
+        The prefetch defaults to twice the batch size, so the next batch can fill
+        while the current one is being written.
+        """
+        if queue_name in self.handlers:
+            raise ValueError(f"A handler is already registered for queue '{queue_name}'.")
+        registration = BatchConsumerHandler(
+            queue_name,
+            handler,
+            batch_size=batch_size,
+            linger_ms=linger_ms,
+            exchange_name=exchange_name,
+            routing_key=routing_key,
+            exchange_declaration=exchange_declaration,
+            queue_arguments=queue_arguments,
+            durable=durable,
+            prefetch_count=prefetch_count or 2 * max(1, batch_size),
+            retry_policy=retry_policy,
+        )
+        self.handlers[queue_name] = registration
+        return registration
+
+    async def start(self):
+        """
+        Declares the registered queues and starts consuming from them.
+        """
+        self._draining = False
+        metrics_registry.register_collector(self.collect_metrics)
+        connection = await self.connection_factory()
+        if any(handler.retry_policy for handler in self.handlers.values()):
+            self._retry_channel = await connection.channel(publisher_confirms=True)
+        for registration in self.handlers.values():
+            channel = await connection.channel()
+            await channel.set_qos(prefetch_count=registration.prefetch_count)
+            queue = await channel.declare_queue(
+                registration.queue_name,
+                durable=registration.durable,
+                arguments=registration.queue_arguments,
+            )
+            if registration.exchange_name:
+                exchange = await channel.declare_exchange(
+                    registration.exchange_name, **registration.exchange_declaration
+                )
+                await queue.bind(exchange, routing_key=registration.routing_key)
+            if registration.retry_policy is not None:
+                await registration.retry_policy.declare(channel, registration.queue_name)
+            registration.started_at = time.monotonic()
+            if isinstance(registration, BatchConsumerHandler):
+                registration.task = asyncio.create_task(self._run_batches(registration))
+            consumer_tag = await queue.consume(partial(self._dispatch, registration))
+            self._consumers.append((channel, queue, consumer_tag))
+            logger.info(
+                "Consuming %s (prefetch %s, concurrency %s).",
+                registration.queue_name,
+                registration.prefetch_count,
+                registration.concurrency,
+            )
+
+    async def _dispatch(
+        self, registration: ConsumerHandler, message: AbstractIncomingMessage
+    ):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            if isinstance(registration, BatchConsumerHandler):
+                settled = asyncio.get_running_loop().create_future()
+                registration.pending.put_nowait((message, settled))
+                await settled
+                return
+            async with registration.slots:
+                if self._draining:
+                    registration.requeued += 1
+                    await message.nack(requeue=True)
+                    return
+                await self._handle(registration, message)
+        finally:
+            self._tasks.discard(task)
+
+    async def _handle(
+        self, registration: ConsumerHandler, message: AbstractIncomingMessage
+    ):
+        registration.in_flight += 1
+        started_at = time.monotonic()
+        try:
+            try:
+                await registration.handler(message)
+            except Exception as e:
+                registration.failed += 1
+                logger.exception("Error handling message from %s: %s", registration.queue_name, e)
+                await self._settle_failed(registration, message, e)
+            else:
+                registration.processed += 1
+                if not message.processed:
+                    await message.ack()
+        except Exception as e:
+            logger.error("Error settling message from %s: %s", registration.queue_name, e)
+        finally:
+            registration.in_flight -= 1
+            registration.total_seconds += time.monotonic() - started_at
+
+    async def _settle_failed(
+        self,
+        registration: ConsumerHandler,
+        message: AbstractIncomingMessage,
+        error: BaseException,
+    ):
+        if message.processed:
+            return
+        policy = registration.retry_policy
+        if policy is None:
+            await message.nack(requeue=False)
+            return
+
+        headers = dict(message.headers or {})
+        attempts = int(headers.get(RETRY_ATTEMPTS_HEADER) or 0) + 1
+        headers[RETRY_ATTEMPTS_HEADER] = attempts
+        headers[RETRY_ERROR_HEADER] = str(error)[:512]
+        if attempts >= policy.max_attempts:
+            target = parking_queue_name(registration.queue_name)
+        else:
+            target = retry_queue_name(registration.queue_name, policy.delay_ms(attempts))
+        try:
+            await self._retry_channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=message.body,
+                    headers=headers,
+                    content_type=message.content_type,
+                    message_id=message.message_id,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                ),
+                routing_key=target,
+            )
+        except Exception as e:
+            logger.warning("Failed to schedule retry to %s, requeueing: %s", target, e)
+            await message.nack(requeue=True)
+            return
+        await message.ack()
+        if attempts >= policy.max_attempts:
+            registration.parked += 1
+            logger.warning("Parked message from %s after %s attempts.", registration.queue_name, attempts)
+        else:
+            registration.retried += 1
+
+    async def _run_batches(self, registration: BatchConsumerHandler):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await registration.pending.get()]
+            deadline = loop.time() + registration.linger
+            while len(batch) < registration.batch_size:
+                if not registration.pending.empty():
+                    batch.append(registration.pending.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(registration.pending.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._handle_batch(registration, [message for message, _ in batch])
+            finally:
+                for _, settled in batch:
+                    if not settled.done():
+                        settled.set_result(None)
+
+    async def _handle_batch(
+        self,
+        registration: BatchConsumerHandler,
+        messages: list[AbstractIncomingMessage],
+    ):
+        registration.in_flight += len(messages)
+        registration.batches += 1
+        started_at = time.monotonic()
+        try:
+            error: BaseException = RuntimeError("Message failed in batch.")
+            try:
+                failed = await registration.handler(messages)
+            except Exception as e:
+                logger.exception("Error handling batch from %s: %s", registration.queue_name, e)
+                failed, error = messages, e
+            failed_ids = {id(message) for message in failed}
+            succeeded = [message for message in messages if id(message) not in failed_ids]
+            for message in failed:
+                await self._settle_failed(registration, message, error)
+            if succeeded:
+                last = max(succeeded, key=lambda message: message.delivery_tag)
+                await last.ack(multiple=True)
+            registration.processed += len(succeeded)
+            registration.failed += len(failed)
+        except Exception as e:
+            registration.failed += len(messages)
+            logger.error("Error settling batch from %s: %s", registration.queue_name, e)
+        finally:
+            registration.in_flight -= len(messages)
+            registration.total_seconds += time.monotonic() - started_at
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Stops consuming and waits for in-flight handlers before closing channels.
+        """
+        self._draining = True
+        for _, queue, consumer_tag in self._consumers:
+            try:
+                await queue.cancel(consumer_tag)
+            except Exception as e:
+                logger.warning("Failed to cancel consumer on %s: %s", queue.name, e)
+        if self._tasks:
+            _, pending = await asyncio.wait(
+                set(self._tasks),
+                timeout=self.shutdown_timeout if timeout is None else timeout,
+            )
+            if pending:
+                logger.warning("Consumer stopped with %s handlers unfinished.", len(pending))
+        for registration in self.handlers.values():
+            if isinstance(registration, BatchConsumerHandler) and registration.task:
+                registration.task.cancel()
+                registration.task = None
+                while not registration.pending.empty():
+                    _, settled = registration.pending.get_nowait()
+                    settled.cancel()
+        for channel, _, _ in self._consumers:
+            if not channel.is_closed:
+                await channel.close()
+        self._consumers = []
+        if self._retry_channel is not None and not self._retry_channel.is_closed:
+            await self._retry_channel.close()
+        self._retry_channel = None
+        metrics_registry.unregister_collector(self.collect_metrics)
+        self.report()
+
+    def request_stop(self):
+        """
+        Asks a running `run()` call to drain and return.
+        """
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    async def run(self):
+        """
+        Starts the runtime and blocks until SIGTERM, SIGINT or `request_stop()`.
+        """
+        self._stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        installed = []
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signum, self.request_stop)
+                installed.append(signum)
+            except (NotImplementedError, RuntimeError):
+                pass
+        reporter = None
+        try:
+            await self.start()
+            if self.stats_interval:
+                reporter = asyncio.create_task(self._report_periodically())
+            await self._stop_event.wait()
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            for signum in installed:
+                loop.remove_signal_handler(signum)
+            await self.stop()
+            self._stop_event = None
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            self.report()
+
+    def report(self):
+        """
+        Logs the throughput of every registered handler.
+        """
+        for stats in self.stats().values():
+            logger.info(
+                "Consumer %s: %s processed, %s failed, %s in flight, %.1f msg/s.",
+                stats["queue"],
+                stats["processed"],
+                stats["failed"],
+                stats["in_flight"],
+                stats["messages_per_second"],
+                extra={"consumer_stats": stats},
+            )
+
+    def collect_metrics(self) -> list[CollectedMetric]:
+        """
+        Reads the handler counters as metrics, labelled by queue.
+
+        Ack and failure rates are derived from these counters by the scraper,
+        so consuming a message records nothing beyond the existing counters.
+        """
+        handlers = list(self.handlers.values())
+        return [
+            CollectedMetric(
+                "consumer_messages_total",
+                "counter",
+                "Consumed messages by queue and outcome.",
+                [
+                    Sample({"queue": handler.queue_name, "outcome": outcome}, getattr(handler, outcome))
+                    for handler in handlers
+                    for outcome in CONSUMER_OUTCOMES
+                ],
+            ),
+            CollectedMetric(
+                "consumer_in_flight_messages",
+                "gauge",
+                "Messages being handled, by queue.",
+                [Sample({"queue": handler.queue_name}, handler.in_flight) for handler in handlers],
+            ),
+            CollectedMetric(
+                "consumer_handle_seconds_total",
+                "counter",
+                "Time spent in handlers, by queue.",
+                [Sample({"queue": handler.queue_name}, handler.total_seconds) for handler in handlers],
+            ),
+        ]
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of every registered handler's counters, by queue name.
+        """
+        return {name: handler.stats() for name, handler in self.handlers.items()}
@@ -0,0 +1,460 @@
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable, NamedTuple
+
+from shared.configuration.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OVERFLOW_LABEL = "other"
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+class Sample(NamedTuple):
+    """
+    One value of a metric family, with its label values.
+    """
+
+    labels: dict[str, str]
+    value: float
+
+
+class CollectedMetric(NamedTuple):
+    """
+    A metric family read from existing counters when `/metrics` is scraped.
+    """
+
+    name: str
+    kind: str
+    help: str
+    samples: list[Sample]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """
+    Base class of the metric types, holding one child per label combination.
+
+    Label cardinality is bounded: once `max_series` combinations exist, new ones
+    are recorded under the `other` label value instead of growing the registry.
+    Children can be looked up once with `labels` and kept by hot paths to skip
+    the lookup on every observation. Subclasses must implement `_new_child`.
+    """
+
+    kind = ""
+
+    def __init__(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), max_series: int = 100
+    ):
+        """
+        Initializes the metric with its name, help text and label names.
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.max_series = max(1, max_series)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._overflow = (OVERFLOW_LABEL,) * len(labelnames)
+
+    @abstractmethod
+    def _new_child(self):
+        """
+        Returns a new child recording one label combination.
+        """
+
+    def labels(self, *values: str):
+        """
+        Returns the child recording the given label values.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"Metric {self.name} expects labels {self.labelnames}.")
+            if len(self._children) >= self.max_series:
+                values = self._overflow
+                child = self._children.get(values)
+            if child is None:
+                child = self._children[values] = self._new_child()
+        return child
+
+    def collect(self) -> Iterable[str]:
+        """
+        Yields the exposition lines of the metric.
+        """
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in list(self._children.items()):
+            yield from self._collect_child(dict(zip(self.labelnames, values)), child)
+
+    def _collect_child(self, labels: dict[str, str], child) -> Iterable[str]:
+        yield f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Counter(Metric):
+    """
+    A value that only goes up, such as a number of requests.
+    """
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, *values: str, amount: float = 1):
+        """
+        Increments the counter for the given label values.
+        """
+        self.labels(*values).value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = value
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class Gauge(Metric):
+    """
+    A value that goes up and down, such as a number of requests in flight.
+    """
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values, such as latencies, in fixed buckets.
+
+    Each observation costs a binary search over the bucket bounds and three
+    additions; cumulative bucket counts are only computed when scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        max_series: int = 100,
+    ):
+        """
+        Initializes the histogram with its bucket upper bounds.
+        """
+        super().__init__(name, help, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float, *values: str):
+        """
+        Records a value for the given label values.
+        """
+        self.labels(*values).observe(value)
+
+    def _collect_child(self, labels: dict[str, str], child) -> Iterable[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            bucket_labels = {**labels, "le": _format_value(float(bound))}
+            yield f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+        yield f"{self.name}_sum{_format_labels(labels)} {_format_value(child.sum)}"
+        yield f"{self.name}_count{_format_labels(labels)} {child.count}"
+
+
+Collector = Callable[[], Iterable[CollectedMetric]]
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics rendered in the Prometheus text format.
+
+    Metrics record into plain Python numbers without locking, so they must be
+    updated from the event loop thread. Values that components already count,
+    such as pool depths and consumer counters, are read by collectors at scrape
+    time instead of being recorded twice.
+    """
+
+    def __init__(self, max_series: int = 100):
+        """
+        Initializes the MetricsRegistry with the default per-metric series bound.
+        """
+        self.max_series = max_series
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} is already registered differently.")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """
+        Gets or creates a counter.
+        """
+        return self._register(Counter(name, help, labelnames, self.max_series))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        """
+        Gets or creates a gauge.
+        """
+        return self._register(Gauge(name, help, labelnames, self.max_series))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """
+        Gets or creates a histogram.
+        """
+        return self._register(Histogram(name, help, labelnames, buckets, self.max_series))
+
+    def register_collector(self, collector: Collector) -> Collector:
+        """
+        Adds a function returning metric families to read at scrape time.
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+        return collector
+
+    def unregister_collector(self, collector: Collector):
+        """
+        Removes a collector added with `register_collector`.
+        """
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """
+        Renders every metric and collector in the Prometheus text format.
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        for collector in list(self._collectors):
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", collector, e)
+                continue
+            for family in families:
+                lines.append(f"# HELP {family.name} {family.help}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                for sample in family.samples:
+                    lines.append(
+                        f"{family.name}{_format_labels(sample.labels)} {_format_value(sample.value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry(max_series=settings.METRICS_MAX_SERIES)
+"""
+Global metrics registry exposed on `/metrics`.
+"""
+
+HTTP_REQUEST_SECONDS = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status class.",
+    ("method", "route", "status"),
+)
+
+
+def route_template(scope: dict) -> str:
+    """
+    Returns the path template of the route that handled a request.
+
+    Routes of included routers may only know their path relative to the router
+    prefix, so the prefix is recovered from the request path by removing the
+    part the route matched. Unmatched requests return `unmatched`.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    try:
+        matched = getattr(route, "path_format", template).format(
+            **{name: str(value) for name, value in scope.get("path_params", {}).items()}
+        )
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if matched and path.endswith(matched):
+        return path[: len(path) - len(matched)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request.
+
+    Requests are labelled with the route template (`/users/{user_id}`, never the
+    raw path), the method and the status class, which keeps label cardinality
+    bounded by the number of routes. Unmatched paths share the `unmatched` route.
+    """
+
+    def __init__(self, app):
+        """
+        Initializes the MetricsMiddleware around an ASGI application.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method if method in HTTP_METHODS else OVERFLOW_LABEL,
+                route_template(scope),
+                f"{status // 100}xx",
+            )
+
+
+async def _handle_metrics_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+):
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()).strip():
+            pass
+        if request_line.split(b" ")[1:2] == [b"/metrics"]:
+            status, content_type = "200 OK", CONTENT_TYPE
+            body = metrics_registry.render().encode("utf-8")
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", b"Not Found\n"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+            + body
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve_metrics(host: str, port: int) -> asyncio.AbstractServer:
+    """
+    Serves `/metrics` on a bare HTTP listener, for processes without an API.
+    """
+    server = await asyncio.start_server(_handle_metrics_connection, host, port)
+    logger.info("Serving metrics on %s:%s.", host, port)
+    return server
+
+
+def measure_overhead(iterations: int = 100000) -> dict:
+    """
+    Measures the cost of recording, in nanoseconds per call.
+
+    Uses a private registry so the global metrics are not affected.
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter("overhead_counter", "Overhead counter.", ("route",))
+    histogram = registry.histogram("overhead_seconds", "Overhead histogram.", ("route",))
+    child = histogram.labels("/users/{user_id}")
+
+    def per_call(func: Callable[[], None]) -> float:
+        started = time.perf_counter_ns()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter_ns() - started) / iterations
+
+    baseline = per_call(lambda: None)
+    return {
+        "iterations": iterations,
+        "counter_inc_ns": per_call(lambda: counter.inc("/users/{user_id}")) - baseline,
+        "histogram_observe_ns": (
+            per_call(lambda: histogram.observe(0.003, "/users/{user_id}")) - baseline
+        ),
+        "histogram_child_observe_ns": per_call(lambda: child.observe(0.003)) - baseline,
+        "perf_counter_ns": per_call(time.perf_counter) - baseline,
+    }
+
+
+def main():
+    """
+    Prints the recording overhead as JSON.
+    """
+    print(json.dumps(measure_overhead(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import aio_pika
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    LargeBinary,
+    String,
+    delete,
+    func,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from shared.configuration.config import settings
+from shared.infrastructure.messaging import PUBLISH_SECONDS, get_channel_pool
+from src.shared.infrastructure.database import AsyncSessionFactory, Base
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxMessage(Base):
+    """
+    A message waiting to be published, stored in the same transaction as its data.
+
+    Rows are written with the business change they describe and published later
+    by `OutboxRelay`, so a commit and its message can never diverge and request
+    latency does not depend on the broker. Rows are deleted once published, so
+    the table only holds pending messages and their bodies are not kept.
+    """
+
+    __tablename__ = "tb_outbox"
+
+    outbox_id: int = Column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    exchange: str = Column(String, nullable=False)
+    routing_key: str = Column(String, nullable=False)
+    body: bytes = Column(LargeBinary, nullable=False)
+    content_type: str = Column(String, nullable=False, default="application/json")
+    headers: Optional[dict] = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"OutboxMessage(id={self.outbox_id}, exchange='{self.exchange}', routing_key='{self.routing_key}')"
+
+
+def stage_outbox_message(
+    session: AsyncSession,
+    exchange: str,
+    routing_key: str,
+    body: bytes,
+    content_type: str = "application/json",
+    headers: Optional[dict] = None,
+) -> OutboxMessage:
+    """
+    Adds a message to the outbox; it is written by the session's next commit.
+    """
+    message = OutboxMessage(
+        exchange=exchange,
+        routing_key=routing_key,
+        body=body,
+        content_type=content_type,
+        headers=headers,
+    )
+    session.add(message)
+    return message
+
+
+class OutboxRelay:
+    """
+    Background task that publishes pending outbox rows to RabbitMQ.
+
+    Each iteration locks up to `batch_size` rows in ID order with
+    `SELECT ... FOR UPDATE SKIP LOCKED`, so several workers can relay in
+    parallel without publishing the same row twice. The batch is published
+    concurrently on a confirmed channel, and only confirmed rows are deleted.
+    Failed rows stay pending and are retried on the next iteration.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionFactory,
+        batch_size: int = 100,
+        poll_interval: float = 0.5,
+        exchange_declarations: Optional[dict[str, dict]] = None,
+    ):
+        """
+        Initializes the OutboxRelay with batching and polling settings.
+        """
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.exchange_declarations = exchange_declarations or {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.relayed = 0
+        self.failed = 0
+        self.batches = 0
+
+    async def relay_batch(self) -> int:
+        """
+        Publishes one batch of pending rows and returns how many were attempted.
+        """
+        async with self.session_factory() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(OutboxMessage)
+                    .order_by(OutboxMessage.outbox_id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                rows = list(result.scalars().all())
+                if not rows:
+                    return 0
+
+                sent_ids = await self._publish(rows)
+                if sent_ids:
+                    await session.execute(
+                        delete(OutboxMessage).where(OutboxMessage.outbox_id.in_(sent_ids))
+                    )
+        self.batches += 1
+        self.relayed += len(sent_ids)
+        self.failed += len(rows) - len(sent_ids)
+        return len(rows)
+
+    async def _publish(self, rows: list[OutboxMessage]) -> list[int]:
+        async with get_channel_pool().acquire() as channel:
+            exchanges = {}
+            for name in {row.exchange for row in rows}:
+                if name == "":
+                    exchanges[name] = channel.default_exchange
+                elif name in self.exchange_declarations:
+                    exchanges[name] = await channel.declare_exchange(
+                        name, **self.exchange_declarations[name]
+                    )
+                else:
+                    exchanges[name] = await channel.get_exchange(name)
+
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *(
+                    exchanges[row.exchange].publish(
+                        aio_pika.Message(
+                            body=row.body,
+                            content_type=row.content_type,
+                            headers=row.headers,
+                            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                            message_id=str(row.outbox_id),
+                        ),
+                        routing_key=row.routing_key,
+                    )
+                    for row in rows
+                ),
+                return_exceptions=True,
+            )
+        elapsed = time.perf_counter() - started
+        for row in rows:
+            PUBLISH_SECONDS.observe(elapsed, row.exchange or "default")
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            logger.error("Failed to relay %s of %s outbox messages: %s", len(errors), len(rows), errors[0])
+        return [
+            row.outbox_id
+            for row, result in zip(rows, results)
+            if not isinstance(result, BaseException)
+        ]
+
+    async def run(self):
+        """
+        Relays batches until stopped, sleeping only when the outbox is empty.
+        """
+        while not self._stopping:
+            try:
+                relayed = await self.relay_batch()
+            except Exception as e:
+                logger.exception("Outbox relay error: %s", e)
+                relayed = 0
+            if relayed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        """
+        Starts the relay as a background task.
+        """
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self, timeout: float = 5):
+        """
+        Stops the background task, letting the current batch finish first.
+        """
+        self._stopping = True
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the relay counters.
+        """
+        return {
+            "relayed": self.relayed,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+_outbox_relay: Optional[OutboxRelay] = None
+
+
+def start_outbox_relay(exchange_declarations: Optional[dict[str, dict]] = None) -> OutboxRelay:
+    """
+    Creates and starts the global outbox relay.
+    """
+    global _outbox_relay
+    if _outbox_relay is None:
+        _outbox_relay = OutboxRelay(
+            batch_size=settings.OUTBOX_BATCH_SIZE,
+            poll_interval=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+            exchange_declarations=exchange_declarations,
+        )
+    _outbox_relay.start()
+    return _outbox_relay
+
+
+async def stop_outbox_relay():
+    """
+    Stops the global outbox relay if it is running.
+    """
+    global _outbox_relay
+    if _outbox_relay is not None:
+        await _outbox_relay.stop()
+        _outbox_relay = None
+        logger.info("Outbox relay stopped.")
@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+from typing import Optional
+
+import aio_pika
+from aio_pika.abc import AbstractIncomingMessage
+
+from shared.infrastructure.logger import configure_logging, shutdown_logging
+from shared.infrastructure.messaging import (
+    RETRY_ATTEMPTS_HEADER,
+    RETRY_ERROR_HEADER,
+    close_rabbitmq_connection,
+    get_rabbitmq_connection,
+    parking_queue_name,
+)
+
+
+def describe_parked_message(message: AbstractIncomingMessage) -> dict:
+    """
+    Summarizes a parked message for inspection.
+    """
+    headers = message.headers or {}
+    return {
+        "message_id": message.message_id,
+        "attempts": headers.get(RETRY_ATTEMPTS_HEADER),
+        "last_error": headers.get(RETRY_ERROR_HEADER),
+        "content_type": message.content_type,
+        "body": message.body.decode("utf-8", errors="replace"),
+    }
+
+
+async def inspect_parked_messages(queue_name: str, limit: int = 20) -> list[dict]:
+    """
+    Returns up to `limit` messages from the parking lot of a queue, oldest first.
+
+    Messages are fetched without acknowledging them and return to the parking
+    lot when the inspection channel closes.
+    """
+    connection = await get_rabbitmq_connection()
+    channel = await connection.channel()
+    try:
+        queue = await channel.declare_queue(parking_queue_name(queue_name), durable=True)
+        parked = []
+        for _ in range(limit):
+            message = await queue.get(fail=False)
+            if message is None:
+                break
+            parked.append(describe_parked_message(message))
+        return parked
+    finally:
+        await channel.close()
+
+
+async def redrive_parked_messages(queue_name: str, limit: Optional[int] = None) -> int:
+    """
+    Moves parked messages back to their work queue with a fresh attempt count.
+
+    At most `limit` messages are moved, and never more than the parking lot held
+    when the call started, so messages that fail again are not re-driven twice.
+    Each message is acknowledged only after the broker confirms its republish.
+    Returns the number of messages moved.
+    """
+    connection = await get_rabbitmq_connection()
+    channel = await connection.channel(publisher_confirms=True)
+    try:
+        queue = await channel.declare_queue(parking_queue_name(queue_name), durable=True)
+        available = queue.declaration_result.message_count or 0
+        limit = available if limit is None else min(limit, available)
+        moved = 0
+        while moved < limit:
+            message = await queue.get(fail=False)
+            if message is None:
+                break
+            headers = {
+                key: value
+                for key, value in (message.headers or {}).items()
+                if key not in (RETRY_ATTEMPTS_HEADER, RETRY_ERROR_HEADER)
+            }
+            await channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=message.body,
+                    headers=headers,
+                    content_type=message.content_type,
+                    message_id=message.message_id,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                ),
+                routing_key=queue_name,
+            )
+            await message.ack()
+            moved += 1
+        return moved
+    finally:
+        await channel.close()
+
+
+async def run_command(args: argparse.Namespace):
+    """
+    Runs a parking lot command and prints its result as JSON.
+    """
+    try:
+        if args.command == "inspect":
+            for parked in await inspect_parked_messages(args.queue, args.limit):
+                print(json.dumps(parked))
+        else:
+            moved = await redrive_parked_messages(args.queue, args.limit)
+            print(json.dumps({"queue": args.queue, "redriven": moved}))
+    finally:
+        await close_rabbitmq_connection()
+
+
+def main(argv: Optional[list[str]] = None):
+    """
+    Command line entry point to inspect and re-drive parked messages.
+
+    Results go to stdout as JSON lines; diagnostics go through the logging queue.
+    """
+    parser = argparse.ArgumentParser(description="Manage parked consumer messages.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    inspect_parser = subparsers.add_parser("inspect", help="Show parked messages.")
+    inspect_parser.add_argument("queue", help="Work queue whose parking lot to read.")
+    inspect_parser.add_argument("--limit", type=int, default=20)
+    redrive_parser = subparsers.add_parser(
+        "redrive", help="Move parked messages back to their work queue."
+    )
+    redrive_parser.add_argument("queue", help="Work queue to re-drive messages to.")
+    redrive_parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+    configure_logging()
+    try:
+        asyncio.run(run_command(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
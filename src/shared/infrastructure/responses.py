@@ -0,0 +1,24 @@
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import Response
+
+
+class EnvelopeResponse(Response):
+    """
+    JSON response serializing its content straight to bytes.
+
+    Content is usually the envelope built by `exit_json`. Nested pydantic models,
+    dates and other values pydantic knows are encoded by pydantic-core in a single
+    pass, so the envelope is neither validated into a model nor converted to
+    plain dictionaries first. Returning it from a route also skips FastAPI's
+    validation and serialization against the `response_model`.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """
+        Encodes the content as compact JSON.
+        """
+        return to_json(content)
@@ -26,4 +26,7 @@ class RoutesManager:
         with their respective prefixes and tags.
         """
         self.app.include_router(user.router, prefix="/users", tags=["users"])
+        self.app.include_router(
+            user.collection_router, prefix="/users", tags=["users"]
+        )
         self.app.include_router(auth.router, prefix="/auth", tags=["authentication"])
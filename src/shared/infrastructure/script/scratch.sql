@@ -9,9 +9,30 @@ CREATE TABLE public.tb_users (
     user_id SERIAL PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
-    hashed_password VARCHAR(255) NOT NULL
+    hashed_password VARCHAR(255) NOT NULL,
+    token_version INTEGER NOT NULL DEFAULT 0
 );
 
+-- Add the token version to an existing tb_users table
+ALTER TABLE public.tb_users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+
+-- Create the transactional outbox table
+CREATE TABLE IF NOT EXISTS public.tb_outbox (
+    outbox_id BIGSERIAL PRIMARY KEY,
+    exchange VARCHAR NOT NULL,
+    routing_key VARCHAR NOT NULL,
+    body BYTEA NOT NULL,
+    content_type VARCHAR NOT NULL,
+    headers JSON,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Outbox rows are now deleted once published; drop the rows an earlier release kept
+ALTER TABLE public.tb_outbox ADD COLUMN IF NOT EXISTS sent_at TIMESTAMPTZ;
+DELETE FROM public.tb_outbox WHERE sent_at IS NOT NULL;
+DROP INDEX IF EXISTS public.ix_tb_outbox_unsent;
+ALTER TABLE public.tb_outbox DROP COLUMN sent_at;
+
 -- Select all users
 SELECT * FROM tb_users;
 
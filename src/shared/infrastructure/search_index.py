@@ -0,0 +1,223 @@
+import re
+from array import array
+from bisect import bisect_left, insort
+from typing import Iterable, Iterator, Optional
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+TOKEN_START = "\x02"
+"""
+Marker prepended to every token, so grams starting with it only match prefixes.
+"""
+FIELD_SEPARATOR = "\x1f"
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits text into case-folded alphanumeric tokens.
+    """
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def document_grams(fields: Iterable[str]) -> set[str]:
+    """
+    Returns the grams indexed for a document.
+
+    Every token contributes its trigrams, with the start marker, and the
+    marker followed by its first character, so any substring of three or more
+    characters and any prefix of one or two characters can be looked up.
+    """
+    grams = set()
+    for field in fields:
+        for token in tokenize(field):
+            marked = TOKEN_START + token
+            grams.add(marked[:2])
+            grams.update(marked[index:index + 3] for index in range(len(marked) - 2))
+    return grams
+
+
+def normalize(fields: Iterable[str]) -> str:
+    """
+    Returns the text a document is matched against.
+
+    Each field becomes its tokens joined by spaces, and fields are delimited by
+    `FIELD_SEPARATOR`, so token and field boundaries can be checked with plain
+    substring tests.
+    """
+    return "".join(FIELD_SEPARATOR + " ".join(tokenize(field)) for field in fields) + FIELD_SEPARATOR
+
+
+def query_grams(token: str) -> set[str]:
+    """
+    Returns the grams a query token needs: its trigrams, or its prefix gram when shorter.
+    """
+    if len(token) < 3:
+        return {TOKEN_START + token}
+    return {token[index:index + 3] for index in range(len(token) - 2)}
+
+
+def contains(posting: array, doc_id: int) -> bool:
+    """
+    Returns whether a sorted posting list holds a document ID.
+    """
+    index = bisect_left(posting, doc_id)
+    return index < len(posting) and posting[index] == doc_id
+
+
+class NGramIndex:
+    """
+    Bounded in-process trigram index for substring and prefix search.
+
+    Documents are tuples of text fields keyed by an integer ID. Each gram maps
+    to a sorted array of document IDs, so postings cost 8 bytes per entry and
+    are intersected with binary searches. Query tokens of three characters or
+    more match anywhere in a document token, shorter ones match token prefixes.
+
+    At most `max_documents` documents are held; further documents are counted
+    in `rejected` instead of indexed. A search verifies at most
+    `max_candidates` matches before ranking, which bounds its cost for
+    very common terms. The index is meant for a single event loop and performs
+    no locking.
+    """
+
+    def __init__(self, max_documents: int = 100000, max_candidates: int = 200):
+        """
+        Initializes the NGramIndex with its size bounds.
+        """
+        self.max_documents = max_documents
+        self.max_candidates = max_candidates
+        self._documents: dict[int, tuple[tuple[str, ...], str]] = {}
+        self._postings: dict[str, array] = {}
+        self.rejected = 0
+
+    def add(self, doc_id: int, fields: tuple[str, ...]) -> bool:
+        """
+        Indexes a document, replacing any previous version with the same ID.
+
+        Returns `False` when the document was rejected because the index is full.
+        """
+        existing = self._documents.get(doc_id)
+        if existing is not None and existing[0] == fields:
+            return True
+        if existing is not None:
+            self.remove(doc_id)
+        elif len(self._documents) >= self.max_documents:
+            self.rejected += 1
+            return False
+        self._documents[doc_id] = (fields, normalize(fields))
+        for gram in document_grams(fields):
+            posting = self._postings.get(gram)
+            if posting is None:
+                self._postings[gram] = array("q", (doc_id,))
+            elif posting[-1] < doc_id:
+                posting.append(doc_id)
+            else:
+                insort(posting, doc_id)
+        return True
+
+    def remove(self, doc_id: int):
+        """
+        Removes a document if present.
+        """
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+        for gram in document_grams(document[0]):
+            posting = self._postings[gram]
+            index = bisect_left(posting, doc_id)
+            if index < len(posting) and posting[index] == doc_id:
+                del posting[index]
+            if not posting:
+                del self._postings[gram]
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[int, tuple[str, ...]]]:
+        """
+        Returns up to `limit` `(doc_id, fields)` matches, best first.
+
+        Every query token must match a token of the document. Exact field
+        matches rank first, then documents where the query is a prefix, then
+        other substring matches; ties are broken by ascending ID.
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        postings = []
+        for gram in set().union(*(query_grams(token) for token in tokens)):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        phrase = FIELD_SEPARATOR + " ".join(tokens)
+        scored = []
+        for doc_id in self._candidates(postings):
+            fields, text = self._documents[doc_id]
+            score = self._score(phrase, tokens, text)
+            if score:
+                scored.append((-score, doc_id, fields))
+                if len(scored) >= self.max_candidates:
+                    break
+        scored.sort(key=lambda match: match[:2])
+        return [(doc_id, fields) for _, doc_id, fields in scored[:limit]]
+
+    def _candidates(self, postings: list[array]) -> Iterator[int]:
+        """
+        Yields the IDs present in every posting list, shortest list first.
+
+        When even the shortest list is long, the term is common and matches are
+        plentiful, so it is walked in ID order with binary searches into the
+        others and the caller stops early. Otherwise the lists are intersected
+        as sets, switching to binary searches for lists much longer than the
+        remaining candidates.
+        """
+        smallest, others = postings[0], postings[1:]
+        if len(smallest) > 4 * self.max_candidates:
+            for doc_id in smallest:
+                if all(contains(posting, doc_id) for posting in others):
+                    yield doc_id
+            return
+        candidates = set(smallest)
+        for posting in others:
+            if len(posting) <= 16 * len(candidates):
+                candidates.intersection_update(posting)
+            else:
+                candidates = {doc_id for doc_id in candidates if contains(posting, doc_id)}
+            if not candidates:
+                return
+        yield from sorted(candidates)
+
+    @staticmethod
+    def _score(phrase: str, tokens: list[str], text: str) -> int:
+        prefixes = True
+        for token in tokens:
+            if " " + token in text or FIELD_SEPARATOR + token in text:
+                continue
+            if len(token) < 3 or token not in text:
+                return 0
+            prefixes = False
+        if phrase + FIELD_SEPARATOR in text:
+            return 3
+        if prefixes or phrase in text:
+            return 2
+        return 1
+
+    def get(self, doc_id: int) -> Optional[tuple[str, ...]]:
+        """
+        Returns the fields of an indexed document, or `None`.
+        """
+        document = self._documents.get(doc_id)
+        return None if document is None else document[0]
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def stats(self) -> dict:
+        """
+        Returns the size of the index.
+        """
+        return {
+            "documents": len(self._documents),
+            "grams": len(self._postings),
+            "postings": sum(len(posting) for posting in self._postings.values()),
+            "rejected": self.rejected,
+        }
@@ -1,10 +1,61 @@
-from shared.infrastructure.messaging import get_rabbitmq_channel
-from src.shared.domain.helpers import exit_json
-from src.users.application.use_cases.commands import RegisterUserUseCase
-from src.users.application.use_cases.queries import GetUserByIdUseCase
-from src.users.infraestructure.models import UserCreateModel, UserFindModel
-from src.users.infraestructure.repositories import UserRepository
-from users.infraestructure.messaging import UserCommandPublisher
+import csv
+import io
+import json
+import logging
+from typing import AsyncIterable, AsyncIterator, Optional
+
+from pydantic import ValidationError
+
+from shared.configuration.config import settings
+from shared.domain.base_errores import CapacityExceededError
+from src.shared.domain.helpers import encode_cursor, exit_json, iter_lines
+from src.shared.infrastructure.database import AsyncSessionFactory
+from src.users.application.use_cases.commands import (
+    BulkRegisterUsersUseCase,
+    RegisterUserUseCase,
+)
+from src.users.application.use_cases.queries import (
+    GetUserByIdUseCase,
+    GetUsersByIdsUseCase,
+    IsEmailAvailableUseCase,
+    ListUsersUseCase,
+)
+from src.users.domain.user import User
+from src.users.infraestructure.models import (
+    CreateUserCommand,
+    UserCreateModel,
+    UserFindModel,
+)
+from users.infraestructure.email_filter import user_email_filter
+from users.infraestructure.messaging import (
+    UserCommandOutbox,
+    UserCommandPublisher,
+    create_user_command_from,
+)
+from users.infraestructure.repository_factory import build_user_repository
+from users.infraestructure.search import UserSearchIndex, user_search_index
+
+logger = logging.getLogger(__name__)
+
+
+async def stage_dropped_create_user_commands(session, commands: list[CreateUserCommand]):
+    """
+    Stages create user commands the buffered publisher dropped in the outbox.
+
+    The users are already committed, so the commands are committed in a
+    transaction of their own and delivered later by the outbox relay. Raises
+    `CapacityExceededError` if they cannot be staged either.
+    """
+    logger.warning(
+        "Publisher dropped %s create user commands; staging them in the outbox.", len(commands)
+    )
+    try:
+        UserCommandOutbox(session).add_create_user_commands(commands)
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.error("Lost %s create user commands: %s", len(commands), e)
+        raise CapacityExceededError("The publisher buffer is full.") from e
 
 
 class UserServiceHandler:
@@ -19,27 +70,31 @@ class UserServiceHandler:
         """
         Initializes the UserServiceHandler with a database session.
         """
-        self.user_repository = UserRepository(db_session)
+        self.db_session = db_session
+        self.user_repository = build_user_repository(db_session)
 
     async def register_user(self, data_user: UserCreateModel):
         """
         Handles the registration of a new user in the system and publishes a user creation command.
+
+        The command carries the password hash, not the plaintext password. With
+        `OUTBOX_ENABLED` it is staged in the outbox and committed together with the
+        user; otherwise it is handed to the buffered publisher, falling back to the
+        outbox if the publisher drops it.
         """
         try:
-            use_case = RegisterUserUseCase(self.user_repository)
+            before_save = self._stage_create_user_command if settings.OUTBOX_ENABLED else None
+            use_case = RegisterUserUseCase(self.user_repository, before_save=before_save)
             user = await use_case.execute(data_user)
 
             if user is None:
                 return exit_json(0, {"success": False, "message": "ERROR_REGISTER"})
 
-            channel = await get_rabbitmq_channel()
-            try:
-                publisher = UserCommandPublisher(channel)
-                await publisher.publish_create_user_command(data_user)
-            finally:
-                if channel and not channel.is_closed:
-                    await channel.close()
-                    print("RabbitMQ channel closed.")
+            if not settings.OUTBOX_ENABLED:
+                publisher = UserCommandPublisher()
+                command = create_user_command_from(user)
+                if not await publisher.publish_create_user_command(command):
+                    await stage_dropped_create_user_commands(self.db_session, [command])
 
             return exit_json(
                 1,
@@ -53,10 +108,19 @@ class UserServiceHandler:
                     },
                 },
             )
+        except CapacityExceededError:
+            await self.db_session.rollback()
+            raise
         except Exception as e:
-            print("ERROR_REGISTRO", e)
+            logger.error("Error registering user: %s", e)
+            await self.db_session.rollback()
             return exit_json(0, {"success": False, "message": str(e)})
 
+    def _stage_create_user_command(self, user: User):
+        UserCommandOutbox(self.db_session).add_create_user_command(
+            create_user_command_from(user)
+        )
+
     async def get_user_by_id(self, user_id: int):
         """
         Asynchronously retrieves a user by their ID.
@@ -73,5 +137,268 @@ class UserServiceHandler:
             )
             return exit_json(1, {"user": user_map})
         except Exception as e:
-            print("ERROR_CONSULTA", e)
+            logger.error("Error querying users: %s", e)
+            return exit_json(0, {"message": str(e)})
+
+    async def get_users_by_ids(self, user_ids: list[int]):
+        """
+        Asynchronously retrieves many users by their IDs, in request order.
+        """
+        try:
+            use_case = GetUsersByIdsUseCase(self.user_repository)
+            users = await use_case.execute(user_ids)
+
+            users_map = [
+                (
+                    UserFindModel(user_id=user.user_id, name=user.name, email=user.email)
+                    if user is not None
+                    else None
+                )
+                for user in users
+            ]
+            missing = [
+                user_id for user_id, user in zip(user_ids, users) if user is None
+            ]
+            return exit_json(1, {"users": users_map, "missing": missing})
+        except Exception as e:
+            logger.error("Error querying users: %s", e)
+            return exit_json(0, {"message": str(e)})
+
+    async def list_users(
+        self, after_id: Optional[int], limit: int, email_prefix: Optional[str] = None
+    ):
+        """
+        Asynchronously retrieves one page of users and the cursor of the next page.
+        """
+        try:
+            use_case = ListUsersUseCase(self.user_repository)
+            users, next_after_id = await use_case.execute(after_id, limit, email_prefix)
+
+            users_map = [
+                UserFindModel(user_id=user.user_id, name=user.name, email=user.email)
+                for user in users
+            ]
+            next_cursor = None if next_after_id is None else encode_cursor(next_after_id)
+            return exit_json(1, {"users": users_map, "next_cursor": next_cursor})
+        except Exception as e:
+            logger.error("Error listing users: %s", e)
             return exit_json(0, {"message": str(e)})
+
+    async def is_email_available(self, email: str):
+        """
+        Asynchronously checks whether an email is free to register.
+
+        With `USER_EMAIL_FILTER_ENABLED`, most unregistered emails are answered
+        by the email filter without a query.
+        """
+        try:
+            might_exist = (
+                user_email_filter.might_exist if settings.USER_EMAIL_FILTER_ENABLED else None
+            )
+            use_case = IsEmailAvailableUseCase(self.user_repository, might_exist)
+            available = await use_case.execute(email)
+            return exit_json(1, {"email": email, "available": available})
+        except Exception as e:
+            logger.error("Error checking email availability: %s", e)
+            return exit_json(0, {"message": str(e)})
+
+
+class UserSearchServiceHandler:
+    """
+    Handles user search against the in-process search index.
+    """
+
+    def __init__(self, index: UserSearchIndex = user_search_index):
+        """
+        Initializes the UserSearchServiceHandler with a search index.
+        """
+        self.index = index
+
+    def search_users(self, query: str, limit: int):
+        """
+        Retrieves the users best matching a partial name or email.
+
+        `complete` is false when the index is full and may miss users. Raises
+        `IndexNotReadyError` while the index is first being built.
+        """
+        users_map = [
+            UserFindModel(user_id=user_id, name=name, email=email)
+            for user_id, name, email in self.index.search(query, limit)
+        ]
+        return exit_json(1, {"users": users_map, "complete": self.index.complete})
+
+
+USER_EXPORT_COLUMNS = ("user_id", "name", "email")
+
+USER_EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+"""
+Media type of each supported user export format.
+"""
+
+
+class UserExportServiceHandler:
+    """
+    Handles exporting the user table as an NDJSON or CSV byte stream.
+
+    Rows are read from a server-side cursor and encoded `USERS_EXPORT_CHUNK_SIZE`
+    at a time, so memory stays flat regardless of table size. After
+    `USERS_EXPORT_ROWS_PER_TRANSACTION` rows the session is closed and a new one
+    resumes after the last exported ID, so no transaction spans the whole export.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionFactory,
+        chunk_size: Optional[int] = None,
+        rows_per_transaction: Optional[int] = None,
+    ):
+        """
+        Initializes the UserExportServiceHandler with a session factory.
+        """
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.USERS_EXPORT_CHUNK_SIZE
+        self.rows_per_transaction = (
+            rows_per_transaction or settings.USERS_EXPORT_ROWS_PER_TRANSACTION
+        )
+
+    async def export_users(self, export_format: str = "ndjson") -> AsyncIterator[bytes]:
+        """
+        Exports every user in ID order, yielding one encoded chunk at a time.
+        """
+        if export_format not in USER_EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format '{export_format}'.")
+        encode = self._encode_csv if export_format == "csv" else self._encode_ndjson
+        if export_format == "csv":
+            yield encode([USER_EXPORT_COLUMNS])
+
+        after_id = None
+        exported = 0
+        while True:
+            streamed = 0
+            async with self.session_factory() as session:
+                repository = build_user_repository(session)
+                async for rows in repository.stream_users(
+                    after_id, self.chunk_size, self.rows_per_transaction
+                ):
+                    streamed += len(rows)
+                    after_id = rows[-1][0]
+                    yield encode(rows)
+            exported += streamed
+            if streamed < self.rows_per_transaction:
+                break
+        logger.info("Exported %s users as %s.", exported, export_format)
+
+    @staticmethod
+    def _encode_ndjson(rows: list[tuple]) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(USER_EXPORT_COLUMNS, row))) + "\n" for row in rows
+        ).encode("utf-8")
+
+    @staticmethod
+    def _encode_csv(rows: list[tuple]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+class UserBulkServiceHandler:
+    """
+    Handles bulk user registration from a streamed NDJSON body.
+
+    Records are processed in chunks of `BULK_REGISTER_CHUNK_SIZE`, each in its own
+    short-lived session, and a result line is streamed back for every record, so
+    memory stays flat regardless of input size.
+    """
+
+    def __init__(self, session_factory=AsyncSessionFactory, chunk_size: Optional[int] = None):
+        """
+        Initializes the UserBulkServiceHandler with a session factory.
+        """
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.BULK_REGISTER_CHUNK_SIZE
+
+    async def register_users(self, lines: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """
+        Registers every user in an NDJSON byte stream, yielding NDJSON results.
+        """
+        chunk: list[tuple[int, bytes]] = []
+        line_number = 0
+        try:
+            async for line in iter_lines(lines):
+                line_number += 1
+                chunk.append((line_number, line))
+                if len(chunk) >= self.chunk_size:
+                    yield await self._process_chunk(chunk)
+                    chunk = []
+        except ValueError as e:
+            if chunk:
+                yield await self._process_chunk(chunk)
+                chunk = []
+            yield self._encode([{"line": line_number + 1, "status": "invalid", "error": str(e)}])
+        if chunk:
+            yield await self._process_chunk(chunk)
+
+    async def _process_chunk(self, chunk: list[tuple[int, bytes]]) -> bytes:
+        results: list[dict] = []
+        commands: list[tuple[int, UserCreateModel]] = []
+        for line_number, line in chunk:
+            try:
+                commands.append((line_number, UserCreateModel.model_validate_json(line)))
+            except ValidationError as e:
+                error = "; ".join(detail["msg"] for detail in e.errors())
+                results.append({"line": line_number, "status": "invalid", "error": error})
+
+        if commands:
+            try:
+                async with self.session_factory() as session:
+                    use_case = BulkRegisterUsersUseCase(build_user_repository(session))
+                    users = await use_case.execute([command for _, command in commands])
+                    if settings.OUTBOX_ENABLED:
+                        UserCommandOutbox(session).add_create_user_commands(
+                            [create_user_command_from(user) for user in users if user]
+                        )
+                    await session.commit()
+            except Exception as e:
+                logger.error("Error registering users in bulk: %s", e)
+                results.extend(
+                    {"line": line_number, "status": "error", "error": str(e)}
+                    for line_number, _ in commands
+                )
+                return self._encode(results)
+
+            created = []
+            for (line_number, command), user in zip(commands, users):
+                if user is None:
+                    results.append(
+                        {"line": line_number, "status": "duplicate", "email": command.email}
+                    )
+                else:
+                    created.append(create_user_command_from(user))
+                    results.append(
+                        {
+                            "line": line_number,
+                            "status": "created",
+                            "user_id": user.user_id,
+                            "email": user.email,
+                        }
+                    )
+            if not settings.OUTBOX_ENABLED:
+                await self._publish_created(created)
+
+        results.sort(key=lambda result: result["line"])
+        return self._encode(results)
+
+    async def _publish_created(self, commands: list[CreateUserCommand]):
+        if not commands:
+            return
+        try:
+            dropped = await UserCommandPublisher().publish_create_user_commands(commands)
+            if dropped:
+                async with self.session_factory() as session:
+                    await stage_dropped_create_user_commands(session, dropped)
+        except Exception as e:
+            logger.error("Error publishing bulk create user commands: %s", e)
+
+    @staticmethod
+    def _encode(results: list[dict]) -> bytes:
+        return b"".join(json.dumps(result).encode("utf-8") + b"\n" for result in results)
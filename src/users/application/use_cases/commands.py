@@ -1,6 +1,13 @@
+from typing import Callable, Optional
+
+from shared.application.security import hash_passwords_async
 from src.users.domain.repositories import UserRepositoryInterface
 from src.users.domain.user import User
-from src.users.infraestructure.models import UserModel
+from src.users.infraestructure.models import (
+    CreateUserCommand,
+    UserCreateModel,
+    UserModel,
+)
 
 
 class RegisterUserUseCase:
@@ -12,24 +19,110 @@ class RegisterUserUseCase:
     and saves the user to the database.
     """
 
-    def __init__(self, user_repository: UserRepositoryInterface):
+    def __init__(
+        self,
+        user_repository: UserRepositoryInterface,
+        before_save: Optional[Callable[[User], None]] = None,
+    ):
         """
         Initializes the RegisterUserUseCase with a user repository.
+
+        `before_save` is called with the new user once its password is hashed and
+        before it is saved, so callers can stage related rows, such as outbox
+        messages, in the same transaction.
         """
         self.user_repository = user_repository
+        self.before_save = before_save
 
     async def execute(self, command: UserModel) -> User:
         """
         Executes the user creation command.
 
         This method creates a new user after verifying that no user exists with the given email.
-        The password is securely hashed before saving.
+        The password is securely hashed in the hashing pool before saving.
         """
         existing_user = await self.user_repository.get_user_by_email(command.email)
         if existing_user:
             raise ValueError("User with this email already exists.")
 
         new_user = User(name=command.name, email=command.email)
-        new_user.set_password(command.password)
+        await new_user.set_password_async(command.password)
+        if self.before_save is not None:
+            self.before_save(new_user)
         saved_user = await self.user_repository.save_user(new_user)
         return saved_user
+
+
+class BulkRegisterUsersUseCase:
+    """
+    Use case for registering a chunk of new users at once.
+
+    This class checks every email in the chunk with one set-based query, hashes
+    the remaining passwords in parallel and inserts the users with a single
+    multi-row statement. Emails repeated within the chunk are only registered once.
+    """
+
+    def __init__(self, user_repository: UserRepositoryInterface):
+        """
+        Initializes the BulkRegisterUsersUseCase with a user repository.
+        """
+        self.user_repository = user_repository
+
+    async def execute(self, commands: list[UserCreateModel]) -> list[Optional[User]]:
+        """
+        Executes the bulk user creation command.
+
+        Returns one entry per command, in order: the saved user, or `None` when
+        the email was already registered.
+        """
+        candidates = await self._new_candidates(commands)
+        hashes = await hash_passwords_async(
+            [commands[index].password for index in candidates]
+        )
+        return await self._insert(commands, candidates, hashes)
+
+    async def execute_hashed(
+        self, commands: list[CreateUserCommand]
+    ) -> list[Optional[User]]:
+        """
+        Executes bulk user creation for commands that carry a password hash.
+
+        The hashes are stored as they are, so no bcrypt work is repeated. Returns
+        one entry per command, in order, like `execute`.
+        """
+        candidates = await self._new_candidates(commands)
+        hashes = [commands[index].hashed_password for index in candidates]
+        return await self._insert(commands, candidates, hashes)
+
+    async def _new_candidates(self, commands: list[UserModel]) -> list[int]:
+        existing = await self.user_repository.get_existing_emails(
+            list({command.email for command in commands})
+        )
+
+        seen = set(existing)
+        candidates: list[int] = []
+        for index, command in enumerate(commands):
+            if command.email not in seen:
+                seen.add(command.email)
+                candidates.append(index)
+        return candidates
+
+    async def _insert(
+        self, commands: list[UserModel], candidates: list[int], hashes: list[str]
+    ) -> list[Optional[User]]:
+        new_users = {
+            index: User(
+                name=commands[index].name,
+                email=commands[index].email,
+                hashed_password=hashed_password,
+            )
+            for index, hashed_password in zip(candidates, hashes)
+        }
+        inserted = await self.user_repository.insert_users(list(new_users.values()))
+        inserted_ids = {id(user) for user in inserted}
+
+        results: list[Optional[User]] = [None] * len(commands)
+        for index, user in new_users.items():
+            if id(user) in inserted_ids:
+                results[index] = user
+        return results
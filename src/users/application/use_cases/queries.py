@@ -1,3 +1,5 @@
+from typing import Callable, Optional
+
 from src.users.domain.repositories import UserRepositoryInterface
 from src.users.domain.user import User
 
@@ -44,3 +46,123 @@ class GetUserByIdUseCase:
         if not user:
             raise ValueError(f"User with ID {user_id} not found.")
         return user
+
+
+class GetUsersByIdsUseCase:
+    """
+    Use case for retrieving many users by their unique identifiers at once.
+
+    This class fetches every requested user with a single repository call and
+    returns the results in request order, with `None` for each missing user.
+    """
+
+    def __init__(self, user_repository: UserRepositoryInterface):
+        """
+        Initializes the GetUsersByIdsUseCase with a user repository.
+
+        Args:
+            user_repository (UserRepositoryInterface): The repository used for user-related database operations.
+        """
+        self.user_repository = user_repository
+
+    async def execute(self, user_ids: list[int]) -> list[User | None]:
+        """
+        Executes the get users by IDs query.
+
+        Args:
+            user_ids (list[int]): The identifiers to retrieve. Duplicates are queried once.
+
+        Returns:
+            list[User | None]: One entry per requested ID, `None` where no user exists.
+
+        Example:
+            users = await get_users_by_ids_use_case.execute(user_ids=[1, 2, 3])
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        users = await self.user_repository.get_users_by_ids(unique_ids)
+        by_id = {user.user_id: user for user in users}
+        return [by_id.get(user_id) for user_id in user_ids]
+
+
+class ListUsersUseCase:
+    """
+    Use case for listing users one page at a time.
+
+    Pages are ordered by user ID and delimited by the last ID of the previous
+    page. One extra user is fetched to tell whether another page follows.
+    """
+
+    def __init__(self, user_repository: UserRepositoryInterface):
+        """
+        Initializes the ListUsersUseCase with a user repository.
+
+        Args:
+            user_repository (UserRepositoryInterface): The repository used for user-related database operations.
+        """
+        self.user_repository = user_repository
+
+    async def execute(
+        self, after_id: Optional[int], limit: int, email_prefix: Optional[str] = None
+    ) -> tuple[list[User], Optional[int]]:
+        """
+        Executes the list users query.
+
+        Args:
+            after_id (Optional[int]): The last ID of the previous page, or `None` for the first page.
+            limit (int): The page size.
+            email_prefix (Optional[str]): Only list users whose email starts with it.
+
+        Returns:
+            tuple[list[User], Optional[int]]: The page and the ID the next page starts after,
+            `None` on the last page.
+
+        Example:
+            users, next_after_id = await list_users_use_case.execute(after_id=None, limit=50)
+        """
+        users = await self.user_repository.list_users(after_id, limit + 1, email_prefix)
+        if len(users) <= limit:
+            return users, None
+        page = users[:limit]
+        return page, page[-1].user_id
+
+
+class IsEmailAvailableUseCase:
+    """
+    Use case for checking whether an email is free to register.
+
+    When given, `might_exist` answers for emails it rules out without a
+    repository lookup. The answer is only a hint: registration still checks the
+    database for duplicates.
+    """
+
+    def __init__(
+        self,
+        user_repository: UserRepositoryInterface,
+        might_exist: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Initializes the IsEmailAvailableUseCase with a user repository.
+
+        Args:
+            user_repository (UserRepositoryInterface): The repository used for user-related database operations.
+            might_exist (Optional[Callable[[str], bool]]): Returns `False` for emails known to be unregistered.
+        """
+        self.user_repository = user_repository
+        self.might_exist = might_exist
+
+    async def execute(self, email: str) -> bool:
+        """
+        Executes the email availability query.
+
+        Args:
+            email (str): The email to check.
+
+        Returns:
+            bool: Whether no user is registered with the email.
+
+        Example:
+            available = await is_email_available_use_case.execute(email="ada@example.com")
+        """
+        if self.might_exist is not None and not self.might_exist(email):
+            return True
+        return await self.user_repository.get_user_by_email(email) is None
@@ -1,4 +1,5 @@
 from abc import ABCMeta, abstractmethod
+from typing import AsyncIterator, Optional
 
 from src.users.domain.user import User
 
@@ -26,9 +27,51 @@ class UserRepositoryInterface(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[User]:
+        """
+        Retrieve the users matching the given identifiers, in no particular order.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_users(
+        self, after_id: Optional[int], limit: int, email_prefix: Optional[str] = None
+    ) -> list[User]:
+        """
+        Retrieve up to `limit` users with an identifier greater than `after_id`, in identifier order.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream_users(
+        self, after_id: Optional[int], chunk_size: int, limit: Optional[int] = None
+    ) -> AsyncIterator[list[tuple[int, str, str]]]:
+        """
+        Stream `(user_id, name, email)` rows after `after_id` in identifier order, in chunks of `chunk_size`.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def save_user(self, user: User) -> User:
         """
         Save a new user to the system.
         """
         raise NotImplementedError
+
+    @abstractmethod
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """
+        Return the subset of the given emails already registered.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def insert_users(self, users: list[User]) -> list[User]:
+        """
+        Insert many new users at once, skipping emails that already exist.
+
+        Returns the users actually inserted, with their identifiers set. The
+        caller is responsible for committing the transaction.
+        """
+        raise NotImplementedError
@@ -1,7 +1,12 @@
 from passlib.context import CryptContext
 from sqlalchemy import Column, Integer, String
 
-from shared.application.security import get_password_hash, verify_password
+from shared.application.security import (
+    get_password_hash,
+    hash_password_async,
+    verify_password,
+    verify_password_async,
+)
 from src.shared.infrastructure.database import Base
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -14,6 +19,7 @@ class User(Base):
     name: str = Column(String, nullable=False)
     email: str = Column(String, nullable=False, unique=True)
     hashed_password: str = Column(String, nullable=False)
+    token_version: int = Column(Integer, nullable=False, default=0, server_default="0")
 
     def set_password(self, password: str):
         self.hashed_password = get_password_hash(password)
@@ -21,5 +27,14 @@ class User(Base):
     def verify_password(self, password: str) -> bool:
         return verify_password(password, self.hashed_password)
 
+    async def set_password_async(self, password: str):
+        self.hashed_password = await hash_password_async(password)
+
+    async def verify_password_async(self, password: str) -> bool:
+        return await verify_password_async(password, self.hashed_password)
+
+    def revoke_tokens(self):
+        self.token_version = (self.token_version or 0) + 1
+
     def __repr__(self):
         return f"UserMode(id={self.user_id}, email='{self.email}', name='{self.name}')"
@@ -0,0 +1,186 @@
+import logging
+from typing import AsyncIterator, Iterable, Optional
+
+from shared.configuration.config import settings
+from shared.infrastructure.cache import MISSING, TTLCache
+from shared.infrastructure.messaging import get_channel_pool
+from src.users.domain.repositories import UserRepositoryInterface
+from src.users.domain.user import User
+from src.users.infraestructure.repositories import user_from_snapshot, user_snapshot
+from users.infraestructure.email_filter import normalize_email
+from users.infraestructure.messaging import UserCacheInvalidationPublisher
+
+logger = logging.getLogger(__name__)
+
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
+"""
+Process-wide cache of user snapshots shared by every `CachedUserRepository`.
+"""
+
+
+def email_key(email: str) -> tuple[str, str]:
+    """
+    Returns the cache key of an email.
+
+    Keys are normalized like the email filter's, so every spelling of an address
+    shares one entry and invalidating any spelling drops it.
+    """
+    return ("email", normalize_email(email))
+
+
+def invalidate_cached_user(
+    user_id: Optional[int], emails: Iterable[str] = (), cache: TTLCache = user_cache
+):
+    """
+    Drops the cached entries for a user ID and the given email addresses.
+    """
+    if user_id is not None:
+        cached = cache.get(("id", user_id))
+        if cached is not MISSING:
+            cache.delete(email_key(cached["email"]))
+        cache.delete(("id", user_id))
+    for email in emails:
+        cache.delete(email_key(email))
+
+
+async def broadcast_user_invalidation(user_id: Optional[int], emails: list[str]):
+    """
+    Publishes an invalidation event so other workers drop their cached entries.
+
+    Broadcast failures are logged and swallowed; the TTL bounds staleness when
+    the broker is unavailable.
+    """
+    try:
+        async with get_channel_pool().acquire() as channel:
+            publisher = UserCacheInvalidationPublisher(channel)
+            await publisher.publish_invalidation(user_id, emails)
+    except Exception as e:
+        logger.warning("Failed to broadcast cache invalidation for user %s: %s", user_id, e)
+
+
+class CachedUserRepository(UserRepositoryInterface):
+    """
+    Read-through caching decorator for a `UserRepositoryInterface`.
+
+    Lookups by ID and email are served from the process-wide `user_cache` and
+    fall back to the wrapped repository on a miss. Missing emails are cached
+    for a short negative TTL. Email entries are keyed by the normalized address
+    but only answer lookups of the exact spelling they were stored for, since
+    emails are matched exactly by the database. Saving a user invalidates its
+    entries locally and broadcasts the invalidation to the other workers.
+
+    Cached users are returned as fresh detached `User` instances, so requests
+    never share ORM objects.
+    """
+
+    def __init__(
+        self,
+        repository: UserRepositoryInterface,
+        cache: TTLCache = user_cache,
+        negative_ttl_seconds: float = settings.USER_CACHE_NEGATIVE_TTL_SECONDS,
+    ):
+        """
+        Initializes the CachedUserRepository around another repository.
+        """
+        self.repository = repository
+        self.cache = cache
+        self.negative_ttl_seconds = negative_ttl_seconds
+
+    def _store(self, user: User):
+        snapshot = user_snapshot(user)
+        self.cache.set(("id", user.user_id), snapshot)
+        self.cache.set(email_key(user.email), snapshot)
+
+    async def get_user_by_id(self, user_id: int) -> User:
+        """
+        Retrieves a user by ID, from the cache when possible.
+        """
+        cached = self.cache.get(("id", user_id))
+        if cached is not MISSING:
+            return user_from_snapshot(cached)
+        user = await self.repository.get_user_by_id(user_id)
+        if user is not None:
+            self._store(user)
+        return user
+
+    async def get_user_by_email(self, email: str) -> User:
+        """
+        Retrieves a user by email, caching misses for a short negative TTL.
+        """
+        cached = self.cache.get(email_key(email))
+        if cached is not MISSING and cached["email"] == email:
+            return None if cached["user_id"] is None else user_from_snapshot(cached)
+        user = await self.repository.get_user_by_email(email)
+        if user is None:
+            self.cache.set(
+                email_key(email),
+                {"user_id": None, "email": email},
+                ttl_seconds=self.negative_ttl_seconds,
+            )
+        else:
+            self._store(user)
+        return user
+
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[User]:
+        """
+        Retrieves many users by ID, querying only the IDs missing from the cache.
+        """
+        users = []
+        missing = []
+        for user_id in user_ids:
+            cached = self.cache.get(("id", user_id))
+            if cached is MISSING:
+                missing.append(user_id)
+            else:
+                users.append(user_from_snapshot(cached))
+        if missing:
+            for user in await self.repository.get_users_by_ids(missing):
+                self._store(user)
+                users.append(user)
+        return users
+
+    async def list_users(
+        self, after_id: Optional[int], limit: int, email_prefix: Optional[str] = None
+    ) -> list[User]:
+        """
+        Lists users from the wrapped repository; pages are not cached.
+        """
+        return await self.repository.list_users(after_id, limit, email_prefix)
+
+    def stream_users(
+        self, after_id: Optional[int], chunk_size: int, limit: Optional[int] = None
+    ) -> AsyncIterator[list[tuple[int, str, str]]]:
+        """
+        Streams user rows from the wrapped repository, bypassing the cache.
+        """
+        return self.repository.stream_users(after_id, chunk_size, limit)
+
+    async def save_user(self, user: User) -> User:
+        """
+        Saves a user and invalidates its cached entries on every worker.
+        """
+        saved_user = await self.repository.save_user(user)
+        invalidate_cached_user(saved_user.user_id, [saved_user.email], self.cache)
+        await broadcast_user_invalidation(saved_user.user_id, [saved_user.email])
+        return saved_user
+
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """
+        Checks registered emails against the wrapped repository.
+
+        Negative cache entries are short-lived hints, so this always queries.
+        """
+        return await self.repository.get_existing_emails(emails)
+
+    async def insert_users(self, users: list[User]) -> list[User]:
+        """
+        Inserts many users and drops any negative cache entries for their emails.
+        """
+        inserted = await self.repository.insert_users(users)
+        if inserted:
+            emails = [user.email for user in inserted]
+            invalidate_cached_user(None, emails, self.cache)
+            await broadcast_user_invalidation(None, emails)
+        return inserted
@@ -0,0 +1,262 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Iterable, Optional
+
+from shared.configuration.config import settings
+from shared.infrastructure.bloom_filter import BloomFilter
+from shared.infrastructure.metrics import CollectedMetric, Sample, metrics_registry
+from src.shared.infrastructure.database import AsyncSessionFactory
+from src.users.domain.repositories import UserRepositoryInterface
+from src.users.domain.user import User
+from src.users.infraestructure.repositories import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_email(email: str) -> str:
+    """
+    Returns the key an email is filtered by.
+
+    Emails are case-folded, so the filter also covers other spellings of a
+    registered email and a miss rules out every one of them.
+    """
+    return email.strip().casefold()
+
+
+class UserEmailFilter:
+    """
+    Bloom filter of the emails of every registered user.
+
+    The filter is filled by `rebuild`, which streams the user table into a new
+    `BloomFilter` and swaps it in, and kept current by `add_emails`. Emails
+    added while a rebuild runs go into both filters, so none are lost by the
+    swap. Until the first rebuild has finished every email may exist.
+
+    Only `GET /users/email-available` consults the filter, as a hint. The
+    filter is built only once this worker is subscribed to user events, since
+    without them it would miss users registered on other workers.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        """
+        Initializes the UserEmailFilter with its sizing.
+        """
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.filter = BloomFilter(capacity, false_positive_rate)
+        self.started = False
+        self.ready = False
+        self.skipped = 0
+        self.checked = 0
+        self._building: Optional[BloomFilter] = None
+
+    def add_emails(self, emails: Iterable[str]):
+        """
+        Adds registered emails.
+        """
+        if not self.started:
+            return
+        keys = [normalize_email(email) for email in emails]
+        for bloom_filter in (self.filter, self._building):
+            if bloom_filter is not None:
+                for key in keys:
+                    bloom_filter.add(key)
+
+    def might_exist(self, email: str) -> bool:
+        """
+        Returns `False` only if no user is registered with the email.
+        """
+        if not self.ready:
+            return True
+        self.checked += 1
+        if normalize_email(email) in self.filter:
+            return True
+        self.skipped += 1
+        return False
+
+    async def rebuild(
+        self, session_factory=AsyncSessionFactory, chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Rebuilds the filter from a streamed scan of the user table.
+
+        A rebuild requested while one is running is skipped. Returns the
+        number of emails added.
+        """
+        if self._building is not None:
+            logger.info("User email filter rebuild already running.")
+            return len(self._building)
+        self.started = True
+        building = BloomFilter(self.capacity, self.false_positive_rate)
+        self._building = building
+        try:
+            async with session_factory() as session:
+                async for rows in UserRepository(session).stream_users(
+                    None, chunk_size or settings.USERS_EXPORT_CHUNK_SIZE
+                ):
+                    for _, _, email in rows:
+                        building.add(normalize_email(email))
+                    await asyncio.sleep(0)
+        finally:
+            self._building = None
+        self.filter = building
+        self.ready = True
+        if len(building) > self.capacity:
+            logger.warning(
+                "User email filter holds %s emails over its capacity of %s; "
+                "false positives are at %.2f%%.",
+                len(building),
+                self.capacity,
+                100 * building.estimated_false_positive_rate(),
+            )
+        logger.info("User email filter rebuilt with %s emails.", len(building))
+        return len(building)
+
+    def stats(self) -> dict:
+        """
+        Returns the size, load and hit counts of the filter.
+        """
+        return {
+            **self.filter.stats(),
+            "ready": self.ready,
+            "checked": self.checked,
+            "skipped": self.skipped,
+        }
+
+
+user_email_filter = UserEmailFilter(
+    settings.USER_EMAIL_FILTER_CAPACITY, settings.USER_EMAIL_FILTER_FALSE_POSITIVE_RATE
+)
+"""
+Process-wide filter of registered emails.
+"""
+
+
+async def rebuild_user_email_filter():
+    """
+    Rebuilds the process-wide filter, logging failures instead of raising them.
+    """
+    try:
+        await user_email_filter.rebuild()
+    except Exception as e:
+        logger.error("Error rebuilding the user email filter: %s", e)
+
+
+class EmailTrackingUserRepository(UserRepositoryInterface):
+    """
+    Repository decorator keeping the email filter current with saved users.
+
+    Saved and inserted users are added to the filter straight away; an email
+    whose transaction rolls back only costs a false positive. Lookups by email
+    are not answered by the filter: it is only kept current by best-effort
+    broadcasts from the other workers, so a lost broadcast would turn into a
+    false negative. Login and the duplicate check at registration therefore
+    always reach the database, and every method is delegated.
+    """
+
+    def __init__(
+        self, repository: UserRepositoryInterface, email_filter: Optional[UserEmailFilter] = None
+    ):
+        """
+        Initializes the EmailTrackingUserRepository around another repository.
+        """
+        self.repository = repository
+        self.email_filter = email_filter or user_email_filter
+
+    async def get_user_by_id(self, user_id: int) -> User:
+        """
+        Retrieves a user by ID from the wrapped repository.
+        """
+        return await self.repository.get_user_by_id(user_id)
+
+    async def get_user_by_email(self, email: str) -> User:
+        """
+        Retrieves a user by email from the wrapped repository.
+        """
+        return await self.repository.get_user_by_email(email)
+
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[User]:
+        """
+        Retrieves many users by ID from the wrapped repository.
+        """
+        return await self.repository.get_users_by_ids(user_ids)
+
+    async def list_users(
+        self, after_id: Optional[int], limit: int, email_prefix: Optional[str] = None
+    ) -> list[User]:
+        """
+        Lists users through the wrapped repository.
+        """
+        return await self.repository.list_users(after_id, limit, email_prefix)
+
+    def stream_users(
+        self, after_id: Optional[int], chunk_size: int, limit: Optional[int] = None
+    ) -> AsyncIterator[list[tuple[int, str, str]]]:
+        """
+        Streams user rows through the wrapped repository.
+        """
+        return self.repository.stream_users(after_id, chunk_size, limit)
+
+    async def save_user(self, user: User) -> User:
+        """
+        Saves a user through the wrapped repository and adds its email to the filter.
+        """
+        saved_user = await self.repository.save_user(user)
+        self.email_filter.add_emails([saved_user.email])
+        return saved_user
+
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """
+        Checks registered emails through the wrapped repository.
+        """
+        return await self.repository.get_existing_emails(emails)
+
+    async def insert_users(self, users: list[User]) -> list[User]:
+        """
+        Inserts many users and adds their emails to the filter.
+        """
+        inserted = await self.repository.insert_users(users)
+        self.email_filter.add_emails(user.email for user in inserted)
+        return inserted
+
+
+def collect_user_email_filter_metrics() -> list[CollectedMetric]:
+    """
+    Reads the load of the user email filter and how many queries it saved.
+    """
+    stats = user_email_filter.stats()
+    return [
+        CollectedMetric(
+            "user_email_filter_emails",
+            "gauge",
+            "Emails added to the email filter.",
+            [Sample({}, stats["keys"])],
+        ),
+        CollectedMetric(
+            "user_email_filter_bytes",
+            "gauge",
+            "Memory held by the email filter.",
+            [Sample({}, stats["bytes"])],
+        ),
+        CollectedMetric(
+            "user_email_filter_false_positive_rate",
+            "gauge",
+            "Expected false positive rate of the email filter at its current load.",
+            [Sample({}, stats["false_positive_rate"])],
+        ),
+        CollectedMetric(
+            "user_email_filter_checks_total",
+            "counter",
+            "Email availability checks made against the email filter.",
+            [Sample({}, stats["checked"])],
+        ),
+        CollectedMetric(
+            "user_email_filter_skips_total",
+            "counter",
+            "Email availability checks answered by the email filter without a query.",
+            [Sample({}, stats["skipped"])],
+        ),
+    ]
+
+
+metrics_registry.register_collector(collect_user_email_filter_metrics)
@@ -0,0 +1,112 @@
+import asyncio
+from typing import AsyncIterator, Optional
+from weakref import WeakKeyDictionary
+
+from shared.configuration.config import settings
+from shared.infrastructure.dataloader import DataLoader
+from src.shared.infrastructure.database import AsyncSessionFactory
+from src.users.domain.repositories import UserRepositoryInterface
+from src.users.domain.user import User
+from src.users.infraestructure.repositories import (
+    UserRepository,
+    user_from_snapshot,
+    user_snapshot,
+)
+
+_user_loaders: WeakKeyDictionary = WeakKeyDictionary()
+
+
+async def load_user_snapshots(user_ids: list[int]) -> list[dict | None]:
+    """
+    Batch function resolving user IDs with one `WHERE user_id IN (...)` query.
+
+    The query runs on a dedicated session because the IDs come from many
+    concurrent requests, each with its own session.
+    """
+    async with AsyncSessionFactory() as session:
+        users = await UserRepository(session).get_users_by_ids(user_ids)
+    by_id = {user.user_id: user_snapshot(user) for user in users}
+    return [by_id.get(user_id) for user_id in user_ids]
+
+
+def get_user_loader() -> DataLoader[int, dict | None]:
+    """
+    Gets or creates the user loader bound to the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    loader = _user_loaders.get(loop)
+    if loader is None:
+        loader = DataLoader(
+            load_user_snapshots, max_batch_size=settings.USER_LOADER_MAX_BATCH_SIZE
+        )
+        _user_loaders[loop] = loader
+    return loader
+
+
+class BatchingUserRepository(UserRepositoryInterface):
+    """
+    Repository decorator that coalesces `get_user_by_id` calls across requests.
+
+    Lookups by ID go through the per-loop `DataLoader`, so a burst of concurrent
+    requests is served by a single query. Every other method is delegated to
+    the wrapped repository.
+    """
+
+    def __init__(self, repository: UserRepositoryInterface):
+        """
+        Initializes the BatchingUserRepository around another repository.
+        """
+        self.repository = repository
+
+    async def get_user_by_id(self, user_id: int) -> User:
+        """
+        Retrieves a user by ID through the shared batching loader.
+        """
+        snapshot = await get_user_loader().load(user_id)
+        return None if snapshot is None else user_from_snapshot(snapshot)
+
+    async def get_user_by_email(self, email: str) -> User:
+        """
+        Retrieves a user by email from the wrapped repository.
+        """
+        return await self.repository.get_user_by_email(email)
+
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[User]:
+        """
+        Retrieves many users by ID from the wrapped repository.
+        """
+        return await self.repository.get_users_by_ids(user_ids)
+
+    async def list_users(
+        self, after_id: Optional[int], limit: int, email_prefix: Optional[str] = None
+    ) -> list[User]:
+        """
+        Lists users through the wrapped repository.
+        """
+        return await self.repository.list_users(after_id, limit, email_prefix)
+
+    def stream_users(
+        self, after_id: Optional[int], chunk_size: int, limit: Optional[int] = None
+    ) -> AsyncIterator[list[tuple[int, str, str]]]:
+        """
+        Streams user rows through the wrapped repository.
+        """
+        return self.repository.stream_users(after_id, chunk_size, limit)
+
+    async def save_user(self, user: User) -> User:
+        """
+        Saves a user through the wrapped repository.
+        """
+        return await self.repository.save_user(user)
+
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """
+        Checks registered emails through the wrapped repository.
+        """
+        return await self.repository.get_existing_emails(emails)
+
+    async def insert_users(self, users: list[User]) -> list[User]:
+        """
+        Inserts many users through the wrapped repository.
+        """
+        return await self.repository.insert_users(users)
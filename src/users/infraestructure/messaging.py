@@ -1,10 +1,129 @@
-from aio_pika import Message
+import json
+import logging
+from typing import Optional, Union
+
+from aio_pika import ExchangeType, Message
 from aio_pika.abc import AbstractRobustChannel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.configuration.config import settings
+from shared.infrastructure.codecs import (
+    JSON_CONTENT_TYPE,
+    SCHEMA_VERSION_HEADER,
+    CodecRegistry,
+    JsonRecordCodec,
+    RecordCodec,
+    StructRecordCodec,
+)
+from shared.infrastructure.messaging import (
+    BufferedPublisher,
+    get_buffered_publisher,
+    partition_for_key,
+)
+from shared.infrastructure.outbox import stage_outbox_message
+from src.users.domain.user import User
+from src.users.infraestructure.models import CreateUserCommand, UserCreateModel
 
-from src.users.infraestructure.models import UserCreateModel
+logger = logging.getLogger(__name__)
 
 USER_COMMAND_EXCHANGE = "user_commands_exchange"
 CREATE_USER_ROUTING_KEY = "user.command.create"
+USER_CACHE_EXCHANGE = "user_cache_invalidation_exchange"
+USER_EVENTS_EXCHANGE = "user_events_exchange"
+USERS_CREATED_EVENT = "users_created"
+SEARCH_INDEX_REBUILD_EVENT = "search_index_rebuild"
+TOKEN_VERSION_EXCHANGE = "token_versions_exchange"
+CREATE_USER_STRUCT_CONTENT_TYPE = "application/vnd.users.create-user+struct"
+
+USER_EXCHANGE_DECLARATIONS = {USER_COMMAND_EXCHANGE: {"type": ExchangeType.DIRECT}}
+"""
+Arguments used to declare the user command exchange before publishing to it.
+"""
+
+
+def create_user_partition(email: str, partitions: Optional[int] = None) -> int:
+    """
+    Returns the partition that carries the create user commands for an email.
+
+    Every command for the same email lands on the same partition queue, which has
+    a single active consumer, so commands for a user are handled in order.
+    """
+    return partition_for_key(
+        email.lower(), partitions or settings.USER_COMMAND_PARTITIONS
+    )
+
+
+def create_user_routing_key(partition: int) -> str:
+    """
+    Returns the routing key of a create user command partition.
+    """
+    return f"{CREATE_USER_ROUTING_KEY}.{partition}"
+
+
+CREATE_USER_CODECS = CodecRegistry(
+    JsonRecordCodec(),
+    StructRecordCodec(
+        CREATE_USER_STRUCT_CONTENT_TYPE,
+        ("name", "email", "hashed_password"),
+        compress_min_bytes=settings.MESSAGE_COMPRESSION_MIN_BYTES,
+    ),
+)
+"""
+Codecs the create user consumer accepts, negotiated by content type.
+"""
+
+
+def get_create_user_codec() -> RecordCodec:
+    """
+    Returns the codec create user commands are published with.
+    """
+    if settings.USER_COMMAND_CODEC == "json":
+        return CREATE_USER_CODECS.for_content_type(JSON_CONTENT_TYPE)
+    return CREATE_USER_CODECS.for_content_type(CREATE_USER_STRUCT_CONTENT_TYPE)
+
+
+def encode_create_user_commands(
+    commands: list[CreateUserCommand],
+) -> tuple[bytes, str, dict]:
+    """
+    Serializes create user commands into one message body.
+
+    Returns the body, its content type and the schema version headers.
+    """
+    codec = get_create_user_codec()
+    body = codec.encode([command.model_dump() for command in commands])
+    return body, codec.content_type, {SCHEMA_VERSION_HEADER: codec.version}
+
+
+def decode_create_user_commands(
+    body: bytes, content_type: Optional[str], headers: Optional[dict] = None
+) -> list[Union[CreateUserCommand, UserCreateModel]]:
+    """
+    Deserializes the create user commands of a message.
+
+    Messages published before commands carried a password hash decode into
+    `UserCreateModel` with the plaintext password. Raises `ValueError` for
+    unsupported content types, schema versions or malformed bodies.
+    """
+    commands = []
+    for record in CREATE_USER_CODECS.decode(body, content_type, headers):
+        if "hashed_password" in record:
+            commands.append(CreateUserCommand.model_validate(record))
+        else:
+            commands.append(UserCreateModel.model_validate(record))
+    return commands
+
+
+def group_by_partition(
+    commands: list[CreateUserCommand],
+) -> dict[int, list[CreateUserCommand]]:
+    """
+    Groups create user commands by the partition of their email, keeping order.
+    """
+    groups: dict[int, list[CreateUserCommand]] = {}
+    for command in commands:
+        groups.setdefault(create_user_partition(command.email), []).append(command)
+    return groups
 
 
 class UserCommandPublisher:
@@ -13,32 +132,195 @@ class UserCommandPublisher:
 
     This class is responsible for sending messages to the RabbitMQ exchange
     for user commands, specifically the command to create a new user.
-    It uses the aio-pika library for asynchronous communication with RabbitMQ.
+    Messages are handed to a `BufferedPublisher`, so callers only wait for the
+    message to be buffered, not for the broker round trip.
     """
 
-    def __init__(self, channel: AbstractRobustChannel):
+    def __init__(self, publisher: Optional[BufferedPublisher] = None):
         """
         Initializes the UserCommandPublisher.
         """
-        self.channel = channel
+        self.publisher = publisher or get_buffered_publisher()
+        for exchange_name, declaration in USER_EXCHANGE_DECLARATIONS.items():
+            self.publisher.register_exchange(exchange_name, **declaration)
 
-    async def publish_create_user_command(self, command: UserCreateModel):
+    async def publish_create_user_command(self, command: CreateUserCommand) -> bool:
         """
         Publishes a create user command message to RabbitMQ.
 
-        This method takes a `UserCreateModel` command object, serializes it to JSON,
-        and publishes it to RabbitMQ using the default exchange and specified routing key.
-        The message is marked as persistent with delivery mode 2.
+        The command is encoded with the configured codec and enqueued for the user
+        command exchange with the routing key of the email's partition. The
+        message is marked as persistent. Returns `False` if the publisher dropped
+        the message because its buffer was full.
+        """
+        return not await self.publish_create_user_commands([command])
+
+    async def publish_create_user_commands(
+        self, commands: list[CreateUserCommand]
+    ) -> list[CreateUserCommand]:
+        """
+        Publishes create user commands as one message per partition.
+
+        Returns the commands whose message the publisher dropped, so the caller
+        can deliver them another way.
+        """
+        dropped: list[CreateUserCommand] = []
+        for partition, group in group_by_partition(commands).items():
+            body, content_type, headers = encode_create_user_commands(group)
+            logger.debug("Publishing %s CreateUserCommand to partition %s.", len(group), partition)
+            published = await self.publisher.publish(
+                USER_COMMAND_EXCHANGE,
+                create_user_routing_key(partition),
+                body,
+                content_type=content_type,
+                headers=headers,
+            )
+            if not published:
+                dropped.extend(group)
+        return dropped
+
+
+class UserCommandOutbox:
+    """
+    Stages user commands in the transactional outbox.
+
+    Commands added here are written by the session's next commit, together with
+    the user rows they describe, and published later by the outbox relay.
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Initializes the UserCommandOutbox with a database session.
         """
-        message_body = command.model_dump_json().encode("utf-8")
+        self.session = session
+
+    def add_create_user_command(self, command: CreateUserCommand):
+        """
+        Stages a create user command for the user command exchange, routed to
+        the partition of its email.
+        """
+        self.add_create_user_commands([command])
+
+    def add_create_user_commands(self, commands: list[CreateUserCommand]):
+        """
+        Stages create user commands as one message per partition.
+        """
+        for partition, group in group_by_partition(commands).items():
+            body, content_type, headers = encode_create_user_commands(group)
+            stage_outbox_message(
+                self.session,
+                USER_COMMAND_EXCHANGE,
+                create_user_routing_key(partition),
+                body,
+                content_type=content_type,
+                headers=headers,
+            )
+
 
-        print(f"Publishing CreateUserCommand for email {command.email} to RabbitMQ.")
-        await self.channel.default_exchange.publish(
-            Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=2,
-            ),
-            routing_key=CREATE_USER_ROUTING_KEY,
+def create_user_command_from(user: User) -> CreateUserCommand:
+    """
+    Builds the create user command of a user whose password is already hashed.
+    """
+    return CreateUserCommand(
+        name=user.name, email=user.email, hashed_password=user.hashed_password
+    )
+
+
+class UserCacheInvalidationPublisher:
+    """
+    Broadcasts user cache invalidation events to every worker.
+
+    Events are published to a fanout exchange, so each worker's exclusive queue
+    receives a copy and drops its cached entries for the user.
+    """
+
+    def __init__(self, channel: AbstractRobustChannel):
+        """
+        Initializes the UserCacheInvalidationPublisher.
+        """
+        self.channel = channel
+
+    async def publish_invalidation(self, user_id: Optional[int], emails: list[str]):
+        """
+        Publishes an invalidation event for a user ID and its email addresses.
+
+        `user_id` may be `None` to invalidate by email only.
+        """
+        exchange = await self.channel.declare_exchange(
+            USER_CACHE_EXCHANGE, type=ExchangeType.FANOUT
+        )
+        body = json.dumps({"user_id": user_id, "emails": emails}).encode("utf-8")
+        await exchange.publish(
+            Message(body=body, content_type="application/json"), routing_key=""
+        )
+
+
+class TokenVersionPublisher:
+    """
+    Broadcasts token version bumps to every worker.
+
+    Bumps are published to a fanout exchange, so each worker's exclusive queue
+    receives a copy and rejects the revoked tokens.
+    """
+
+    def __init__(self, channel: AbstractRobustChannel):
+        """
+        Initializes the TokenVersionPublisher.
+        """
+        self.channel = channel
+
+    async def publish_token_version(self, user_id: int, version: int):
+        """
+        Publishes the new token version of a user whose tokens were revoked.
+        """
+        exchange = await self.channel.declare_exchange(
+            TOKEN_VERSION_EXCHANGE, type=ExchangeType.FANOUT
+        )
+        body = json.dumps({"user_id": user_id, "version": version}).encode("utf-8")
+        await exchange.publish(
+            Message(body=body, content_type="application/json"), routing_key=""
+        )
+
+
+class UserEventPublisher:
+    """
+    Broadcasts user events to every worker.
+
+    Events are published to a fanout exchange as JSON objects with an `event`
+    field, so each worker's exclusive queue receives a copy.
+    """
+
+    def __init__(self, channel: AbstractRobustChannel):
+        """
+        Initializes the UserEventPublisher.
+        """
+        self.channel = channel
+
+    async def _publish(self, payload: dict):
+        exchange = await self.channel.declare_exchange(
+            USER_EVENTS_EXCHANGE, type=ExchangeType.FANOUT
+        )
+        body = json.dumps(payload).encode("utf-8")
+        await exchange.publish(
+            Message(body=body, content_type="application/json"), routing_key=""
         )
-        print("CreateUserCommand published successfully.")
+
+    async def publish_users_created(self, users: list[tuple[int, str, str]]):
+        """
+        Publishes the `(user_id, name, email)` of newly created users.
+        """
+        await self._publish(
+            {
+                "event": USERS_CREATED_EVENT,
+                "users": [
+                    {"user_id": user_id, "name": name, "email": email}
+                    for user_id, name, email in users
+                ],
+            }
+        )
+
+    async def publish_search_index_rebuild(self):
+        """
+        Asks every worker to rebuild its user search index.
+        """
+        await self._publish({"event": SEARCH_INDEX_REBUILD_EVENT})
@@ -12,3 +12,11 @@ class UserFindModel(UserModel):
 
 class UserCreateModel(UserModel):
     password: str
+
+
+class CreateUserCommand(UserModel):
+    hashed_password: str
+
+
+class UserIdsModel(BaseModel):
+    user_ids: list[int]
@@ -1,9 +1,35 @@
+import logging
+from typing import AsyncIterator, Optional
+
 from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from src.users.domain.repositories import UserRepositoryInterface
 from src.users.domain.user import User
 
+logger = logging.getLogger(__name__)
+
+
+def user_snapshot(user: User) -> dict:
+    """
+    Captures the column values of a user as a plain dictionary.
+    """
+    return {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+
+
+def user_from_snapshot(snapshot: dict) -> User:
+    """
+    Rebuilds a detached `User` from a snapshot without touching the database.
+
+    Each call returns a new instance, so snapshots can be shared between
+    requests without sharing ORM objects.
+    """
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
 
 class UserRepository(UserRepositoryInterface):
     """
@@ -40,7 +66,7 @@ class UserRepository(UserRepositoryInterface):
         """
         result = await self.db_session.execute(select(User).where(User.email == email))
         user = result.scalar_one_or_none()
-        print(f"SQLAlchemy: Fetching user with email {email} from database.")
+        logger.debug("SQLAlchemy: Fetching user with email %s from database.", email)
         return user
 
     async def get_user_by_id(self, user_id: int) -> User:
@@ -60,14 +86,157 @@ class UserRepository(UserRepositoryInterface):
             select(User).where(User.user_id == user_id)
         )
         user = result.scalar_one_or_none()
-        print(f"SQLAlchemy: Fetching user with ID {user_id} from database.")
+        logger.debug("SQLAlchemy: Fetching user with ID %s from database.", user_id)
         return user
 
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[User]:
+        """
+        Retrieves the users matching the given IDs with a single query.
+
+        Args:
+            user_ids (list[int]): The unique identifiers of the users to retrieve. :no-index:
+
+        Returns:
+            list[User]: The users found, in no particular order. Missing IDs are omitted.
+        """
+        if not user_ids:
+            return []
+        result = await self.db_session.execute(
+            select(User).where(User.user_id.in_(user_ids))
+        )
+        users = list(result.scalars().all())
+        logger.debug("SQLAlchemy: Fetching %s users by ID from database.", len(user_ids))
+        return users
+
+    async def list_users(
+        self, after_id: Optional[int], limit: int, email_prefix: Optional[str] = None
+    ) -> list[User]:
+        """
+        Retrieves one page of users ordered by ID with keyset pagination.
+
+        The page starts right after `after_id` with `WHERE user_id > :after_id
+        ORDER BY user_id LIMIT :limit`, which walks the primary key index, so
+        every page costs the same however deep it is.
+
+        Args:
+            after_id (Optional[int]): The last ID of the previous page, or `None` for the first page. :no-index:
+            limit (int): The maximum number of users to return. :no-index:
+            email_prefix (Optional[str]): Only return users whose email starts with it. :no-index:
+
+        Returns:
+            list[User]: Up to `limit` users in ascending ID order.
+        """
+        statement = select(User).order_by(User.user_id).limit(limit)
+        if after_id is not None:
+            statement = statement.where(User.user_id > after_id)
+        if email_prefix:
+            statement = statement.where(User.email.startswith(email_prefix, autoescape=True))
+        result = await self.db_session.execute(statement)
+        users = list(result.scalars().all())
+        logger.debug("SQLAlchemy: Listing %s users after ID %s from database.", len(users), after_id)
+        return users
+
+    async def stream_users(
+        self, after_id: Optional[int], chunk_size: int, limit: Optional[int] = None
+    ) -> AsyncIterator[list[tuple[int, str, str]]]:
+        """
+        Streams user rows from a server-side cursor, `chunk_size` rows at a time.
+
+        Only the exported columns are selected, never `hashed_password`, and rows
+        are plain tuples, so no ORM objects pile up in the session. The cursor
+        stays open, and so does the session's transaction, until the stream is
+        exhausted or closed.
+
+        Args:
+            after_id (Optional[int]): Only stream users with a greater ID, or all users if `None`. :no-index:
+            chunk_size (int): The number of rows fetched and yielded at a time. :no-index:
+            limit (Optional[int]): The maximum number of rows to stream. :no-index:
+
+        Yields:
+            list[tuple[int, str, str]]: `(user_id, name, email)` rows in ascending ID order.
+        """
+        statement = (
+            select(User.user_id, User.name, User.email)
+            .order_by(User.user_id)
+            .execution_options(yield_per=chunk_size)
+        )
+        if after_id is not None:
+            statement = statement.where(User.user_id > after_id)
+        if limit is not None:
+            statement = statement.limit(limit)
+        result = await self.db_session.stream(statement)
+        try:
+            async for partition in result.partitions():
+                yield [tuple(row) for row in partition]
+        finally:
+            await result.close()
+
     async def save_user(self, user: User) -> User:
         """
         Saves a user entity to the database.
         """
         self.db_session.add(user)
         await self.db_session.commit()
-        print(f"SQLAlchemy: User {user.user_id} saved to database.")
+        logger.debug("SQLAlchemy: User %s saved to database.", user.user_id)
         return user
+
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """
+        Returns the emails from the given list that are already registered.
+
+        Args:
+            emails (list[str]): The email addresses to check. :no-index:
+
+        Returns:
+            set[str]: The registered emails, found with a single `IN` query.
+        """
+        if not emails:
+            return set()
+        result = await self.db_session.execute(
+            select(User.email).where(User.email.in_(emails))
+        )
+        return set(result.scalars().all())
+
+    async def insert_users(self, users: list[User]) -> list[User]:
+        """
+        Inserts many users with one multi-row `INSERT ... ON CONFLICT DO NOTHING`.
+
+        The insert is not committed, so the caller can write related rows, such as
+        outbox messages, in the same transaction before committing.
+
+        Args:
+            users (list[User]): Transient users with their password already hashed. :no-index:
+
+        Returns:
+            list[User]: The users actually inserted, with `user_id` populated.
+            Users whose email already exists are left out.
+        """
+        if not users:
+            return []
+        dialect = sqlite if self.db_session.bind.dialect.name == "sqlite" else postgresql
+        statement = (
+            dialect.insert(User)
+            .values(
+                [
+                    {
+                        "name": user.name,
+                        "email": user.email,
+                        "hashed_password": user.hashed_password,
+                    }
+                    for user in users
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.user_id, User.email)
+        )
+        result = await self.db_session.execute(statement)
+        inserted_ids = {email: user_id for user_id, email in result.all()}
+
+        inserted = []
+        for user in users:
+            if user.email in inserted_ids:
+                user.user_id = inserted_ids.pop(user.email)
+                user.token_version = 0
+                inserted.append(user)
+        logger.debug("SQLAlchemy: Inserted %s of %s users.", len(inserted), len(users))
+        return inserted
@@ -0,0 +1,32 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.configuration.config import settings
+from src.users.domain.repositories import UserRepositoryInterface
+from src.users.infraestructure.repositories import UserRepository
+from users.infraestructure.cached_repositories import CachedUserRepository
+from users.infraestructure.email_filter import EmailTrackingUserRepository
+from users.infraestructure.loaders import BatchingUserRepository
+from users.infraestructure.search import IndexedUserRepository
+
+
+def build_user_repository(db_session: AsyncSession) -> UserRepositoryInterface:
+    """
+    Builds the user repository for a session with the configured decorators.
+
+    Lookups go through the cache first, when `USER_CACHE_ENABLED` is set, and
+    cache misses by ID are coalesced by the batching loader, when
+    `USER_LOADER_ENABLED` is set. Saved users are added to the email filter,
+    when `USER_EMAIL_FILTER_ENABLED` is set, and to the search index, when
+    `USER_SEARCH_ENABLED` is set, and new users are broadcast to the other
+    workers whenever either is on.
+    """
+    repository: UserRepositoryInterface = UserRepository(db_session)
+    if settings.USER_LOADER_ENABLED:
+        repository = BatchingUserRepository(repository)
+    if settings.USER_SEARCH_ENABLED or settings.USER_EMAIL_FILTER_ENABLED:
+        repository = IndexedUserRepository(repository, db_session)
+    if settings.USER_CACHE_ENABLED:
+        repository = CachedUserRepository(repository)
+    if settings.USER_EMAIL_FILTER_ENABLED:
+        repository = EmailTrackingUserRepository(repository)
+    return repository
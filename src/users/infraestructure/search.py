@@ -0,0 +1,298 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from shared.configuration.config import settings
+from shared.domain.base_errores import IndexNotReadyError
+from shared.infrastructure.messaging import get_channel_pool
+from shared.infrastructure.metrics import CollectedMetric, Sample, metrics_registry
+from shared.infrastructure.search_index import NGramIndex
+from src.shared.infrastructure.database import AsyncSessionFactory
+from src.users.domain.repositories import UserRepositoryInterface
+from src.users.domain.user import User
+from src.users.infraestructure.repositories import UserRepository
+from users.infraestructure.messaging import UserEventPublisher
+
+logger = logging.getLogger(__name__)
+
+PENDING_USERS_KEY = "user_search_pending"
+"""
+Session `info` key holding users inserted but not yet committed.
+"""
+
+UserRow = tuple[int, str, str]
+
+
+class UserSearchIndex:
+    """
+    In-process n-gram index over the names and emails of users.
+
+    The index is filled by `rebuild`, which streams the user table into a new
+    `NGramIndex` and swaps it in, and kept current by `index_users`. Users
+    indexed while a rebuild runs go into both indexes, so none are lost by
+    the swap. Until `rebuild` is first called, `index_users` does nothing, so
+    processes that never search, such as consumers, hold no index.
+    """
+
+    def __init__(self, max_users: int, max_candidates: int):
+        """
+        Initializes the UserSearchIndex with its size bounds.
+        """
+        self.max_users = max_users
+        self.max_candidates = max_candidates
+        self.index = NGramIndex(max_users, max_candidates)
+        self.started = False
+        self.ready = False
+        self._building: Optional[NGramIndex] = None
+
+    @property
+    def complete(self) -> bool:
+        """
+        Whether every user fitted in the index.
+        """
+        return self.index.rejected == 0
+
+    def index_users(self, users: list[UserRow]):
+        """
+        Adds or updates `(user_id, name, email)` rows.
+        """
+        if not self.started:
+            return
+        for index in (self.index, self._building):
+            if index is not None:
+                for user_id, name, email in users:
+                    index.add(user_id, (name, email))
+
+    def search(self, query: str, limit: int) -> list[UserRow]:
+        """
+        Returns up to `limit` ranked `(user_id, name, email)` matches.
+
+        Raises `IndexNotReadyError` until the first rebuild has finished.
+        """
+        if not self.ready:
+            raise IndexNotReadyError("The user search index is still being built.")
+        return [(user_id, *fields) for user_id, fields in self.index.search(query, limit)]
+
+    async def rebuild(
+        self, session_factory=AsyncSessionFactory, chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Rebuilds the index from a streamed scan of the user table.
+
+        At most `max_users` users are read, plus one to detect overflow. A
+        rebuild requested while one is running is skipped. Returns the number
+        of users indexed.
+        """
+        if self._building is not None:
+            logger.info("User search index rebuild already running.")
+            return len(self._building)
+        self.started = True
+        building = NGramIndex(self.max_users, self.max_candidates)
+        self._building = building
+        try:
+            async with session_factory() as session:
+                async for rows in UserRepository(session).stream_users(
+                    None, chunk_size or settings.USERS_EXPORT_CHUNK_SIZE, self.max_users + 1
+                ):
+                    for user_id, name, email in rows:
+                        building.add(user_id, (name, email))
+                    await asyncio.sleep(0)
+        finally:
+            self._building = None
+        self.index = building
+        self.ready = True
+        if building.rejected:
+            logger.warning(
+                "User search index is full at %s users; searches may miss users.", self.max_users
+            )
+        logger.info("User search index rebuilt with %s users.", len(building))
+        return len(building)
+
+    def stats(self) -> dict:
+        """
+        Returns the size and state of the index.
+        """
+        return {**self.index.stats(), "ready": self.ready}
+
+
+user_search_index = UserSearchIndex(
+    settings.USER_SEARCH_MAX_USERS, settings.USER_SEARCH_MAX_CANDIDATES
+)
+"""
+Process-wide user search index served by `GET /users/search`.
+"""
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+def spawn(coroutine) -> asyncio.Task:
+    """
+    Runs a coroutine in the background, keeping a reference until it finishes.
+    """
+    task = asyncio.get_running_loop().create_task(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def rebuild_user_search_index():
+    """
+    Rebuilds the process-wide index, logging failures instead of raising them.
+    """
+    try:
+        await user_search_index.rebuild()
+    except Exception as e:
+        logger.error("Error rebuilding the user search index: %s", e)
+
+
+async def broadcast_users_created(users: list[UserRow]):
+    """
+    Publishes a users created event so other workers index the users.
+
+    Broadcast failures are logged and swallowed; the next rebuild picks the
+    users up.
+    """
+    try:
+        async with get_channel_pool().acquire() as channel:
+            await UserEventPublisher(channel).publish_users_created(users)
+    except Exception as e:
+        logger.warning("Failed to broadcast %s created users: %s", len(users), e)
+
+
+def users_created(users: list[UserRow]):
+    """
+    Indexes committed users locally and broadcasts them to the other workers.
+    """
+    user_search_index.index_users(users)
+    spawn(broadcast_users_created(users))
+
+
+@event.listens_for(Session, "after_commit")
+def _index_committed_users(session: Session):
+    users = session.info.pop(PENDING_USERS_KEY, None)
+    if users:
+        users_created(users)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_users(session: Session):
+    session.info.pop(PENDING_USERS_KEY, None)
+
+
+class IndexedUserRepository(UserRepositoryInterface):
+    """
+    Repository decorator that keeps the user search index current.
+
+    Users saved through `save_user` are indexed once saved. Users added with
+    `insert_users` are held on the session until it commits, so users whose
+    transaction rolls back are never indexed. Either way new users are
+    broadcast to the other workers; updates of existing users, such as token
+    revocations, only refresh the local index. Every other method is delegated.
+    """
+
+    def __init__(self, repository: UserRepositoryInterface, db_session: AsyncSession):
+        """
+        Initializes the IndexedUserRepository around another repository.
+        """
+        self.repository = repository
+        self.db_session = db_session
+
+    async def get_user_by_id(self, user_id: int) -> User:
+        """
+        Retrieves a user by ID from the wrapped repository.
+        """
+        return await self.repository.get_user_by_id(user_id)
+
+    async def get_user_by_email(self, email: str) -> User:
+        """
+        Retrieves a user by email from the wrapped repository.
+        """
+        return await self.repository.get_user_by_email(email)
+
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[User]:
+        """
+        Retrieves many users by ID from the wrapped repository.
+        """
+        return await self.repository.get_users_by_ids(user_ids)
+
+    async def list_users(
+        self, after_id: Optional[int], limit: int, email_prefix: Optional[str] = None
+    ) -> list[User]:
+        """
+        Lists users through the wrapped repository.
+        """
+        return await self.repository.list_users(after_id, limit, email_prefix)
+
+    def stream_users(
+        self, after_id: Optional[int], chunk_size: int, limit: Optional[int] = None
+    ) -> AsyncIterator[list[UserRow]]:
+        """
+        Streams user rows through the wrapped repository.
+        """
+        return self.repository.stream_users(after_id, chunk_size, limit)
+
+    async def save_user(self, user: User) -> User:
+        """
+        Saves a user through the wrapped repository and indexes it.
+
+        Only a user inserted by the save, one without an ID before it, is
+        broadcast to the other workers.
+        """
+        is_new = user.user_id is None
+        saved_user = await self.repository.save_user(user)
+        row = (saved_user.user_id, saved_user.name, saved_user.email)
+        if is_new:
+            users_created([row])
+        else:
+            user_search_index.index_users([row])
+        return saved_user
+
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """
+        Checks registered emails through the wrapped repository.
+        """
+        return await self.repository.get_existing_emails(emails)
+
+    async def insert_users(self, users: list[User]) -> list[User]:
+        """
+        Inserts many users and indexes them once the session commits.
+        """
+        inserted = await self.repository.insert_users(users)
+        if inserted:
+            pending = self.db_session.sync_session.info.setdefault(PENDING_USERS_KEY, [])
+            pending.extend((user.user_id, user.name, user.email) for user in inserted)
+        return inserted
+
+
+def collect_user_search_metrics() -> list[CollectedMetric]:
+    """
+    Reads the size of the user search index.
+    """
+    stats = user_search_index.stats()
+    return [
+        CollectedMetric(
+            "user_search_index_users",
+            "gauge",
+            "Users held in the search index.",
+            [Sample({}, stats["documents"])],
+        ),
+        CollectedMetric(
+            "user_search_index_postings",
+            "gauge",
+            "Entries across the posting lists of the search index.",
+            [Sample({}, stats["postings"])],
+        ),
+        CollectedMetric(
+            "user_search_index_rejected",
+            "gauge",
+            "Users left out of the search index because it is full.",
+            [Sample({}, stats["rejected"])],
+        ),
+    ]
+
+
+metrics_registry.register_collector(collect_user_search_metrics)
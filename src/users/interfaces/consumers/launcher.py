@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from typing import Optional
+
+from shared.configuration.config import settings
+from shared.infrastructure.logger import configure_logging, shutdown_logging
+from users.interfaces.consumers.user_consumer import consume_create_user_commands
+
+logger = logging.getLogger(__name__)
+
+
+def assign_partitions(partitions: int, workers: int) -> list[list[int]]:
+    """
+    Spreads the create user partitions round-robin over a number of workers.
+
+    Every partition is assigned to exactly one worker. Workers beyond the number
+    of partitions would stay idle, so at most `partitions` groups are returned.
+    """
+    workers = max(1, min(workers, partitions))
+    return [list(range(worker, partitions, workers)) for worker in range(workers)]
+
+
+def run_worker(partitions: list[int]):
+    """
+    Entry point of a consumer worker process.
+    """
+    configure_logging()
+    logger.info("Consumer worker started for partitions %s.", partitions)
+    try:
+        asyncio.run(consume_create_user_commands(partitions))
+    finally:
+        shutdown_logging()
+
+
+class ConsumerLauncher:
+    """
+    Runs the create user consumers in one process per group of partitions.
+
+    Each worker process owns its partitions, so throughput scales across cores
+    while every partition keeps a single consumer. Workers that exit unexpectedly
+    are restarted. On SIGTERM or SIGINT the signal is forwarded to every worker,
+    which drains its in-flight messages before exiting.
+    """
+
+    def __init__(
+        self,
+        partitions: Optional[int] = None,
+        workers: Optional[int] = None,
+        restart_delay: float = 1,
+    ):
+        """
+        Initializes the ConsumerLauncher with the partition and worker counts.
+        """
+        self.partitions = partitions or settings.USER_COMMAND_PARTITIONS
+        self.assignments = assign_partitions(
+            self.partitions,
+            workers or settings.USER_CONSUMER_WORKERS or self.partitions,
+        )
+        self.restart_delay = restart_delay
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: list[Optional[multiprocessing.Process]] = [None] * len(
+            self.assignments
+        )
+        self._stopping = False
+
+    def _spawn(self, index: int):
+        process = self._context.Process(
+            target=run_worker,
+            args=(self.assignments[index],),
+            name=f"user-consumer-{index}",
+        )
+        process.start()
+        self._processes[index] = process
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+
+    def run(self):
+        """
+        Starts the workers and supervises them until a stop signal is received.
+        """
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        for index in range(len(self.assignments)):
+            self._spawn(index)
+        logger.info(
+            "Started %s consumer workers for %s partitions.",
+            len(self.assignments),
+            self.partitions,
+        )
+
+        while not self._stopping:
+            time.sleep(self.restart_delay)
+            for index, process in enumerate(self._processes):
+                if self._stopping or process.is_alive():
+                    continue
+                logger.warning(
+                    "Consumer worker %s exited with code %s, restarting.",
+                    process.name,
+                    process.exitcode,
+                )
+                self._spawn(index)
+
+        for process in self._processes:
+            process.join()
+        logger.info("All consumer workers stopped.")
+
+
+def main(argv: Optional[list[str]] = None):
+    """
+    Command line entry point of the consumer launcher.
+    """
+    parser = argparse.ArgumentParser(description="Run the user command consumers.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Defaults to one per partition.",
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=None,
+        help="Number of create user partitions. Must match the publishers.",
+    )
+    args = parser.parse_args(argv)
+    configure_logging()
+    try:
+        ConsumerLauncher(partitions=args.partitions, workers=args.workers).run()
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import json
+import logging
+
+from aio_pika import ExchangeType
+from aio_pika.abc import AbstractIncomingMessage
+
+from auth.infrastructure.token_versions import token_versions
+from shared.infrastructure.messaging import get_rabbitmq_connection
+from users.infraestructure.messaging import TOKEN_VERSION_EXCHANGE
+
+logger = logging.getLogger(__name__)
+
+
+async def process_token_version_message(message: AbstractIncomingMessage):
+    """
+    Records a token version bump so revoked tokens are rejected by stateless authentication.
+    """
+    try:
+        payload = json.loads(message.body)
+        token_versions.observe(payload["user_id"], payload["version"])
+    except Exception as e:
+        logger.error("Error processing token version message: %s", e)
+
+
+async def consume_token_versions():
+    """
+    Subscribes this worker to token version bumps.
+
+    Each worker declares its own exclusive, auto-deleted queue bound to the fanout
+    exchange, so every worker receives every bump. Messages are consumed without
+    acknowledgements since a lost bump is corrected when the registry entry
+    expires and is reloaded from the database.
+    """
+    connection = await get_rabbitmq_connection()
+    channel = await connection.channel()
+
+    exchange = await channel.declare_exchange(
+        TOKEN_VERSION_EXCHANGE, type=ExchangeType.FANOUT
+    )
+    queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+    await queue.bind(exchange)
+
+    logger.info("Listening for token version bumps on %s...", queue.name)
+    await queue.consume(process_token_version_message, no_ack=True)
@@ -0,0 +1,43 @@
+import json
+import logging
+
+from aio_pika import ExchangeType
+from aio_pika.abc import AbstractIncomingMessage
+
+from shared.infrastructure.messaging import get_rabbitmq_connection
+from users.infraestructure.cached_repositories import invalidate_cached_user
+from users.infraestructure.messaging import USER_CACHE_EXCHANGE
+
+logger = logging.getLogger(__name__)
+
+
+async def process_user_invalidation_message(message: AbstractIncomingMessage):
+    """
+    Drops the cached entries named in a user cache invalidation event.
+    """
+    try:
+        payload = json.loads(message.body)
+        invalidate_cached_user(payload.get("user_id"), payload.get("emails", []))
+    except Exception as e:
+        logger.error("Error processing cache invalidation message: %s", e)
+
+
+async def consume_user_cache_invalidations():
+    """
+    Subscribes this worker to user cache invalidation events.
+
+    Each worker declares its own exclusive, auto-deleted queue bound to the fanout
+    exchange, so every worker receives every invalidation. Messages are consumed
+    without acknowledgements since a lost event only delays expiry until the TTL.
+    """
+    connection = await get_rabbitmq_connection()
+    channel = await connection.channel()
+
+    exchange = await channel.declare_exchange(
+        USER_CACHE_EXCHANGE, type=ExchangeType.FANOUT
+    )
+    queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+    await queue.bind(exchange)
+
+    logger.info("Listening for user cache invalidations on %s...", queue.name)
+    await queue.consume(process_user_invalidation_message, no_ack=True)
@@ -1,59 +1,214 @@
-from aio_pika import connect_robust
+import asyncio
+import logging
+from typing import Optional
+
 from aio_pika.abc import AbstractIncomingMessage
 
-from shared.infrastructure.database import AsyncSessionFactory
-from shared.infrastructure.messaging import RABBITMQ_URL
-from users.infraestructure.models import UserCreateModel
-from users.infraestructure.repositories import UserRepository
+from shared.application.security import close_password_hasher, hash_passwords_async
+from shared.configuration.config import settings
+from shared.infrastructure.logger import configure_logging, shutdown_logging
+from shared.infrastructure.messaging import (
+    BatchMessageHandler,
+    ConsumerRuntime,
+    RetryPolicy,
+    close_channel_pool,
+    close_rabbitmq_connection,
+)
+from shared.infrastructure.metrics import serve_metrics
+from src.shared.infrastructure.database import AsyncSessionFactory, close_db
+from src.users.application.use_cases.commands import BulkRegisterUsersUseCase
+from src.users.domain.user import User
+from src.users.infraestructure.models import CreateUserCommand, UserCreateModel
+from users.infraestructure.messaging import (
+    USER_COMMAND_EXCHANGE,
+    USER_EXCHANGE_DECLARATIONS,
+    create_user_routing_key,
+    decode_create_user_commands,
+)
+from users.infraestructure.repository_factory import build_user_repository
+
+logger = logging.getLogger(__name__)
 
-USER_COMMAND_EXCHANGE = "user_commands_exchange"
 CREATE_USER_QUEUE = "create_user_queue"
-CREATE_USER_ROUTING_KEY = "user.command.create"
 
 
-async def process_create_user_message(message: AbstractIncomingMessage):
+async def register_create_user_commands(
+    commands: list[CreateUserCommand],
+) -> list[Optional[User]]:
+    """
+    Inserts the users described by a list of create user commands in one transaction.
+
+    The commands carry password hashes, which are stored as they are. The insert is
+    idempotent: commands for emails that are already registered, such as
+    redeliveries, yield `None` instead of a user.
+    """
+    async with AsyncSessionFactory() as session:
+        use_case = BulkRegisterUsersUseCase(build_user_repository(session))
+        created = await use_case.execute_hashed(commands)
+        await session.commit()
+    return created
+
+
+async def decode_message_commands(
+    message: AbstractIncomingMessage,
+) -> list[CreateUserCommand]:
+    """
+    Decodes the create user commands of a message, negotiating the codec by content type.
+
+    Legacy messages that still carry a plaintext password are hashed here.
+    """
+    commands = decode_create_user_commands(
+        message.body, message.content_type, message.headers
+    )
+    legacy = [
+        index for index, command in enumerate(commands)
+        if isinstance(command, UserCreateModel)
+    ]
+    if legacy:
+        hashes = await hash_passwords_async([commands[index].password for index in legacy])
+        for index, hashed_password in zip(legacy, hashes):
+            commands[index] = CreateUserCommand(
+                name=commands[index].name,
+                email=commands[index].email,
+                hashed_password=hashed_password,
+            )
+    return commands
+
+
+async def process_create_user_batch(
+    messages: list[AbstractIncomingMessage],
+) -> list[AbstractIncomingMessage]:
     """
-    Asynchronously processes a message to create a new user.
+    Asynchronously processes a batch of messages to create new users.
 
-    This function handles incoming messages containing user creation data. It decodes
-    the message payload, validates it against the `UserCreateModel`, and persists the
-    new user to the database.
+    This function decodes the commands of each message and persists the users with
+    a single multi-row insert and a single commit. If the batch insert fails, the
+    commands of each message are retried on their own so only the failing
+    messages are rejected.
+
+    Returns the messages that could not be processed.
     """
-    async with message.process():
+    failed: list[AbstractIncomingMessage] = []
+    decoded: list[tuple[AbstractIncomingMessage, list[CreateUserCommand]]] = []
+    for message in messages:
         try:
-            # Decode the message body
-            payload = message.body.decode("utf-8")
-            user_data = UserCreateModel.model_validate_json(payload)
+            decoded.append((message, await decode_message_commands(message)))
+        except ValueError as e:
+            logger.warning("Rejecting malformed create user message: %s", e)
+            failed.append(message)
+
+    commands = [command for _, group in decoded for command in group]
+    if not commands:
+        return failed
+    try:
+        created = await register_create_user_commands(commands)
+        logger.debug("Created %s of %s users.", sum(user is not None for user in created), len(commands))
+    except Exception as e:
+        logger.warning("Batch insert of %s users failed, retrying per message: %s", len(commands), e)
+        for message, group in decoded:
+            try:
+                await register_create_user_commands(group)
+            except Exception as message_error:
+                logger.error("Error creating users from message: %s", message_error)
+                failed.append(message)
+    return failed
+
+
+def create_user_queue_name(partition: int) -> str:
+    """
+    Returns the name of a create user command partition queue.
+    """
+    return f"{CREATE_USER_QUEUE}.{partition}"
 
-            print(f"Received message: {user_data}")
 
-            # Save the user to the database
-            async with AsyncSessionFactory() as session:
-                user_repository = UserRepository(session)
-                await user_repository.create_user(user_data)
+def register_user_consumers(
+    runtime: ConsumerRuntime,
+    partitions: Optional[list[int]] = None,
+    handler: BatchMessageHandler = process_create_user_batch,
+):
+    """
+    Registers the user command handlers with a consumer runtime.
+
+    One handler is registered per create user partition, all partitions by
+    default. `handler` replaces `process_create_user_batch`, for instance to
+    wrap it with measurements. Partition queues are declared with `x-single-active-consumer`, so
+    when several workers consume the same partition only one of them receives
+    messages and per-user ordering is preserved. Failed commands are retried with
+    exponential backoff and parked once they run out of attempts. A retried
+    command returns at the tail of its partition queue, so ordering only holds
+    for commands that succeed on their first attempt: later commands for the
+    same email may be processed before it.
+    """
+    if partitions is None:
+        partitions = list(range(settings.USER_COMMAND_PARTITIONS))
+    retry_policy = RetryPolicy(
+        max_attempts=settings.CONSUMER_RETRY_MAX_ATTEMPTS,
+        initial_delay_ms=settings.CONSUMER_RETRY_INITIAL_DELAY_MS,
+        multiplier=settings.CONSUMER_RETRY_BACKOFF_MULTIPLIER,
+        max_delay_ms=settings.CONSUMER_RETRY_MAX_DELAY_MS,
+    )
+    for partition in partitions:
+        runtime.register_batch(
+            create_user_queue_name(partition),
+            handler,
+            batch_size=settings.CONSUMER_BATCH_SIZE,
+            linger_ms=settings.CONSUMER_BATCH_LINGER_MS,
+            prefetch_count=settings.CONSUMER_BATCH_PREFETCH_COUNT or None,
+            exchange_name=USER_COMMAND_EXCHANGE,
+            routing_key=create_user_routing_key(partition),
+            exchange_declaration=USER_EXCHANGE_DECLARATIONS[USER_COMMAND_EXCHANGE],
+            queue_arguments={"x-single-active-consumer": True},
+            retry_policy=retry_policy,
+        )
 
-            print(f"User {user_data.email} created successfully.")
-        except Exception as e:
-            print(f"Error processing message: {e}")
-            raise
+
+def build_user_consumer_runtime(
+    partitions: Optional[list[int]] = None,
+) -> ConsumerRuntime:
+    """
+    Builds a consumer runtime with the user command handlers registered.
+    """
+    runtime = ConsumerRuntime(
+        prefetch_count=settings.CONSUMER_PREFETCH_COUNT,
+        concurrency=settings.CONSUMER_CONCURRENCY,
+        shutdown_timeout=settings.CONSUMER_SHUTDOWN_TIMEOUT_SECONDS,
+        stats_interval=settings.CONSUMER_STATS_INTERVAL_SECONDS,
+    )
+    register_user_consumers(runtime, partitions)
+    return runtime
 
 
-async def consume_create_user_commands():
+async def consume_create_user_commands(partitions: Optional[list[int]] = None):
     """
-    Establishes a connection to RabbitMQ and sets up a consumer for user creation commands.
+    Runs the user command consumers until the process receives SIGTERM or SIGINT.
 
-    This coroutine creates a robust connection to RabbitMQ, declares a direct exchange
-    and queue for handling user creation commands, and starts consuming messages.
-    The consumed messages are processed by the `process_create_user_message` callback.
+    The consumers share the global RabbitMQ connection and consume the given
+    create user partitions, all of them by default. Create user commands are
+    written in batches of up to `CONSUMER_BATCH_SIZE` messages, one transaction per
+    batch. On shutdown, in-flight messages are drained before the connections close.
+    With `CONSUMER_METRICS_PORT` set, the worker consuming partition N serves its
+    metrics on that port plus N.
     """
-    connection = await connect_robust(RABBITMQ_URL)
-    channel = await connection.channel()
-    await channel.set_qos(prefetch_count=1)
+    runtime = build_user_consumer_runtime(partitions)
+    metrics_server = None
+    if settings.CONSUMER_METRICS_PORT:
+        metrics_server = await serve_metrics(
+            "0.0.0.0", settings.CONSUMER_METRICS_PORT + (partitions[0] if partitions else 0)
+        )
+    try:
+        await runtime.run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        await close_db()
+        await close_channel_pool()
+        await close_rabbitmq_connection()
+        close_password_hasher()
 
-    # Declare the exchange and queue
-    exchange = await channel.declare_exchange(USER_COMMAND_EXCHANGE, type="direct")
-    queue = await channel.declare_queue(CREATE_USER_QUEUE, durable=True)
-    await queue.bind(exchange, routing_key=CREATE_USER_ROUTING_KEY)
 
-    print(f"Waiting for messages in {CREATE_USER_QUEUE}...")
-    await queue.consume(process_create_user_message)
+if __name__ == "__main__":
+    configure_logging()
+    try:
+        asyncio.run(consume_create_user_commands())
+    finally:
+        shutdown_logging()
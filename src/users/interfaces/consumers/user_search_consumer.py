@@ -0,0 +1,68 @@
+import json
+import logging
+
+from aio_pika import ExchangeType
+from aio_pika.abc import AbstractIncomingMessage
+
+from shared.configuration.config import settings
+from shared.infrastructure.messaging import get_rabbitmq_connection
+from users.infraestructure.email_filter import (
+    rebuild_user_email_filter,
+    user_email_filter,
+)
+from users.infraestructure.messaging import (
+    SEARCH_INDEX_REBUILD_EVENT,
+    USER_EVENTS_EXCHANGE,
+    USERS_CREATED_EVENT,
+)
+from users.infraestructure.search import (
+    rebuild_user_search_index,
+    spawn,
+    user_search_index,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def process_user_event_message(message: AbstractIncomingMessage):
+    """
+    Applies a user event to the search index and email filter of this worker.
+
+    Created users are indexed and their emails added to the filter; a rebuild
+    event rebuilds both in the background.
+    """
+    try:
+        payload = json.loads(message.body)
+        if payload.get("event") == USERS_CREATED_EVENT:
+            users = [(user["user_id"], user["name"], user["email"]) for user in payload["users"]]
+            user_search_index.index_users(users)
+            user_email_filter.add_emails(email for _, _, email in users)
+        elif payload.get("event") == SEARCH_INDEX_REBUILD_EVENT:
+            logger.info("User search index and email filter rebuild requested.")
+            if settings.USER_SEARCH_ENABLED:
+                spawn(rebuild_user_search_index())
+            if settings.USER_EMAIL_FILTER_ENABLED:
+                spawn(rebuild_user_email_filter())
+    except Exception as e:
+        logger.error("Error processing user event message: %s", e)
+
+
+async def consume_user_events():
+    """
+    Subscribes this worker to user events.
+
+    Each worker declares its own exclusive, auto-deleted queue bound to the fanout
+    exchange, so every worker receives every event. Messages are consumed
+    without acknowledgements since a lost event is recovered by the next rebuild.
+    """
+    connection = await get_rabbitmq_connection()
+    channel = await connection.channel()
+
+    exchange = await channel.declare_exchange(
+        USER_EVENTS_EXCHANGE, type=ExchangeType.FANOUT
+    )
+    queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+    await queue.bind(exchange)
+
+    logger.info("Listening for user events on %s...", queue.name)
+    await queue.consume(process_user_event_message, no_ack=True)
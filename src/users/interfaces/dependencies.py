@@ -3,20 +3,23 @@ from typing import Annotated
 from fastapi import Depends
 
 from shared.infrastructure.dependencies import DbSession
-from users.infraestructure.repositories import UserRepository
+from src.users.domain.repositories import UserRepositoryInterface
+from users.infraestructure.repository_factory import build_user_repository
 
 
-def get_user_repository(session: DbSession) -> UserRepository:
+def get_user_repository(session: DbSession) -> UserRepositoryInterface:
     """
     Provides a UserRepository instance with a database session.
 
     This function is used as a dependency in FastAPI to inject a `UserRepository`
-    instance into endpoints or services that require it.
+    instance into endpoints or services that require it. When `USER_CACHE_ENABLED`
+    and `USER_LOADER_ENABLED` are set the repository is wrapped in the cache and the
+    batching loader.
     """
-    return UserRepository(session)
+    return build_user_repository(session)
 
 
-UserRepo = Annotated[UserRepository, Depends(get_user_repository)]
+UserRepo = Annotated[UserRepositoryInterface, Depends(get_user_repository)]
 """
 Annotated type for injecting a UserRepository dependency.
 
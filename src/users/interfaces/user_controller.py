@@ -1,12 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from typing import Annotated, Literal, Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from auth.interfaces.dependencies import CurrentPrincipal
+from shared.configuration.config import settings
+from shared.domain.base_errores import CapacityExceededError, IndexNotReadyError
 from src.shared.domain.base_errores import DomainError, EntityNotFoundError
+from src.shared.domain.helpers import decode_cursor
 from src.shared.infrastructure.database import get_db_session
-from src.users.application.services_handlers import UserServiceHandler
-from src.users.infraestructure.models import UserCreateModel
+from src.shared.infrastructure.responses import EnvelopeResponse
+from src.users.application.services_handlers import (
+    USER_EXPORT_MEDIA_TYPES,
+    UserBulkServiceHandler,
+    UserExportServiceHandler,
+    UserSearchServiceHandler,
+    UserServiceHandler,
+)
+from src.users.infraestructure.models import UserCreateModel, UserIdsModel
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+collection_router = APIRouter()
+"""
+Routes served at the bare collection path (`/users`, without a trailing slash).
+
+FastAPI refuses an empty path on a router mounted without a prefix, so these
+routes live on their own router that is always mounted with one.
+"""
+
 
 @router.get(
     "/",
@@ -40,17 +65,284 @@ async def register_user(data_user: UserCreateModel, db=Depends(get_db_session)):
     try:
         service = UserServiceHandler(db)
         response = await service.register_user(data_user)
-        return response
+        return EnvelopeResponse(response, status_code=status.HTTP_201_CREATED)
     except DomainError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except CapacityExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
-        print(f"Error registering user: {e}")
+        logger.error("Error registering user: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while registering the user.",
         )
 
 
+@router.post(
+    "/register/bulk",
+    status_code=status.HTTP_200_OK,
+    summary="Register many users from an NDJSON stream",
+    description=(
+        "Accepts one JSON user object per line (`application/x-ndjson`) and streams "
+        "back one result line per record with status `created`, `duplicate`, "
+        "`invalid` or `error`. Requires a bearer token."
+    ),
+    response_class=StreamingResponse,
+    responses={status.HTTP_401_UNAUTHORIZED: {"description": "Not authenticated"}},
+)
+async def register_users_bulk(principal: CurrentPrincipal, request: Request):
+    """
+    Registers many users from a streamed NDJSON request body.
+
+    Records are processed in chunks and results are streamed back as they are
+    produced, so neither the request nor the response is held in memory. Only
+    authenticated callers may register users in bulk.
+    """
+    logger.info("Bulk user registration requested by user %s.", principal.user_id)
+    service = UserBulkServiceHandler()
+    return StreamingResponse(
+        service.register_users(request.stream()),
+        media_type="application/x-ndjson",
+    )
+
+
+def parse_user_ids(raw_ids: list[str]) -> list[int]:
+    """
+    Parses repeated and comma-separated `ids` query values into user IDs.
+
+    Raises a 400 error for non-integer values, and for empty or oversized batches.
+    """
+    try:
+        user_ids = [int(part) for raw in raw_ids for part in raw.split(",") if part]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User IDs must be integers.",
+        )
+    return validate_user_ids(user_ids)
+
+
+def validate_user_ids(user_ids: list[int]) -> list[int]:
+    """
+    Checks that a batch of user IDs is non-empty and within the configured limit.
+    """
+    if not user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one user ID is required.",
+        )
+    if len(user_ids) > settings.USERS_MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.USERS_MULTI_GET_MAX_IDS} user IDs are allowed.",
+        )
+    return user_ids
+
+
+async def fetch_users_by_ids(user_ids: list[int], db):
+    """
+    Retrieves many users through the service handler, mapping failures to HTTP errors.
+    """
+    try:
+        service = UserServiceHandler(db)
+        return EnvelopeResponse(await service.get_users_by_ids(user_ids))
+    except Exception as e:
+        logger.error("Error getting users by IDs: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while retrieving the users.",
+        )
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Decodes the `cursor` query value, raising a 400 error for malformed cursors.
+    """
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+async def list_users_page(
+    cursor: Optional[str], limit: Optional[int], email_prefix: Optional[str], db
+):
+    """
+    Retrieves one page of users through the service handler, mapping failures to HTTP errors.
+    """
+    after_id = parse_cursor(cursor)
+    page_size = limit or settings.USERS_PAGE_SIZE
+    if page_size > settings.USERS_PAGE_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.USERS_PAGE_MAX_SIZE} users per page are allowed.",
+        )
+    try:
+        service = UserServiceHandler(db)
+        return EnvelopeResponse(await service.list_users(after_id, page_size, email_prefix))
+    except Exception as e:
+        logger.error("Error listing users: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while listing the users.",
+        )
+
+
+@collection_router.get(
+    "",
+    response_model=dict,
+    status_code=status.HTTP_200_OK,
+    summary="List users, or get many users by ID",
+    description=(
+        "Without `ids`, lists users in ID order one page at a time. Pass the "
+        "`next_cursor` of a page as `cursor` to get the next one; it is `null` on "
+        "the last page. `limit` sets the page size and `email_prefix` keeps only "
+        "users whose email starts with it. With `ids`, retrieves those users "
+        "instead: IDs are passed as repeated or comma-separated values and results "
+        "follow request order with `null` for missing users. Requires a bearer token."
+    ),
+    responses={status.HTTP_401_UNAUTHORIZED: {"description": "Not authenticated"}},
+)
+async def get_users(
+    principal: CurrentPrincipal,
+    ids: Annotated[Optional[list[str]], Query()] = None,
+    cursor: Optional[str] = None,
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
+    email_prefix: Optional[str] = None,
+    db=Depends(get_db_session),
+):
+    """
+    Lists users with keyset pagination, or retrieves many users by their identifiers.
+
+    Listing walks the primary key from the cursor on, so every page costs the
+    same as the first. Retrieval by ID resolves every requested ID with a
+    single query. Only authenticated callers may page through the users.
+    """
+    if ids is None:
+        return await list_users_page(cursor, limit, email_prefix, db)
+    return await fetch_users_by_ids(parse_user_ids(ids), db)
+
+
+@router.post(
+    "/lookup",
+    response_model=dict,
+    status_code=status.HTTP_200_OK,
+    summary="Get many users by ID (request body)",
+    description=(
+        "Same as `GET /users?ids=...`, for ID lists too long for a query string. "
+        "Requires a bearer token."
+    ),
+    responses={status.HTTP_401_UNAUTHORIZED: {"description": "Not authenticated"}},
+)
+async def lookup_users(
+    principal: CurrentPrincipal, body: UserIdsModel, db=Depends(get_db_session)
+):
+    """
+    Retrieves many users by the identifiers given in the request body.
+
+    Only authenticated callers may look users up, as with `GET /users?ids=`.
+    """
+    return await fetch_users_by_ids(validate_user_ids(body.user_ids), db)
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    summary="Export every user as NDJSON or CSV",
+    description=(
+        "Streams the `user_id`, `name` and `email` of every user in ID order, as "
+        "one JSON object per line (`format=ndjson`) or as CSV with a header row "
+        "(`format=csv`). Requires a bearer token."
+    ),
+    response_class=StreamingResponse,
+    responses={status.HTTP_401_UNAUTHORIZED: {"description": "Not authenticated"}},
+)
+async def export_users(
+    principal: CurrentPrincipal,
+    export_format: Annotated[Literal["ndjson", "csv"], Query(alias="format")] = "ndjson",
+):
+    """
+    Exports the user table as a streamed download.
+
+    Rows come from a server-side cursor and are encoded in chunks, so the export
+    runs in constant memory however many users there are.
+    """
+    logger.info("User export (%s) requested by user %s.", export_format, principal.user_id)
+    service = UserExportServiceHandler()
+    return StreamingResponse(
+        service.export_users(export_format),
+        media_type=USER_EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'},
+    )
+
+
+@router.get(
+    "/search",
+    response_model=dict,
+    status_code=status.HTTP_200_OK,
+    summary="Search users by partial name or email",
+    description=(
+        "Returns the users whose name or email contains every term of `q`, best "
+        "matches first. Terms of one or two characters match the start of a word. "
+        "Requires a bearer token."
+    ),
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {"description": "Not authenticated"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Index still loading"},
+    },
+)
+async def search_users(
+    principal: CurrentPrincipal,
+    q: Annotated[str, Query(min_length=1)],
+    limit: Annotated[int, Query(ge=1)] = 20,
+):
+    """
+    Searches users through the in-process n-gram index of this worker.
+
+    The index is built at startup and kept current as users are created, so a
+    search never touches the database.
+    """
+    if not settings.USER_SEARCH_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User search is disabled.")
+    try:
+        service = UserSearchServiceHandler()
+        return EnvelopeResponse(
+            service.search_users(q, min(limit, settings.USER_SEARCH_MAX_RESULTS))
+        )
+    except IndexNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+
+
+@router.get(
+    "/email-available",
+    response_model=dict,
+    status_code=status.HTTP_200_OK,
+    summary="Check whether an email is free to register",
+    description=(
+        "Returns whether no user is registered with `email`. Most unregistered "
+        "emails are answered from an in-memory filter without a database query."
+    ),
+)
+async def email_available(
+    email: Annotated[str, Query(min_length=1)], db=Depends(get_db_session)
+):
+    """
+    Checks whether an email is free to register, as signup forms do while typing.
+    """
+    service = UserServiceHandler(db)
+    return EnvelopeResponse(await service.is_email_available(email))
+
+
 @router.get(
     "/{user_id}",
     response_model=dict,
@@ -72,11 +364,11 @@ async def get_user_by_id(user_id: int, db=Depends(get_db_session)):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
-        return user
+        return EnvelopeResponse(user)
     except EntityNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
-        print(f"Error getting user by ID {user_id}: {e}")
+        logger.error("Error getting user by ID %s: %s", user_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while retrieving the user.",
@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import sys
+from typing import Optional
+
+from shared.infrastructure.logger import configure_logging, shutdown_logging
+from src.shared.infrastructure.database import close_db
+from src.users.application.services_handlers import (
+    USER_EXPORT_MEDIA_TYPES,
+    UserExportServiceHandler,
+)
+
+
+async def export_users(export_format: str, output: Optional[str]):
+    """
+    Writes the user export to a file, or to stdout when no file is given.
+    """
+    service = UserExportServiceHandler()
+    try:
+        if output:
+            with open(output, "wb") as file:
+                async for chunk in service.export_users(export_format):
+                    file.write(chunk)
+        else:
+            async for chunk in service.export_users(export_format):
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+    finally:
+        await close_db()
+
+
+def main(argv: Optional[list[str]] = None):
+    """
+    Command line entry point to export every user as NDJSON or CSV.
+
+    The export streams the same way `GET /users/export` does. Logs go to
+    stderr, so stdout carries only the exported rows.
+    """
+    parser = argparse.ArgumentParser(description="Export every user as NDJSON or CSV.")
+    parser.add_argument(
+        "--format", dest="export_format", choices=sorted(USER_EXPORT_MEDIA_TYPES), default="ndjson"
+    )
+    parser.add_argument("--output", default=None, help="File to write. Defaults to stdout.")
+    args = parser.parse_args(argv)
+    configure_logging(stream=sys.stderr)
+    try:
+        asyncio.run(export_users(args.export_format, args.output))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+from typing import Optional
+
+from shared.infrastructure.logger import configure_logging, shutdown_logging
+from shared.infrastructure.messaging import (
+    close_rabbitmq_connection,
+    get_rabbitmq_connection,
+)
+from users.infraestructure.messaging import UserEventPublisher
+
+
+async def request_rebuild():
+    """
+    Publishes a rebuild event that every running worker acts on.
+    """
+    try:
+        connection = await get_rabbitmq_connection()
+        channel = await connection.channel()
+        await UserEventPublisher(channel).publish_search_index_rebuild()
+        await channel.close()
+    finally:
+        await close_rabbitmq_connection()
+
+
+def main(argv: Optional[list[str]] = None):
+    """
+    Command line entry point to manage the user search indexes of the workers.
+
+    `rebuild` also rebuilds the email filters. The indexes live in the memory of each worker, so `rebuild` broadcasts a
+    request over the broker instead of building anything itself.
+    """
+    parser = argparse.ArgumentParser(description="Manage the user search index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="Rebuild the index and email filter of every running worker.")
+    parser.parse_args(argv)
+    configure_logging()
+    try:
+        asyncio.run(request_rebuild())
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from auth.application.revoke_tokens import RevokeTokensUseCase
+from auth.infrastructure.token_versions import TokenVersionRegistry, token_versions
+from auth.interfaces.dependencies import get_current_principal, get_current_user
+from shared.application.security import create_access_token
+from src.users.domain.user import User
+from users.interfaces.consumers.token_version_consumer import (
+    process_token_version_message,
+)
+
+
+@pytest.fixture
+def mock_user_repository():
+    return AsyncMock()
+
+
+def make_token(user_id: int, version: int = 0) -> str:
+    return create_access_token(
+        {"sub": str(user_id), "email": "test@example.com", "ver": version}
+    )
+
+
+@pytest.mark.asyncio
+async def test_stateless_principal_loads_token_version_once(mock_user_repository):
+    mock_user_repository.get_user_by_id.return_value = User(
+        user_id=101, name="Test User", email="test@example.com", token_version=0
+    )
+
+    with patch("auth.interfaces.dependencies.settings.AUTH_STATELESS", True):
+        principal = await get_current_principal(make_token(101), mock_user_repository)
+        await get_current_principal(make_token(101), mock_user_repository)
+
+    assert principal.user_id == 101
+    assert principal.email == "test@example.com"
+    mock_user_repository.get_user_by_id.assert_called_once_with(101)
+
+
+@pytest.mark.asyncio
+async def test_stateless_principal_rejects_revoked_token_unknown_to_this_worker(
+    mock_user_repository,
+):
+    mock_user_repository.get_user_by_id.return_value = User(
+        user_id=106, name="Test User", email="test@example.com", token_version=1
+    )
+
+    with patch("auth.interfaces.dependencies.settings.AUTH_STATELESS", True):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(make_token(106, version=0), mock_user_repository)
+
+    assert exc_info.value.status_code == 401
+    assert token_versions.current(106) == 1
+
+
+def test_token_versions_expire():
+    registry = TokenVersionRegistry(ttl_seconds=0)
+    registry.observe(1, 3)
+
+    assert registry.current(1) is None
+    assert not registry.is_revoked(1, 0)
+
+
+@pytest.mark.asyncio
+async def test_stateful_principal_loads_user(mock_user_repository):
+    mock_user_repository.get_user_by_id.return_value = User(
+        user_id=102, name="Test User", email="test@example.com", token_version=0
+    )
+
+    with patch("auth.interfaces.dependencies.settings.AUTH_STATELESS", False):
+        principal = await get_current_principal(make_token(102), mock_user_repository)
+
+    assert principal.user_id == 102
+    mock_user_repository.get_user_by_id.assert_called_once_with(102)
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_rejected_in_stateless_mode(mock_user_repository):
+    mock_user_repository.get_user_by_id.return_value = User(
+        user_id=103, name="Test User", email="test@example.com", token_version=1
+    )
+    token = make_token(103, version=0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token, mock_user_repository)
+    assert exc_info.value.status_code == 401
+    assert token_versions.current(103) == 1
+
+    with patch("auth.interfaces.dependencies.settings.AUTH_STATELESS", True):
+        with pytest.raises(HTTPException):
+            await get_current_principal(token, mock_user_repository)
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_rejected(mock_user_repository):
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_principal("not-a-token", mock_user_repository)
+
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_rejected_in_stateless_mode_without_stateful_request(
+    mock_user_repository,
+):
+    mock_user_repository.get_user_by_id.return_value = User(
+        user_id=104, name="Test User", email="test@example.com", token_version=0
+    )
+    mock_user_repository.save_user.side_effect = lambda user: user
+    token = make_token(104, version=0)
+
+    with patch(
+        "auth.application.revoke_tokens.broadcast_token_version", new_callable=AsyncMock
+    ) as broadcast:
+        assert await RevokeTokensUseCase(mock_user_repository).execute(104) == 1
+    broadcast.assert_awaited_once_with(104, 1)
+
+    with patch("auth.interfaces.dependencies.settings.AUTH_STATELESS", True):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(token, mock_user_repository)
+        principal = await get_current_principal(make_token(104, version=1), mock_user_repository)
+
+    assert exc_info.value.status_code == 401
+    assert principal.token_version == 1
+
+
+@pytest.mark.asyncio
+async def test_token_version_broadcast_revokes_tokens_on_other_workers(mock_user_repository):
+    token = make_token(105, version=0)
+    message = SimpleNamespace(body=json.dumps({"user_id": 105, "version": 2}).encode())
+
+    await process_token_version_message(message)
+
+    with patch("auth.interfaces.dependencies.settings.AUTH_STATELESS", True):
+        with pytest.raises(HTTPException):
+            await get_current_principal(token, mock_user_repository)
+    mock_user_repository.get_user_by_id.assert_not_called()
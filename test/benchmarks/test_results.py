@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.results import (
+    compare_results,
+    percentile,
+    run_closed_loop,
+    summarize,
+    write_results,
+)
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.99) == 0.0
+    assert percentile([3.0], 0.5) == 3.0
+
+
+def test_summarize_reports_milliseconds_and_counts_errors():
+    summary = summarize([0.001, 0.002, 0.003, 0.004], errors=1, elapsed=2.0)
+
+    assert summary["requests"] == 5
+    assert summary["errors"] == 1
+    assert summary["throughput_per_second"] == 2.0
+    assert summary["p50_ms"] == 2.0
+    assert summary["max_ms"] == 4.0
+
+
+@pytest.mark.asyncio
+async def test_run_closed_loop_bounds_concurrency_and_counts_failures():
+    in_flight = 0
+    peak = 0
+
+    async def operation(index):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if index % 5 == 0:
+            raise RuntimeError("boom")
+        return index % 5 != 1
+
+    summary = await run_closed_loop(operation, total=20, concurrency=3)
+
+    assert summary["requests"] == 20
+    assert summary["errors"] == 8
+    assert peak == 3
+
+
+def test_compare_results_reports_relative_changes(tmp_path):
+    baseline = {"scenarios": {"get_user": {"throughput_per_second": 100.0, "p99_ms": 10.0}}}
+    candidate = {
+        "scenarios": {
+            "get_user": {"throughput_per_second": 150.0, "p99_ms": 8.0},
+            "token": {"throughput_per_second": 1.0},
+        }
+    }
+
+    rows = {row["metric"]: row for row in compare_results(baseline, candidate)}
+
+    assert set(rows) == {"throughput_per_second", "p99_ms"}
+    assert rows["throughput_per_second"]["change_percent"] == 50.0
+    assert rows["p99_ms"]["change_percent"] == -20.0
+
+    output = tmp_path / "results" / "http.json"
+    write_results(candidate, str(output))
+    assert json.loads(output.read_text()) == candidate
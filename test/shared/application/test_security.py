@@ -0,0 +1,118 @@
+import asyncio
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from shared.application.security import (
+    PasswordHasherPool,
+    TokenCache,
+    create_access_token,
+    decode_access_token,
+    get_password_hash,
+    hash_password_async,
+    verify_password,
+    verify_password_async,
+)
+from shared.domain.base_errores import CapacityExceededError
+
+
+def slow_identity(value):
+    time.sleep(0.05)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_hash_password_async_round_trip():
+    hashed = await hash_password_async("securepassword123")
+
+    assert verify_password("securepassword123", hashed) is True
+    assert await verify_password_async("securepassword123", hashed) is True
+    assert await verify_password_async("wrongpassword", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_verify_password_async_accepts_sync_hash():
+    hashed = get_password_hash("securepassword123")
+
+    assert await verify_password_async("securepassword123", hashed) is True
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_saturated():
+    pool = PasswordHasherPool(backend="thread", workers=1, max_queue=1)
+    try:
+        first = asyncio.create_task(pool.run(slow_identity, 1))
+        second = asyncio.create_task(pool.run(slow_identity, 2))
+        await asyncio.sleep(0)
+
+        assert pool.queue_depth == 1
+        with pytest.raises(CapacityExceededError):
+            await pool.run(slow_identity, 3)
+
+        assert await asyncio.gather(first, second) == [1, 2]
+        stats = pool.stats()
+        assert stats["completed"] == 2
+        assert stats["rejected"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["max_wait_seconds"] > 0
+    finally:
+        pool.shutdown()
+
+
+def test_pool_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        PasswordHasherPool(backend="gpu")
+
+
+def test_decode_access_token_uses_cache():
+    token = create_access_token({"sub": "1", "email": "test@example.com"})
+    first = decode_access_token(token)
+
+    with patch("shared.application.security.jwt.decode") as mock_decode:
+        second = decode_access_token(token)
+
+    mock_decode.assert_not_called()
+    assert second == first
+    assert second["sub"] == "1"
+
+
+def test_decode_access_token_rejects_tampered_token():
+    token = create_access_token({"sub": "1"})
+
+    assert decode_access_token(token + "x") is None
+
+
+def test_token_cache_never_outlives_exp():
+    cache = TokenCache(max_size=10, ttl_seconds=300)
+    cache.put("token", {"sub": "1", "exp": time.time() - 1})
+
+    assert cache.get("token") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(max_size=2, ttl_seconds=300)
+    cache.put("a", {"sub": "1"})
+    cache.put("b", {"sub": "2"})
+    cache.get("a")
+    cache.put("c", {"sub": "3"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"sub": "1"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_token_cache_returns_copies():
+    cache = TokenCache(max_size=2, ttl_seconds=300)
+    cache.put("a", {"sub": "1"})
+    cache.get("a")["sub"] = "2"
+
+    assert cache.get("a") == {"sub": "1"}
+
+
+def test_expired_token_is_not_cached():
+    token = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-10))
+
+    assert decode_access_token(token) is None
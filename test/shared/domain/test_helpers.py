@@ -0,0 +1,49 @@
+import pytest
+
+from src.shared.domain.helpers import (
+    decode_cursor,
+    encode_cursor,
+    exit_json,
+    iter_lines,
+)
+
+
+async def byte_stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(stream):
+    return [line async for line in stream]
+
+
+def test_exit_json_success():
+    assert exit_json(1, {"id": 1}) == {"state": 1, "msg": "success", "data": {"id": 1}}
+
+
+def test_exit_json_rejects_invalid_state():
+    with pytest.raises(ValueError):
+        exit_json(2, {})
+
+
+def test_cursor_round_trips_and_rejects_garbage():
+    cursor = encode_cursor(12345)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == 12345
+    for invalid in ("not-a-cursor", encode_cursor(1)[:-2], "eyJhZnRlciI6IngifQ"):
+        with pytest.raises(ValueError):
+            decode_cursor(invalid)
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_joins_split_chunks():
+    lines = await collect(iter_lines(byte_stream(b'{"a"', b": 1}\n\n{", b'"b": 2}')))
+
+    assert lines == [b'{"a": 1}', b'{"b": 2}']
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_bounds_line_length():
+    with pytest.raises(ValueError):
+        await collect(iter_lines(byte_stream(b"x" * 20), max_line_bytes=10))
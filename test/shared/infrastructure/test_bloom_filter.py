@@ -0,0 +1,25 @@
+import pytest
+
+from shared.infrastructure.bloom_filter import BloomFilter, optimal_size
+
+
+def test_added_keys_are_always_found_and_others_rarely():
+    bloom_filter = BloomFilter(capacity=5000, false_positive_rate=0.01)
+    for index in range(5000):
+        bloom_filter.add(f"user{index}@example.com")
+
+    assert all(f"user{index}@example.com" in bloom_filter for index in range(5000))
+    false_positives = sum(f"other{index}@example.com" in bloom_filter for index in range(20000))
+    assert false_positives / 20000 < 0.02
+    assert len(bloom_filter) <= 5000
+    assert 0.005 < bloom_filter.estimated_false_positive_rate() < 0.015
+
+
+def test_size_follows_capacity_and_rate():
+    assert optimal_size(1_000_000, 0.01) == (9585059, 7)
+    assert BloomFilter(1_000_000, 0.01).size_bytes == 1198133
+
+    with pytest.raises(ValueError):
+        optimal_size(0, 0.01)
+    with pytest.raises(ValueError):
+        optimal_size(10, 1.0)
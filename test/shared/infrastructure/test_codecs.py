@@ -0,0 +1,75 @@
+import pytest
+
+from shared.infrastructure.codecs import (
+    SCHEMA_VERSION_HEADER,
+    CodecRegistry,
+    JsonRecordCodec,
+    RecordCodec,
+    StructRecordCodec,
+)
+
+FIELDS = ("name", "email", "hashed_password")
+
+
+def make_records(count):
+    return [
+        {
+            "name": f"User {index}",
+            "email": f"user{index}@example.com",
+            "hashed_password": "$2b$12$" + "x" * 53,
+        }
+        for index in range(count)
+    ]
+
+
+def test_struct_codec_round_trips_and_is_smaller_than_json():
+    codec = StructRecordCodec("application/x-test", FIELDS, compress_min_bytes=0)
+    records = make_records(1)
+
+    body = codec.encode(records)
+
+    assert codec.decode(body) == records
+    assert len(body) < len(JsonRecordCodec().encode(records))
+
+
+def test_struct_codec_compresses_large_batches():
+    compressed = StructRecordCodec("application/x-test", FIELDS, compress_min_bytes=256)
+    plain = StructRecordCodec("application/x-test", FIELDS, compress_min_bytes=0)
+    records = make_records(100)
+
+    body = compressed.encode(records)
+
+    assert compressed.decode(body) == records
+    assert len(body) < len(plain.encode(records)) / 2
+
+
+def test_struct_codec_rejects_unknown_versions_and_truncated_bodies():
+    codec = StructRecordCodec("application/x-test", FIELDS, compress_min_bytes=0)
+    body = codec.encode(make_records(1))
+
+    with pytest.raises(ValueError):
+        StructRecordCodec("application/x-test", FIELDS, version=2).decode(body)
+    with pytest.raises(ValueError):
+        codec.decode(body[:-5])
+
+
+def test_registry_negotiates_codec_by_content_type():
+    struct_codec = StructRecordCodec("application/x-test", FIELDS)
+    registry = CodecRegistry(JsonRecordCodec(), struct_codec)
+    records = make_records(2)
+
+    assert registry.decode(struct_codec.encode(records), "application/x-test") == records
+    assert registry.decode(b'{"name": "a"}', None) == [{"name": "a"}]
+    with pytest.raises(ValueError):
+        registry.decode(b"", "application/xml")
+    with pytest.raises(ValueError):
+        registry.decode(b"{}", "application/json", {SCHEMA_VERSION_HEADER: 9})
+
+
+def test_incomplete_codec_fails_on_instantiation():
+    class EncodeOnlyCodec(RecordCodec):
+        def encode(self, records):
+            return b""
+
+    with pytest.raises(TypeError):
+        EncodeOnlyCodec()
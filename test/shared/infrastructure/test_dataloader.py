@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from shared.infrastructure.dataloader import DataLoader
+
+
+class RecordingBatch:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, keys):
+        self.calls.append(list(keys))
+        await asyncio.sleep(0)
+        return [key * 10 for key in keys]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_batched():
+    batch_fn = RecordingBatch()
+    loader = DataLoader(batch_fn)
+
+    results = await asyncio.gather(*(loader.load(key) for key in (1, 2, 3)))
+
+    assert results == [10, 20, 30]
+    assert batch_fn.calls == [[1, 2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_keys_are_coalesced():
+    batch_fn = RecordingBatch()
+    loader = DataLoader(batch_fn)
+
+    results = await asyncio.gather(loader.load(1), loader.load(1), loader.load(2))
+
+    assert results == [10, 10, 20]
+    assert batch_fn.calls == [[1, 2]]
+    assert loader.stats()["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_max_batch_size():
+    batch_fn = RecordingBatch()
+    loader = DataLoader(batch_fn, max_batch_size=2)
+
+    await asyncio.gather(*(loader.load(key) for key in (1, 2, 3)))
+
+    assert batch_fn.calls == [[1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller():
+    async def failing_batch(keys):
+        raise RuntimeError("Database error")
+
+    loader = DataLoader(failing_batch)
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert loader.stats()["in_flight"] == 0
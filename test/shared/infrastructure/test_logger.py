@@ -0,0 +1,69 @@
+import json
+import logging
+import queue
+
+from shared.infrastructure.logger import (
+    BoundedQueueHandler,
+    SamplingFilter,
+    StructuredFormatter,
+)
+
+
+def make_record(name="app", level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_filter_uses_longest_prefix_and_keeps_warnings():
+    sampling = SamplingFilter({"users": 1.0, "users.infraestructure.repositories": 0.0})
+
+    assert sampling.filter(make_record("users.interfaces.user_controller"))
+    assert not sampling.filter(make_record("users.infraestructure.repositories"))
+    assert sampling.filter(make_record("users.infraestructure.repositories", logging.WARNING))
+    assert sampling.rate_for("usersx") == 1.0
+
+
+def test_bounded_queue_handler_drops_when_full_and_reports_the_count():
+    record_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(record_queue)
+
+    for _ in range(3):
+        handler.handle(make_record())
+    assert handler.dropped == 2
+
+    record_queue.get_nowait()
+    handler.handle(make_record())
+    record = record_queue.get_nowait()
+    assert record.dropped_records == 2
+    assert record.getMessage() == "hello world"
+
+
+def test_bounded_queue_handler_renders_exceptions_before_enqueueing():
+    record_queue = queue.Queue()
+    handler = BoundedQueueHandler(record_queue)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger = logging.getLogger("test_logger.exceptions")
+        logger.addHandler(handler)
+        logger.propagate = False
+        logger.exception("failed")
+        logger.removeHandler(handler)
+
+    record = record_queue.get_nowait()
+    assert record.exc_info is None
+    assert "ValueError: boom" in record.exc_text
+    assert "ValueError: boom" in json.loads(StructuredFormatter().format(record))["exc_info"]
+
+
+def test_structured_formatter_includes_extra_fields():
+    payload = json.loads(
+        StructuredFormatter().format(make_record("users", queue_name="create_user_queue"))
+    )
+
+    assert payload["message"] == "hello world"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "users"
+    assert payload["queue_name"] == "create_user_queue"
+    assert "args" not in payload
@@ -0,0 +1,190 @@
+import asyncio
+
+import aio_pika
+import pytest
+from aio_pika.exceptions import ChannelNotFoundEntity, MessageProcessError
+
+from shared.infrastructure.memory_bus import InMemoryBroker
+from shared.infrastructure.messaging import (
+    BufferedPublisher,
+    ConsumerRuntime,
+    RetryPolicy,
+)
+
+
+async def collect(queue, count, no_ack=False):
+    received = []
+    done = asyncio.Event()
+
+    async def on_message(message):
+        received.append(message)
+        if len(received) == count:
+            done.set()
+
+    await queue.consume(on_message, no_ack=no_ack)
+    await asyncio.wait_for(done.wait(), 1)
+    return received
+
+
+@pytest.mark.asyncio
+async def test_direct_exchange_routes_by_key():
+    connection = InMemoryBroker().connect()
+    channel = await connection.channel()
+    exchange = await channel.declare_exchange("commands", type="direct")
+    create = await channel.declare_queue("create")
+    other = await channel.declare_queue("other")
+    await create.bind(exchange, routing_key="user.create")
+    await other.bind(exchange, routing_key="user.delete")
+
+    routed = await exchange.publish(aio_pika.Message(body=b"1"), routing_key="user.create")
+    received = await collect(create, 1)
+
+    assert routed == 1
+    assert received[0].body == b"1"
+    assert other.queue.message_count == 0
+
+
+@pytest.mark.asyncio
+async def test_fanout_exchange_copies_to_every_queue():
+    connection = InMemoryBroker().connect()
+    channel = await connection.channel()
+    exchange = await channel.declare_exchange("events", type=aio_pika.ExchangeType.FANOUT)
+    first = await channel.declare_queue(exclusive=True, auto_delete=True)
+    second = await channel.declare_queue(exclusive=True, auto_delete=True)
+    await first.bind(exchange)
+    await second.bind(exchange)
+
+    assert await exchange.publish(aio_pika.Message(body=b"e"), routing_key="") == 2
+    assert first.name != second.name
+
+
+@pytest.mark.asyncio
+async def test_prefetch_limits_unacked_deliveries_and_ack_multiple_releases():
+    connection = InMemoryBroker().connect()
+    channel = await connection.channel()
+    await channel.set_qos(prefetch_count=2)
+    queue = await channel.declare_queue("work")
+    for index in range(5):
+        await channel.default_exchange.publish(
+            aio_pika.Message(body=str(index).encode()), routing_key="work"
+        )
+
+    received = await collect(queue, 2)
+    await asyncio.sleep(0)
+    assert queue.queue.message_count == 3
+
+    await received[1].ack(multiple=True)
+    await asyncio.sleep(0)
+    assert queue.queue.message_count == 1
+    with pytest.raises(MessageProcessError):
+        await received[1].ack()
+
+
+@pytest.mark.asyncio
+async def test_nack_requeues_or_dead_letters():
+    connection = InMemoryBroker().connect()
+    channel = await connection.channel()
+    await channel.declare_exchange("dlx", type="fanout")
+    dead = await channel.declare_queue("dead")
+    await dead.bind("dlx")
+    queue = await channel.declare_queue("work", arguments={"x-dead-letter-exchange": "dlx"})
+    await channel.default_exchange.publish(aio_pika.Message(body=b"1"), routing_key="work")
+
+    first = await queue.get()
+    await first.nack(requeue=True)
+    again = await queue.get()
+    assert again.redelivered
+    await again.reject(requeue=False)
+
+    assert queue.queue.message_count == 0
+    assert dead.queue.message_count == 1
+
+
+@pytest.mark.asyncio
+async def test_closing_channel_requeues_unacked_messages():
+    broker = InMemoryBroker()
+    connection = broker.connect()
+    channel = await connection.channel()
+    queue = await channel.declare_queue("work")
+    await channel.default_exchange.publish(aio_pika.Message(body=b"1"), routing_key="work")
+
+    await queue.get()
+    await channel.close()
+
+    assert broker.queues["work"].message_count == 1
+    assert broker.queues["work"].messages[0].redelivered
+
+
+@pytest.mark.asyncio
+async def test_single_active_consumer_gets_every_message():
+    channel = await InMemoryBroker().connect().channel()
+    queue = await channel.declare_queue("work", arguments={"x-single-active-consumer": True})
+    received = []
+
+    def consumer(name):
+        async def on_message(message):
+            received.append(name)
+            await message.ack()
+
+        return on_message
+
+    await queue.consume(consumer("A"))
+    await queue.consume(consumer("B"))
+    for index in range(4):
+        await channel.default_exchange.publish(
+            aio_pika.Message(body=str(index).encode()), routing_key="work"
+        )
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    assert received == ["A", "A", "A", "A"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_exchange_fails_like_a_passive_declare():
+    channel = await InMemoryBroker().connect().channel()
+
+    with pytest.raises(ChannelNotFoundEntity):
+        await channel.get_exchange("missing")
+
+
+@pytest.mark.asyncio
+async def test_runtime_retries_through_ttl_queue_and_succeeds():
+    broker = InMemoryBroker()
+    connection = broker.connect()
+    attempts = []
+    done = asyncio.Event()
+
+    async def handler(message):
+        attempts.append(message.headers.get("x-retry-attempts"))
+        if len(attempts) < 3:
+            raise RuntimeError("transient")
+        done.set()
+
+    async def connection_factory():
+        return connection
+
+    runtime = ConsumerRuntime(connection_factory=connection_factory)
+    runtime.register(
+        "work",
+        handler,
+        exchange_name="commands",
+        routing_key="create",
+        exchange_declaration={"type": "direct"},
+        retry_policy=RetryPolicy(max_attempts=5, initial_delay_ms=5),
+    )
+    await runtime.start()
+
+    publisher = BufferedPublisher(
+        channel_factory=connection.channel, linger_ms=0
+    )
+    await publisher.publish("commands", "create", b"payload")
+    await asyncio.wait_for(done.wait(), 1)
+    await publisher.close()
+    await runtime.stop()
+
+    assert attempts == [None, 1, 2]
+    stats = runtime.stats()["work"]
+    assert stats["retried"] == 2
+    assert stats["processed"] == 1
+    assert broker.queues["work.parking"].message_count == 0
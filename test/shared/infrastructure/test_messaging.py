@@ -0,0 +1,471 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from shared.infrastructure.messaging import (
+    BufferedPublisher,
+    ChannelPool,
+    ConsumerRuntime,
+    RetryPolicy,
+    partition_for_key,
+)
+from src.shared.domain.base_errores import CapacityExceededError
+
+
+class FakeExchange:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, message, routing_key):
+        await asyncio.sleep(0)
+        self.published.append((routing_key, message.body))
+
+
+def make_channel(exchange):
+    channel = MagicMock()
+    channel.is_closed = False
+    channel.declare_exchange = AsyncMock(return_value=exchange)
+    channel.get_exchange = AsyncMock(return_value=exchange)
+    channel.close = AsyncMock()
+    channel.set_qos = AsyncMock()
+    return channel
+
+
+@pytest.mark.asyncio
+async def test_publisher_batches_and_flushes_on_close():
+    exchange = FakeExchange()
+    channel = make_channel(exchange)
+    publisher = BufferedPublisher(
+        channel_factory=AsyncMock(return_value=channel), batch_size=10, linger_ms=1
+    )
+    publisher.register_exchange("commands", type="direct")
+
+    for index in range(25):
+        assert await publisher.publish("commands", "key", str(index).encode())
+    await publisher.close()
+
+    assert [body for _, body in exchange.published] == [
+        str(index).encode() for index in range(25)
+    ]
+    stats = publisher.stats()
+    assert stats["published"] == 25
+    assert stats["batches"] <= 4
+    channel.declare_exchange.assert_awaited_once_with("commands", type="direct")
+    channel.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_publisher_drop_policy_discards_when_full():
+    publisher = BufferedPublisher(
+        channel_factory=AsyncMock(return_value=make_channel(FakeExchange())),
+        max_buffer=1,
+        overflow="drop",
+    )
+
+    assert await publisher.publish("commands", "key", b"1") is True
+    assert await publisher.publish("commands", "key", b"2") is False
+    assert publisher.stats()["dropped"] == 1
+    await publisher.close()
+
+
+@pytest.mark.asyncio
+async def test_publisher_fail_policy_raises_when_full():
+    publisher = BufferedPublisher(
+        channel_factory=AsyncMock(return_value=make_channel(FakeExchange())),
+        max_buffer=1,
+        overflow="fail",
+    )
+
+    await publisher.publish("commands", "key", b"1")
+    with pytest.raises(CapacityExceededError):
+        await publisher.publish("commands", "key", b"2")
+    await publisher.close()
+
+
+@pytest.mark.asyncio
+async def test_publisher_counts_failed_publishes_once_retries_run_out():
+    exchange = MagicMock()
+    exchange.publish = AsyncMock(side_effect=RuntimeError("nack"))
+    publisher = BufferedPublisher(
+        channel_factory=AsyncMock(return_value=make_channel(exchange)),
+        linger_ms=0,
+        max_retries=2,
+        retry_backoff_ms=0,
+    )
+
+    await publisher.publish("commands", "key", b"1")
+    await publisher.close()
+
+    stats = publisher.stats()
+    assert exchange.publish.await_count == 3
+    assert stats["retried"] == 2
+    assert stats["failed"] == 1
+    assert stats["published"] == 0
+
+
+@pytest.mark.asyncio
+async def test_publisher_republishes_nacked_batch():
+    exchange = FakeExchange()
+    publish = exchange.publish
+    nacked = []
+
+    async def nack_first_attempt(message, routing_key):
+        if message.body not in nacked:
+            nacked.append(message.body)
+            raise RuntimeError("nack")
+        await publish(message, routing_key)
+
+    exchange.publish = nack_first_attempt
+    publisher = BufferedPublisher(
+        channel_factory=AsyncMock(return_value=make_channel(exchange)),
+        batch_size=10,
+        linger_ms=1,
+        retry_backoff_ms=1,
+    )
+
+    for index in range(3):
+        await publisher.publish("commands", "key", str(index).encode())
+    await publisher.close()
+
+    assert sorted(body for _, body in exchange.published) == [b"0", b"1", b"2"]
+    stats = publisher.stats()
+    assert stats["published"] == 3
+    assert stats["retried"] == 3
+    assert stats["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_publisher_retries_when_the_channel_cannot_open():
+    exchange = FakeExchange()
+    channel_factory = AsyncMock(side_effect=[RuntimeError("connection refused"), make_channel(exchange)])
+    publisher = BufferedPublisher(
+        channel_factory=channel_factory, linger_ms=0, retry_backoff_ms=1
+    )
+
+    await publisher.publish("commands", "key", b"1")
+    await publisher.close()
+
+    assert exchange.published == [("key", b"1")]
+    assert publisher.stats()["failed"] == 0
+
+
+def test_publisher_rejects_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        BufferedPublisher(overflow="spill")
+
+
+def make_connection():
+    connection = MagicMock()
+
+    async def open_channel():
+        return make_channel(FakeExchange())
+
+    connection.channel = AsyncMock(side_effect=open_channel)
+    return connection
+
+
+@pytest.mark.asyncio
+async def test_channel_pool_reuses_returned_channels():
+    connection = make_connection()
+    pool = ChannelPool(connection_factory=AsyncMock(return_value=connection))
+
+    async with pool.acquire() as first:
+        pass
+    async with pool.acquire() as second:
+        pass
+
+    assert first is second
+    assert pool.stats()["created"] == 1
+    assert pool.stats()["idle"] == 1
+
+
+@pytest.mark.asyncio
+async def test_channel_pool_replaces_closed_channels():
+    connection = make_connection()
+    pool = ChannelPool(connection_factory=AsyncMock(return_value=connection))
+
+    async with pool.acquire() as first:
+        first.is_closed = True
+    async with pool.acquire() as second:
+        pass
+
+    assert second is not first
+    assert pool.stats()["discarded"] == 1
+    assert pool.stats()["created"] == 2
+
+
+@pytest.mark.asyncio
+async def test_channel_pool_times_out_when_exhausted():
+    connection = make_connection()
+    pool = ChannelPool(
+        connection_factory=AsyncMock(return_value=connection),
+        max_size=1,
+        acquire_timeout=0.01,
+    )
+
+    async with pool.acquire():
+        with pytest.raises(CapacityExceededError):
+            async with pool.acquire():
+                pass
+
+    assert pool.stats()["timeouts"] == 1
+    assert pool.stats()["leased"] == 0
+
+
+class FakeMessage:
+    def __init__(self, body, delivery_tag=0, headers=None):
+        self.body = body
+        self.delivery_tag = delivery_tag
+        self.headers = headers or {}
+        self.content_type = "application/json"
+        self.message_id = None
+        self.processed = False
+        self.acked = False
+        self.acked_multiple = False
+        self.rejected = False
+        self.requeued = False
+
+    async def ack(self, multiple=False):
+        self.processed = True
+        self.acked = True
+        self.acked_multiple = multiple
+
+    async def nack(self, requeue=True):
+        self.processed = True
+        self.requeued = requeue
+        self.rejected = not requeue
+
+
+class FakeQueue:
+    def __init__(self, name):
+        self.name = name
+        self.callback = None
+        self.bind = AsyncMock()
+        self.cancel = AsyncMock()
+
+    async def consume(self, callback):
+        self.callback = callback
+        return f"tag-{self.name}"
+
+    def deliver(self, message):
+        return asyncio.create_task(self.callback(message))
+
+
+def make_consumer_connection(queue):
+    channel = make_channel(FakeExchange())
+    channel.declare_queue = AsyncMock(return_value=queue)
+    channel.default_exchange = FakeExchange()
+    connection = MagicMock()
+    connection.channel = AsyncMock(return_value=channel)
+    return connection, channel
+
+
+@pytest.mark.asyncio
+async def test_consumer_runtime_bounds_concurrency_and_acks():
+    queue = FakeQueue("commands")
+    connection, channel = make_consumer_connection(queue)
+    running = 0
+    peak = 0
+
+    async def handler(message):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    runtime = ConsumerRuntime(
+        connection_factory=AsyncMock(return_value=connection),
+        prefetch_count=10,
+        concurrency=3,
+    )
+    runtime.register("commands", handler, exchange_name="commands_exchange")
+    await runtime.start()
+    messages = [FakeMessage(str(index).encode()) for index in range(10)]
+    await asyncio.gather(*(queue.deliver(message) for message in messages))
+
+    assert peak == 3
+    assert all(message.acked for message in messages)
+    channel.set_qos.assert_awaited_once_with(prefetch_count=10)
+    queue.bind.assert_awaited_once()
+    stats = runtime.stats()["commands"]
+    assert stats["processed"] == 10
+    assert stats["in_flight"] == 0
+    await runtime.stop()
+
+
+@pytest.mark.asyncio
+async def test_consumer_runtime_rejects_failed_messages():
+    queue = FakeQueue("commands")
+    connection, _ = make_consumer_connection(queue)
+
+    async def handler(message):
+        raise RuntimeError("boom")
+
+    runtime = ConsumerRuntime(connection_factory=AsyncMock(return_value=connection))
+    runtime.register("commands", handler)
+    await runtime.start()
+    message = FakeMessage(b"1")
+    await queue.deliver(message)
+
+    assert message.rejected
+    assert runtime.stats()["commands"]["failed"] == 1
+    await runtime.stop()
+
+
+@pytest.mark.asyncio
+async def test_consumer_runtime_drains_in_flight_and_requeues_waiting():
+    queue = FakeQueue("commands")
+    connection, channel = make_consumer_connection(queue)
+    release = asyncio.Event()
+
+    async def handler(message):
+        await release.wait()
+
+    runtime = ConsumerRuntime(
+        connection_factory=AsyncMock(return_value=connection), concurrency=1
+    )
+    runtime.register("commands", handler)
+    await runtime.start()
+    in_flight = FakeMessage(b"1")
+    waiting = FakeMessage(b"2")
+    queue.deliver(in_flight)
+    queue.deliver(waiting)
+    await asyncio.sleep(0)
+
+    stopping = asyncio.create_task(runtime.stop(timeout=1))
+    await asyncio.sleep(0)
+    release.set()
+    await stopping
+
+    assert in_flight.acked
+    assert waiting.requeued
+    queue.cancel.assert_awaited_once_with("tag-commands")
+    channel.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_consumer_runtime_batches_and_acks_multiple():
+    queue = FakeQueue("commands")
+    connection, channel = make_consumer_connection(queue)
+    batches = []
+
+    async def handler(messages):
+        batches.append([message.body for message in messages])
+        return [message for message in messages if message.body == b"3"]
+
+    runtime = ConsumerRuntime(connection_factory=AsyncMock(return_value=connection))
+    runtime.register_batch("commands", handler, batch_size=4, linger_ms=10)
+    await runtime.start()
+    messages = [FakeMessage(str(tag).encode(), delivery_tag=tag) for tag in range(1, 7)]
+    await asyncio.gather(*(queue.deliver(message) for message in messages))
+
+    assert batches == [[b"1", b"2", b"3", b"4"], [b"5", b"6"]]
+    assert messages[2].rejected
+    assert messages[3].acked_multiple and messages[5].acked_multiple
+    assert not any(message.acked for message in messages[:3])
+    channel.set_qos.assert_awaited_once_with(prefetch_count=8)
+    stats = runtime.stats()["commands"]
+    assert stats["processed"] == 5
+    assert stats["failed"] == 1
+    assert stats["batches"] == 2
+    await runtime.stop()
+
+
+@pytest.mark.asyncio
+async def test_consumer_runtime_rejects_whole_batch_when_handler_raises():
+    queue = FakeQueue("commands")
+    connection, _ = make_consumer_connection(queue)
+
+    async def handler(messages):
+        raise RuntimeError("database down")
+
+    runtime = ConsumerRuntime(connection_factory=AsyncMock(return_value=connection))
+    runtime.register_batch("commands", handler, batch_size=2, linger_ms=1)
+    await runtime.start()
+    messages = [FakeMessage(b"1", delivery_tag=1), FakeMessage(b"2", delivery_tag=2)]
+    await asyncio.gather(*(queue.deliver(message) for message in messages))
+
+    assert all(message.rejected for message in messages)
+    assert runtime.stats()["commands"]["failed"] == 2
+    await runtime.stop()
+
+
+def test_retry_policy_backs_off_exponentially_up_to_the_cap():
+    policy = RetryPolicy(
+        max_attempts=6, initial_delay_ms=100, multiplier=3, max_delay_ms=2000
+    )
+
+    assert [policy.delay_ms(attempt) for attempt in range(1, 6)] == [
+        100,
+        300,
+        900,
+        2000,
+        2000,
+    ]
+    assert policy.delays == [100, 300, 900, 2000]
+
+
+@pytest.mark.asyncio
+async def test_consumer_runtime_schedules_retry_then_parks():
+    queue = FakeQueue("commands")
+    connection, channel = make_consumer_connection(queue)
+
+    async def handler(message):
+        raise RuntimeError("boom")
+
+    runtime = ConsumerRuntime(connection_factory=AsyncMock(return_value=connection))
+    runtime.register(
+        "commands",
+        handler,
+        retry_policy=RetryPolicy(max_attempts=3, initial_delay_ms=100),
+    )
+    await runtime.start()
+    first = FakeMessage(b"1")
+    last = FakeMessage(b"2", headers={"x-retry-attempts": 2})
+    await queue.deliver(first)
+    await queue.deliver(last)
+
+    assert first.acked and last.acked
+    published = channel.default_exchange.published
+    assert [routing_key for routing_key, _ in published] == [
+        "commands.retry.100ms",
+        "commands.parking",
+    ]
+    declared = [call.args[0] for call in channel.declare_queue.await_args_list]
+    assert "commands.retry.200ms" in declared
+    assert "commands.parking" in declared
+    stats = runtime.stats()["commands"]
+    assert stats["retried"] == 1
+    assert stats["parked"] == 1
+    await runtime.stop()
+
+
+def test_consumer_runtime_rejects_duplicate_queue():
+    runtime = ConsumerRuntime()
+
+    async def handler(message):
+        pass
+
+    runtime.register("commands", handler)
+    with pytest.raises(ValueError):
+        runtime.register("commands", handler)
+
+
+def test_partition_for_key_is_stable_and_in_range():
+    keys = [f"user{index}@example.com" for index in range(1000)]
+
+    partitions = [partition_for_key(key, 8) for key in keys]
+
+    assert partitions == [partition_for_key(key, 8) for key in keys]
+    assert set(partitions) == set(range(8))
+    assert partition_for_key("user@example.com", 1) == 0
+
+
+def test_partition_for_key_moves_few_keys_when_growing():
+    keys = [f"user{index}@example.com" for index in range(1000)]
+
+    moved = sum(partition_for_key(key, 8) != partition_for_key(key, 9) for key in keys)
+
+    assert moved < 200
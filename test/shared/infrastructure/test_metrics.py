@@ -0,0 +1,106 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from shared.infrastructure.metrics import (
+    HTTP_REQUEST_SECONDS,
+    CollectedMetric,
+    Metric,
+    MetricsMiddleware,
+    MetricsRegistry,
+    Sample,
+    measure_overhead,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+
+    histogram.observe(0.05, "/users")
+    histogram.observe(0.1, "/users")
+    histogram.observe(3, "/users")
+    rendered = registry.render()
+
+    assert 'latency_seconds_bucket{route="/users",le="0.1"} 2' in rendered
+    assert 'latency_seconds_bucket{route="/users",le="1.0"} 2' in rendered
+    assert 'latency_seconds_bucket{route="/users",le="+Inf"} 3' in rendered
+    assert 'latency_seconds_count{route="/users"} 3' in rendered
+    assert "# TYPE latency_seconds histogram" in rendered
+
+
+def test_label_cardinality_is_bounded():
+    registry = MetricsRegistry(max_series=2)
+    counter = registry.counter("requests_total", "Requests.", ("user",))
+
+    for user in range(5):
+        counter.inc(str(user))
+
+    assert set(counter._children) == {("0",), ("1",), ("other",)}
+    assert counter.labels("other").value == 3
+
+
+def test_registry_returns_existing_metric_and_rejects_conflicts():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events.", ("kind",))
+
+    assert registry.counter("events_total", "Events.", ("kind",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("events_total", "Events.", ("kind",))
+    with pytest.raises(ValueError):
+        counter.inc()
+
+
+def test_incomplete_metric_fails_on_instantiation():
+    class ChildlessMetric(Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        ChildlessMetric("childless", "Childless.")
+
+
+def test_collectors_are_read_at_render_time_and_failures_are_skipped():
+    registry = MetricsRegistry()
+    depth = {"value": 1}
+
+    def collect():
+        return [CollectedMetric("queue_depth", "gauge", "Depth.", [Sample({"queue": "q"}, depth["value"])])]
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.register_collector(collect)
+    registry.register_collector(broken)
+    depth["value"] = 7
+
+    assert 'queue_depth{queue="q"} 7' in registry.render()
+    registry.unregister_collector(collect)
+    assert "queue_depth" not in registry.render()
+
+
+def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+    router = APIRouter()
+
+    @router.get("/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    app.include_router(router, prefix="/items")
+    app.add_middleware(MetricsMiddleware)
+
+    with TestClient(app) as client:
+        client.get("/items/41")
+        client.get("/items/42")
+        client.get("/missing")
+
+    assert HTTP_REQUEST_SECONDS.labels("GET", "/items/{item_id}", "2xx").count == 2
+    assert HTTP_REQUEST_SECONDS.labels("GET", "unmatched", "4xx").count >= 1
+    assert ("GET", "/items/41", "2xx") not in HTTP_REQUEST_SECONDS._children
+
+
+def test_measure_overhead_reports_per_call_costs():
+    overhead = measure_overhead(iterations=1000)
+
+    assert overhead["iterations"] == 1000
+    assert {"counter_inc_ns", "histogram_observe_ns", "histogram_child_observe_ns"} <= set(overhead)
@@ -0,0 +1,65 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from shared.infrastructure.outbox import (
+    OutboxMessage,
+    OutboxRelay,
+    stage_outbox_message,
+)
+
+
+class FlakyExchange:
+    def __init__(self, failing_routing_key):
+        self.failing_routing_key = failing_routing_key
+        self.published = []
+
+    async def publish(self, message, routing_key):
+        await asyncio.sleep(0)
+        if routing_key == self.failing_routing_key:
+            raise ConnectionError("broker unavailable")
+        self.published.append((routing_key, message.body))
+
+
+def make_channel_pool(exchange):
+    channel = MagicMock()
+    channel.default_exchange = exchange
+
+    @asynccontextmanager
+    async def acquire():
+        yield channel
+
+    pool = MagicMock()
+    pool.acquire = acquire
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_relay_deletes_published_rows_and_keeps_failed_ones():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(OutboxMessage.__table__.create)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        stage_outbox_message(session, "", "sent", b"first")
+        stage_outbox_message(session, "", "failing", b"second")
+        await session.commit()
+
+    exchange = FlakyExchange(failing_routing_key="failing")
+    relay = OutboxRelay(session_factory=session_factory)
+    with patch(
+        "shared.infrastructure.outbox.get_channel_pool",
+        return_value=make_channel_pool(exchange),
+    ):
+        assert await relay.relay_batch() == 2
+
+    assert exchange.published == [("sent", b"first")]
+    assert relay.stats() == {"relayed": 1, "failed": 1, "batches": 1}
+    async with session_factory() as session:
+        remaining = (await session.execute(select(OutboxMessage.routing_key))).scalars().all()
+        assert remaining == ["failing"]
+    await engine.dispose()
@@ -0,0 +1,38 @@
+import json
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from src.shared.domain.helpers import exit_json
+from src.shared.infrastructure.responses import EnvelopeResponse
+from src.users.infraestructure.models import UserFindModel
+
+
+class LegacyEnvelope(BaseModel):
+    state: int
+    msg: str
+    data: Optional[Any] = None
+
+
+def legacy_envelope(state, data):
+    return LegacyEnvelope(state=state, msg="success" if state == 1 else "error", data=data).model_dump()
+
+
+def test_envelope_response_matches_the_legacy_envelope():
+    users = [UserFindModel(user_id=1, name="Ada", email="ada@example.com"), None]
+    for state, data in [
+        (1, {"user": users[0]}),
+        (1, {"users": users, "missing": [2]}),
+        (0, {"message": "USUARIO_NO_ENCONTRADO"}),
+    ]:
+        response = EnvelopeResponse(exit_json(state, data))
+
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == legacy_envelope(state, data)
+
+
+def test_envelope_response_keeps_the_status_code():
+    response = EnvelopeResponse(exit_json(1, {"id": 1}), status_code=201)
+
+    assert response.status_code == 201
+    assert response.body == b'{"state":1,"msg":"success","data":{"id":1}}'
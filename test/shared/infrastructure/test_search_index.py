@@ -0,0 +1,46 @@
+from shared.infrastructure.search_index import NGramIndex
+
+
+def build_index(**kwargs):
+    index = NGramIndex(**kwargs)
+    index.add(1, ("Ada Lovelace", "ada@example.com"))
+    index.add(2, ("Grace Hopper", "grace@navy.mil"))
+    index.add(3, ("Adam Smith", "smith@example.com"))
+    return index
+
+
+def test_search_matches_substrings_and_short_prefixes():
+    index = build_index()
+
+    assert [doc_id for doc_id, _ in index.search("opp")] == [2]
+    assert [doc_id for doc_id, _ in index.search("NAVY.MIL")] == [2]
+    assert [doc_id for doc_id, _ in index.search("gr")] == [2]
+    assert index.search("ra") == []
+    assert [doc_id for doc_id, _ in index.search("ada smith")] == [3]
+    assert index.search("ada hopper") == []
+    assert index.search("xyz") == []
+
+
+def test_search_ranks_exact_then_prefix_then_substring():
+    index = build_index()
+    index.add(4, ("Ramada Inn", "inn@example.com"))
+
+    assert [doc_id for doc_id, _ in index.search("ada")] == [1, 3, 4]
+    assert [doc_id for doc_id, _ in index.search("ada lovelace")] == [1]
+    assert index.search("example", limit=1) == [(1, ("Ada Lovelace", "ada@example.com"))]
+
+
+def test_add_replaces_documents_and_rejects_when_full():
+    index = build_index(max_documents=3)
+
+    index.add(2, ("Grace Brewster", "grace@navy.mil"))
+    assert index.search("hopper") == []
+    assert [doc_id for doc_id, _ in index.search("brewster")] == [2]
+
+    assert index.add(4, ("Alan Turing", "alan@example.com")) is False
+    assert index.stats()["rejected"] == 1
+
+    index.remove(3)
+    assert index.search("smith") == []
+    assert index.add(4, ("Alan Turing", "alan@example.com")) is True
+    assert len(index) == 3
@@ -2,9 +2,16 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from src.users.application.use_cases.commands import RegisterUserUseCase
+from src.users.application.use_cases.commands import (
+    BulkRegisterUsersUseCase,
+    RegisterUserUseCase,
+)
 from src.users.domain.user import User
-from src.users.infraestructure.models import UserModel
+from src.users.infraestructure.models import (
+    CreateUserCommand,
+    UserCreateModel,
+    UserModel,
+)
 
 
 @pytest.fixture
@@ -75,3 +82,60 @@ async def test_register_user_repository_error(
 
     mock_user_repository.get_user_by_email.assert_called_once_with("test@example.com")
     mock_user_repository.save_user.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_register_skips_existing_and_repeated_emails(mock_user_repository):
+    use_case = BulkRegisterUsersUseCase(user_repository=mock_user_repository)
+    commands = [
+        UserCreateModel(name="A", email="a@example.com", password="secret-a"),
+        UserCreateModel(name="B", email="b@example.com", password="secret-b"),
+        UserCreateModel(name="A2", email="a@example.com", password="secret-c"),
+        UserCreateModel(name="C", email="c@example.com", password="secret-d"),
+    ]
+    mock_user_repository.get_existing_emails.return_value = {"b@example.com"}
+
+    async def insert_users(users):
+        for user_id, user in enumerate(users, start=1):
+            user.user_id = user_id
+        return users
+
+    mock_user_repository.insert_users.side_effect = insert_users
+
+    result = await use_case.execute(commands)
+
+    assert [user.email if user else None for user in result] == [
+        "a@example.com",
+        None,
+        None,
+        "c@example.com",
+    ]
+    inserted = mock_user_repository.insert_users.call_args.args[0]
+    assert len(inserted) == 2
+    assert inserted[0].verify_password("secret-a")
+
+
+@pytest.mark.asyncio
+async def test_bulk_register_reports_insert_conflicts(mock_user_repository):
+    use_case = BulkRegisterUsersUseCase(user_repository=mock_user_repository)
+    commands = [UserCreateModel(name="A", email="a@example.com", password="secret")]
+    mock_user_repository.get_existing_emails.return_value = set()
+    mock_user_repository.insert_users.return_value = []
+
+    assert await use_case.execute(commands) == [None]
+
+
+@pytest.mark.asyncio
+async def test_bulk_register_hashed_stores_hashes_as_given(mock_user_repository):
+    use_case = BulkRegisterUsersUseCase(user_repository=mock_user_repository)
+    commands = [
+        CreateUserCommand(name="A", email="a@example.com", hashed_password="hash-a"),
+        CreateUserCommand(name="B", email="b@example.com", hashed_password="hash-b"),
+    ]
+    mock_user_repository.get_existing_emails.return_value = {"b@example.com"}
+    mock_user_repository.insert_users.side_effect = lambda users: users
+
+    result = await use_case.execute_hashed(commands)
+
+    assert result[1] is None
+    assert result[0].hashed_password == "hash-a"
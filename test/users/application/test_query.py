@@ -2,7 +2,12 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from src.users.application.use_cases.queries import GetUserByIdUseCase
+from src.users.application.use_cases.queries import (
+    GetUserByIdUseCase,
+    GetUsersByIdsUseCase,
+    IsEmailAvailableUseCase,
+    ListUsersUseCase,
+)
 from src.users.domain.user import User
 
 
@@ -52,3 +57,61 @@ async def test_get_user_by_id_repository_error(
         await get_user_by_id_use_case.execute(user_id=1)
 
     mock_user_repository.get_user_by_id.assert_called_once_with(1)
+
+
+@pytest.mark.asyncio
+async def test_get_users_by_ids_keeps_request_order(mock_user_repository):
+    use_case = GetUsersByIdsUseCase(user_repository=mock_user_repository)
+    mock_user_repository.get_users_by_ids.return_value = [
+        User(user_id=2, name="B", email="b@example.com", hashed_password="x"),
+        User(user_id=1, name="A", email="a@example.com", hashed_password="x"),
+    ]
+
+    result = await use_case.execute([1, 3, 2, 1])
+
+    assert [user.user_id if user else None for user in result] == [1, None, 2, 1]
+    mock_user_repository.get_users_by_ids.assert_called_once_with([1, 3, 2])
+
+
+@pytest.mark.asyncio
+async def test_list_users_returns_next_page_start_when_more_users_exist(mock_user_repository):
+    use_case = ListUsersUseCase(user_repository=mock_user_repository)
+    mock_user_repository.list_users.return_value = [
+        User(user_id=user_id, name="U", email=f"u{user_id}@example.com", hashed_password="x")
+        for user_id in (4, 7, 9)
+    ]
+
+    users, next_after_id = await use_case.execute(after_id=3, limit=2, email_prefix="u")
+
+    assert [user.user_id for user in users] == [4, 7]
+    assert next_after_id == 7
+    mock_user_repository.list_users.assert_called_once_with(3, 3, "u")
+
+
+@pytest.mark.asyncio
+async def test_list_users_last_page_has_no_next_page(mock_user_repository):
+    use_case = ListUsersUseCase(user_repository=mock_user_repository)
+    mock_user_repository.list_users.return_value = [
+        User(user_id=4, name="U", email="u4@example.com", hashed_password="x")
+    ]
+
+    users, next_after_id = await use_case.execute(after_id=None, limit=2)
+
+    assert len(users) == 1
+    assert next_after_id is None
+
+
+@pytest.mark.asyncio
+async def test_email_available_skips_the_repository_for_ruled_out_emails(mock_user_repository):
+    use_case = IsEmailAvailableUseCase(
+        mock_user_repository, might_exist=lambda email: email == "ada@example.com"
+    )
+    mock_user_repository.get_user_by_email.return_value = User(
+        user_id=1, name="Ada", email="ada@example.com", hashed_password="x"
+    )
+
+    assert await use_case.execute("nobody@example.com") is True
+    mock_user_repository.get_user_by_email.assert_not_called()
+
+    assert await use_case.execute("ada@example.com") is False
+    mock_user_repository.get_user_by_email.assert_called_once_with("ada@example.com")
@@ -0,0 +1,175 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from shared.infrastructure.outbox import OutboxMessage
+from src.users.application.services_handlers import (
+    UserExportServiceHandler,
+    UserServiceHandler,
+)
+from src.users.domain.user import User
+from src.users.infraestructure.models import UserCreateModel
+from users.infraestructure.messaging import (
+    create_user_command_from,
+    create_user_partition,
+    create_user_routing_key,
+    decode_create_user_commands,
+)
+
+
+@pytest.fixture
+def db_session():
+    session = AsyncMock()
+    session.add = MagicMock()
+    return session
+
+
+@pytest.fixture
+def user_data():
+    return UserCreateModel(
+        name="Test User", email="test@example.com", password="securepassword123"
+    )
+
+
+@pytest.fixture
+def saved_user():
+    return User(
+        user_id=1, name="Test User", email="test@example.com", hashed_password="x"
+    )
+
+
+async def fake_set_password(self, password):
+    self.hashed_password = "hashed-" + password[::-1]
+
+
+@pytest.mark.asyncio
+@patch("src.users.application.services_handlers.settings.OUTBOX_ENABLED", True)
+@patch(
+    "src.users.application.services_handlers.UserCommandPublisher.publish_create_user_command",
+    new_callable=AsyncMock,
+)
+@patch.object(User, "set_password_async", fake_set_password)
+async def test_register_user_stages_hashed_command_in_outbox(
+    mock_publish, db_session, user_data
+):
+    repository = AsyncMock()
+    repository.get_user_by_email.return_value = None
+    repository.save_user.side_effect = lambda user: user
+
+    with patch(
+        "src.users.application.services_handlers.build_user_repository",
+        return_value=repository,
+    ):
+        response = await UserServiceHandler(db_session).register_user(user_data)
+
+    assert response["state"] == 1
+    staged = db_session.add.call_args.args[0]
+    assert isinstance(staged, OutboxMessage)
+    assert staged.routing_key == create_user_routing_key(
+        create_user_partition("test@example.com")
+    )
+    assert user_data.password.encode() not in staged.body
+    [command] = decode_create_user_commands(
+        staged.body, staged.content_type, staged.headers
+    )
+    assert command.hashed_password == "hashed-" + user_data.password[::-1]
+    mock_publish.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("src.users.application.services_handlers.settings.OUTBOX_ENABLED", False)
+@patch(
+    "src.users.application.services_handlers.UserCommandPublisher.publish_create_user_command",
+    new_callable=AsyncMock,
+)
+@patch(
+    "src.users.application.services_handlers.RegisterUserUseCase.execute",
+    new_callable=AsyncMock,
+)
+async def test_register_user_publishes_without_outbox(
+    mock_execute, mock_publish, db_session, user_data, saved_user
+):
+    mock_execute.return_value = saved_user
+
+    with patch("users.infraestructure.messaging.get_buffered_publisher"):
+        response = await UserServiceHandler(db_session).register_user(user_data)
+
+    assert response["state"] == 1
+    db_session.add.assert_not_called()
+    mock_publish.assert_awaited_once_with(create_user_command_from(saved_user))
+
+
+@pytest.mark.asyncio
+@patch("src.users.application.services_handlers.settings.OUTBOX_ENABLED", False)
+@patch(
+    "src.users.application.services_handlers.RegisterUserUseCase.execute",
+    new_callable=AsyncMock,
+)
+async def test_register_user_stages_dropped_command_in_outbox(
+    mock_execute, db_session, user_data, saved_user
+):
+    mock_execute.return_value = saved_user
+    publisher = MagicMock()
+    publisher.publish = AsyncMock(return_value=False)
+
+    with patch("users.infraestructure.messaging.get_buffered_publisher", return_value=publisher):
+        response = await UserServiceHandler(db_session).register_user(user_data)
+
+    assert response["state"] == 1
+    publisher.publish.assert_awaited_once()
+    staged = db_session.add.call_args.args[0]
+    assert isinstance(staged, OutboxMessage)
+    assert staged.routing_key == create_user_routing_key(
+        create_user_partition("test@example.com")
+    )
+    db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("src.users.application.services_handlers.settings.OUTBOX_ENABLED", True)
+@patch(
+    "src.users.application.services_handlers.RegisterUserUseCase.execute",
+    new_callable=AsyncMock,
+)
+async def test_register_user_failure_rolls_back_outbox(
+    mock_execute, db_session, user_data
+):
+    mock_execute.side_effect = ValueError("User with this email already exists.")
+
+    response = await UserServiceHandler(db_session).register_user(user_data)
+
+    assert response["state"] == 0
+    db_session.rollback.assert_awaited_once()
+
+
+class FakeExportRepository:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def stream_users(self, after_id, chunk_size, limit=None):
+        self.calls.append((after_id, chunk_size, limit))
+        remaining = [row for row in self.rows if after_id is None or row[0] > after_id][:limit]
+        for start in range(0, len(remaining), chunk_size):
+            yield remaining[start:start + chunk_size]
+
+
+@pytest.mark.asyncio
+async def test_export_users_resumes_in_a_new_session_after_each_transaction():
+    rows = [(user_id, f"User, {user_id}", f"u{user_id}@example.com") for user_id in range(1, 6)]
+    repository = FakeExportRepository(rows)
+    session_factory = MagicMock()
+    handler = UserExportServiceHandler(session_factory, chunk_size=2, rows_per_transaction=3)
+
+    with patch(
+        "src.users.application.services_handlers.build_user_repository",
+        return_value=repository,
+    ):
+        chunks = [chunk async for chunk in handler.export_users("csv")]
+
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0] == "user_id,name,email"
+    assert lines[1] == '1,"User, 1",u1@example.com'
+    assert len(lines) == 6
+    assert repository.calls == [(None, 2, 3), (3, 2, 3)]
+    assert session_factory.call_count == 2
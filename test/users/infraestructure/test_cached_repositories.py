@@ -0,0 +1,131 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import inspect
+
+from shared.infrastructure.cache import TTLCache
+from src.users.domain.user import User
+from users.infraestructure.cached_repositories import CachedUserRepository
+
+
+@pytest.fixture
+def mock_user_repository():
+    return AsyncMock()
+
+
+@pytest.fixture
+def cached_repository(mock_user_repository):
+    return CachedUserRepository(
+        mock_user_repository, cache=TTLCache(max_size=10, ttl_seconds=60)
+    )
+
+
+def make_user(user_id: int = 1, email: str = "test@example.com") -> User:
+    return User(
+        user_id=user_id,
+        name="Test User",
+        email=email,
+        hashed_password="hashedpassword",
+        token_version=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_is_read_through(cached_repository, mock_user_repository):
+    mock_user_repository.get_user_by_id.return_value = make_user()
+
+    first = await cached_repository.get_user_by_id(1)
+    second = await cached_repository.get_user_by_id(1)
+
+    mock_user_repository.get_user_by_id.assert_called_once_with(1)
+    assert second.email == "test@example.com"
+    assert second is not first
+    assert inspect(second).detached
+
+
+@pytest.mark.asyncio
+async def test_lookup_by_id_populates_email_entry(
+    cached_repository, mock_user_repository
+):
+    mock_user_repository.get_user_by_id.return_value = make_user()
+
+    await cached_repository.get_user_by_id(1)
+    user = await cached_repository.get_user_by_email("test@example.com")
+
+    assert user.user_id == 1
+    mock_user_repository.get_user_by_email.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_missing_email_is_negatively_cached(
+    cached_repository, mock_user_repository
+):
+    mock_user_repository.get_user_by_email.return_value = None
+
+    assert await cached_repository.get_user_by_email("missing@example.com") is None
+    assert await cached_repository.get_user_by_email("missing@example.com") is None
+
+    mock_user_repository.get_user_by_email.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch(
+    "users.infraestructure.cached_repositories.broadcast_user_invalidation",
+    new_callable=AsyncMock,
+)
+async def test_save_user_invalidates_and_broadcasts(
+    mock_broadcast, cached_repository, mock_user_repository
+):
+    mock_user_repository.get_user_by_email.return_value = None
+    await cached_repository.get_user_by_email("test@example.com")
+
+    user = make_user()
+    mock_user_repository.save_user.return_value = user
+    await cached_repository.save_user(user)
+
+    mock_user_repository.get_user_by_email.return_value = user
+    found = await cached_repository.get_user_by_email("test@example.com")
+
+    assert found.user_id == 1
+    mock_broadcast.assert_awaited_once_with(1, ["test@example.com"])
+
+
+@pytest.mark.asyncio
+async def test_get_users_by_ids_only_queries_misses(
+    cached_repository, mock_user_repository
+):
+    mock_user_repository.get_user_by_id.return_value = make_user(1)
+    await cached_repository.get_user_by_id(1)
+    mock_user_repository.get_users_by_ids.return_value = [
+        make_user(2, "other@example.com")
+    ]
+
+    users = await cached_repository.get_users_by_ids([1, 2])
+
+    assert sorted(user.user_id for user in users) == [1, 2]
+    mock_user_repository.get_users_by_ids.assert_called_once_with([2])
+
+
+@pytest.mark.asyncio
+@patch(
+    "users.infraestructure.cached_repositories.broadcast_user_invalidation",
+    new_callable=AsyncMock,
+)
+async def test_email_spellings_share_one_entry(
+    mock_broadcast, cached_repository, mock_user_repository
+):
+    mock_user_repository.get_user_by_email.return_value = make_user(email="Test@Example.com")
+    await cached_repository.get_user_by_email("Test@Example.com")
+
+    mock_user_repository.get_user_by_email.return_value = None
+    assert await cached_repository.get_user_by_email("test@example.com") is None
+    assert mock_user_repository.get_user_by_email.await_count == 2
+
+    user = make_user(email="test@example.com")
+    mock_user_repository.save_user.return_value = user
+    await cached_repository.save_user(user)
+
+    mock_user_repository.get_user_by_email.return_value = user
+    found = await cached_repository.get_user_by_email("test@example.com")
+    assert found.email == "test@example.com"
+    assert mock_user_repository.get_user_by_email.await_count == 3
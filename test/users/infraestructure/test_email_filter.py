@@ -0,0 +1,64 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.users.domain.user import User
+from users.infraestructure.email_filter import (
+    EmailTrackingUserRepository,
+    UserEmailFilter,
+)
+
+
+class FakeRepository:
+    def __init__(self, session):
+        pass
+
+    async def stream_users(self, after_id, chunk_size, limit=None):
+        yield [(1, "Ada Lovelace", "Ada@Example.com"), (2, "Grace Hopper", "grace@navy.mil")]
+
+
+async def build_filter():
+    email_filter = UserEmailFilter(capacity=100, false_positive_rate=0.001)
+    with patch("users.infraestructure.email_filter.UserRepository", FakeRepository):
+        assert await email_filter.rebuild(session_factory=MagicMock()) == 2
+    return email_filter
+
+
+@pytest.mark.asyncio
+async def test_rebuild_rules_out_unregistered_emails_only():
+    email_filter = UserEmailFilter(capacity=100, false_positive_rate=0.001)
+    assert email_filter.might_exist("nobody@example.com")
+
+    email_filter = await build_filter()
+
+    assert email_filter.might_exist("ada@example.com")
+    assert email_filter.might_exist(" GRACE@navy.mil")
+    assert not email_filter.might_exist("nobody@example.com")
+    assert email_filter.stats()["skipped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lookups_by_email_always_reach_the_repository():
+    email_filter = await build_filter()
+    repository = AsyncMock()
+    repository.get_existing_emails.return_value = set()
+    tracking = EmailTrackingUserRepository(repository, email_filter)
+
+    await tracking.get_user_by_email("nobody@example.com")
+    repository.get_user_by_email.assert_awaited_once_with("nobody@example.com")
+
+    await tracking.get_existing_emails(["nobody@example.com"])
+    repository.get_existing_emails.assert_awaited_once_with(["nobody@example.com"])
+    assert email_filter.stats()["checked"] == 0
+
+
+@pytest.mark.asyncio
+async def test_saved_users_are_added_to_the_filter():
+    email_filter = await build_filter()
+    repository = AsyncMock()
+    repository.save_user.side_effect = lambda user: user
+    tracking = EmailTrackingUserRepository(repository, email_filter)
+
+    await tracking.save_user(User(user_id=3, name="Alan Turing", email="alan@example.com"))
+
+    assert email_filter.might_exist("alan@example.com")
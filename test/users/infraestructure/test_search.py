@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from shared.domain.base_errores import IndexNotReadyError
+from src.users.domain.user import User
+from users.infraestructure import search
+from users.infraestructure.search import IndexedUserRepository, UserSearchIndex
+
+
+class FakeRepository:
+    def __init__(self, session):
+        pass
+
+    async def stream_users(self, after_id, chunk_size, limit=None):
+        yield [(1, "Ada Lovelace", "ada@example.com"), (2, "Grace Hopper", "grace@navy.mil")]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_makes_the_index_searchable():
+    index = UserSearchIndex(max_users=10, max_candidates=10)
+    with pytest.raises(IndexNotReadyError):
+        index.search("ada", 5)
+
+    with patch("users.infraestructure.search.UserRepository", FakeRepository):
+        assert await index.rebuild(session_factory=MagicMock()) == 2
+
+    assert index.search("hop", 5) == [(2, "Grace Hopper", "grace@navy.mil")]
+    assert index.complete
+
+
+def test_index_users_is_ignored_until_started():
+    index = UserSearchIndex(max_users=10, max_candidates=10)
+
+    index.index_users([(1, "Ada Lovelace", "ada@example.com")])
+    assert len(index.index) == 0
+
+    index.started = index.ready = True
+    index.index_users([(1, "Ada Lovelace", "ada@example.com")])
+    assert index.search("love", 5) == [(1, "Ada Lovelace", "ada@example.com")]
+
+
+@pytest.mark.asyncio
+async def test_inserted_users_are_indexed_on_commit_only():
+    index = UserSearchIndex(max_users=10, max_candidates=10)
+    index.started = index.ready = True
+    session = SimpleNamespace(info={})
+    repository = AsyncMock()
+    repository.insert_users.return_value = [
+        User(user_id=7, name="Alan Turing", email="alan@example.com", hashed_password="x")
+    ]
+    indexed = IndexedUserRepository(repository, SimpleNamespace(sync_session=session))
+
+    with patch.object(search, "user_search_index", index), patch.object(
+        search, "broadcast_users_created", new_callable=AsyncMock
+    ) as broadcast:
+        await indexed.insert_users([])
+        assert index.search("turing", 5) == []
+
+        search._index_committed_users(session)
+        await search.spawn(AsyncMock()())
+
+    assert index.search("turing", 5) == [(7, "Alan Turing", "alan@example.com")]
+    broadcast.assert_awaited_once_with([(7, "Alan Turing", "alan@example.com")])
+    assert search.PENDING_USERS_KEY not in session.info
+
+
+@pytest.mark.asyncio
+async def test_saved_users_are_broadcast_only_when_inserted():
+    index = UserSearchIndex(max_users=10, max_candidates=10)
+    index.started = index.ready = True
+    repository = AsyncMock()
+
+    def assign_id(user):
+        user.user_id = user.user_id or 8
+        return user
+
+    repository.save_user.side_effect = assign_id
+    indexed = IndexedUserRepository(repository, SimpleNamespace(sync_session=None))
+
+    with patch.object(search, "user_search_index", index), patch.object(
+        search, "broadcast_users_created", new_callable=AsyncMock
+    ) as broadcast:
+        user = await indexed.save_user(
+            User(name="Alan Turing", email="alan@example.com", hashed_password="x")
+        )
+        user.name = "Alan M. Turing"
+        await indexed.save_user(user)
+        await search.spawn(AsyncMock()())
+
+    assert index.search("m. turing", 5) == [(8, "Alan M. Turing", "alan@example.com")]
+    broadcast.assert_awaited_once_with([(8, "Alan Turing", "alan@example.com")])
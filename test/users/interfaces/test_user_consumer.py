@@ -0,0 +1,178 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import aio_pika
+import pytest
+
+from shared.infrastructure.memory_bus import InMemoryBroker
+from shared.infrastructure.messaging import ConsumerRuntime
+from src.users.infraestructure.models import CreateUserCommand
+from users.infraestructure.messaging import (
+    USER_COMMAND_EXCHANGE,
+    create_user_partition,
+    create_user_routing_key,
+    decode_create_user_commands,
+    encode_create_user_commands,
+)
+from users.interfaces.consumers import user_consumer
+from users.interfaces.consumers.launcher import assign_partitions
+from users.interfaces.consumers.user_consumer import (
+    process_create_user_batch,
+    register_user_consumers,
+)
+
+
+def make_message(body: bytes, content_type="application/json", headers=None):
+    message = MagicMock()
+    message.body = body
+    message.content_type = content_type
+    message.headers = headers or {}
+    return message
+
+
+def command_message(*emails: str):
+    body, content_type, headers = encode_create_user_commands(
+        [
+            CreateUserCommand(name="Test", email=email, hashed_password="hash")
+            for email in emails
+        ]
+    )
+    return make_message(body, content_type, headers)
+
+
+@pytest.mark.asyncio
+async def test_batch_inserts_valid_commands_once(monkeypatch):
+    register = AsyncMock(return_value=[MagicMock(), None, MagicMock()])
+    monkeypatch.setattr(user_consumer, "register_create_user_commands", register)
+    malformed = make_message(b"not json")
+    messages = [command_message("a@example.com", "b@example.com"), malformed]
+    messages.append(command_message("c@example.com"))
+
+    failed = await process_create_user_batch(messages)
+
+    assert failed == [malformed]
+    register.assert_awaited_once()
+    commands = register.await_args.args[0]
+    assert [command.email for command in commands] == [
+        "a@example.com",
+        "b@example.com",
+        "c@example.com",
+    ]
+    assert all(command.hashed_password == "hash" for command in commands)
+
+
+@pytest.mark.asyncio
+async def test_batch_hashes_legacy_plaintext_commands(monkeypatch):
+    register = AsyncMock(return_value=[MagicMock()])
+    monkeypatch.setattr(user_consumer, "register_create_user_commands", register)
+    monkeypatch.setattr(
+        user_consumer, "hash_passwords_async", AsyncMock(return_value=["hashed"])
+    )
+    legacy = make_message(
+        b'{"name": "Test", "email": "a@example.com", "password": "secret123"}'
+    )
+
+    assert await process_create_user_batch([legacy]) == []
+    [command] = register.await_args.args[0]
+    assert command.hashed_password == "hashed"
+
+
+@pytest.mark.asyncio
+async def test_batch_falls_back_to_single_messages_on_failure(monkeypatch):
+    async def register(commands):
+        if len(commands) > 1 or commands[0].email == "bad@example.com":
+            raise RuntimeError("insert failed")
+        return [MagicMock()]
+
+    monkeypatch.setattr(user_consumer, "register_create_user_commands", register)
+    good = command_message("good@example.com")
+    bad = command_message("bad@example.com")
+
+    failed = await process_create_user_batch([good, bad])
+
+    assert failed == [bad]
+
+
+def test_register_user_consumers_declares_one_queue_per_partition():
+    runtime = ConsumerRuntime()
+
+    register_user_consumers(runtime, [0, 2])
+
+    assert list(runtime.handlers) == ["create_user_queue.0", "create_user_queue.2"]
+    handler = runtime.handlers["create_user_queue.2"]
+    assert handler.routing_key == create_user_routing_key(2)
+    assert handler.queue_arguments == {"x-single-active-consumer": True}
+
+
+def test_register_user_consumers_accepts_a_handler_and_batch_prefetch(monkeypatch):
+    monkeypatch.setattr(user_consumer.settings, "CONSUMER_BATCH_SIZE", 10)
+    monkeypatch.setattr(user_consumer.settings, "CONSUMER_BATCH_PREFETCH_COUNT", 15)
+    runtime = ConsumerRuntime()
+
+    async def handler(messages):
+        return []
+
+    register_user_consumers(runtime, [1], handler=handler)
+
+    registration = runtime.handlers["create_user_queue.1"]
+    assert registration.handler is handler
+    assert registration.prefetch_count == 15
+
+
+@pytest.mark.asyncio
+async def test_retried_command_is_processed_after_later_commands_for_the_same_email(
+    monkeypatch,
+):
+    monkeypatch.setattr(user_consumer.settings, "CONSUMER_RETRY_INITIAL_DELAY_MS", 5)
+    monkeypatch.setattr(user_consumer.settings, "CONSUMER_BATCH_LINGER_MS", 0)
+    connection = InMemoryBroker().connect()
+    processed = []
+    failed_once = set()
+    done = asyncio.Event()
+
+    async def handler(messages):
+        failed = []
+        for message in messages:
+            command = decode_create_user_commands(
+                message.body, message.content_type, message.headers
+            )[0]
+            if command.name == "first" and command.name not in failed_once:
+                failed_once.add(command.name)
+                failed.append(message)
+            else:
+                processed.append(command.name)
+        if len(processed) == 2:
+            done.set()
+        return failed
+
+    async def connection_factory():
+        return connection
+
+    runtime = ConsumerRuntime(connection_factory=connection_factory)
+    register_user_consumers(runtime, [0], handler=handler)
+    await runtime.start()
+    channel = await connection.channel()
+    exchange = await channel.get_exchange(USER_COMMAND_EXCHANGE)
+    for name in ("first", "second"):
+        body, content_type, headers = encode_create_user_commands(
+            [CreateUserCommand(name=name, email="ada@example.com", hashed_password="hash")]
+        )
+        await exchange.publish(
+            aio_pika.Message(body=body, content_type=content_type, headers=headers),
+            routing_key=create_user_routing_key(0),
+        )
+    await asyncio.wait_for(done.wait(), 1)
+    await runtime.stop()
+
+    assert processed == ["second", "first"]
+
+
+def test_create_user_partition_ignores_email_case():
+    assert create_user_partition("User@Example.com", 4) == create_user_partition(
+        "user@example.com", 4
+    )
+
+
+def test_assign_partitions_gives_each_partition_one_worker():
+    assert assign_partitions(4, 2) == [[0, 2], [1, 3]]
+    assert assign_partitions(2, 8) == [[0], [1]]
@@ -4,12 +4,20 @@ import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from src.users.interfaces.user_controller import router
+from auth.domain.principal import Principal
+from auth.interfaces.dependencies import get_current_principal
+from shared.configuration.config import settings
+from src.shared.domain.helpers import encode_cursor
+from src.users.interfaces.user_controller import collection_router, router
 
 # filepath: e:\PycharmProjects\guinea\test\users\interfaces\test_user_controller.py
 
 app = FastAPI()
+app.include_router(collection_router, prefix="/users")
 app.include_router(router)
+app.dependency_overrides[get_current_principal] = lambda: Principal(
+    user_id=1, email="test@example.com"
+)
 
 
 @pytest.fixture
@@ -17,6 +25,13 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def anonymous_client():
+    override = app.dependency_overrides.pop(get_current_principal)
+    yield TestClient(app)
+    app.dependency_overrides[get_current_principal] = override
+
+
 def test_health_check(client):
     response = client.get("/")
     assert response.status_code == 200
@@ -97,3 +112,136 @@ def test_get_user_by_id_failure(mock_get_user_by_id, client):
     response = client.get("/1")
     assert response.status_code == 500
     assert response.json() == {"detail": "An error occurred while retrieving the user."}
+
+
+@patch(
+    "src.users.application.services_handlers.UserServiceHandler.get_users_by_ids",
+    new_callable=AsyncMock,
+)
+def test_get_users_by_ids_parses_repeated_and_comma_separated(mock_get_users, client):
+    mock_get_users.return_value = {"state": 1, "msg": "success", "data": {}}
+
+    response = client.get("/users?ids=1,2&ids=3")
+
+    assert response.status_code == 200
+    mock_get_users.assert_called_once_with([1, 2, 3])
+
+
+def test_get_users_by_ids_rejects_invalid_ids(client):
+    response = client.get("/users?ids=1,abc")
+    assert response.status_code == 400
+
+
+@patch("src.users.interfaces.user_controller.settings.USERS_MULTI_GET_MAX_IDS", 2)
+def test_lookup_users_rejects_oversized_batch(client):
+    response = client.post("/lookup", json={"user_ids": [1, 2, 3]})
+    assert response.status_code == 400
+
+
+@patch(
+    "src.users.application.services_handlers.UserServiceHandler.get_users_by_ids",
+    new_callable=AsyncMock,
+)
+def test_lookup_users_success(mock_get_users, client):
+    mock_get_users.return_value = {"state": 1, "msg": "success", "data": {}}
+
+    response = client.post("/lookup", json={"user_ids": [4, 5]})
+
+    assert response.status_code == 200
+    mock_get_users.assert_called_once_with([4, 5])
+
+
+@patch(
+    "src.users.application.services_handlers.UserServiceHandler.list_users",
+    new_callable=AsyncMock,
+)
+def test_list_users_decodes_cursor_and_applies_default_page_size(mock_list_users, client):
+    mock_list_users.return_value = {"state": 1, "msg": "success", "data": {"users": [], "next_cursor": None}}
+
+    response = client.get(f"/users?cursor={encode_cursor(40)}&email_prefix=ad")
+
+    assert response.status_code == 200
+    assert response.json()["data"]["next_cursor"] is None
+    mock_list_users.assert_called_once_with(40, settings.USERS_PAGE_SIZE, "ad")
+
+
+def test_list_users_rejects_invalid_cursor_and_oversized_page(client):
+    assert client.get("/users?cursor=garbage").status_code == 400
+    assert client.get(f"/users?limit={settings.USERS_PAGE_MAX_SIZE + 1}").status_code == 400
+    assert client.get("/users?limit=0").status_code == 422
+
+
+def test_search_users_is_unavailable_until_the_index_is_built(client):
+    with patch("users.infraestructure.search.user_search_index.ready", False):
+        response = client.get("/search?q=ada")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@patch(
+    "src.users.application.services_handlers.UserSearchServiceHandler.search_users",
+)
+def test_search_users_caps_the_limit(mock_search_users, client):
+    mock_search_users.return_value = {"state": 1, "msg": "success", "data": {"users": [], "complete": True}}
+
+    response = client.get("/search?q=ada&limit=100000")
+
+    assert response.status_code == 200
+    mock_search_users.assert_called_once_with("ada", settings.USER_SEARCH_MAX_RESULTS)
+
+
+@patch(
+    "src.users.application.services_handlers.UserServiceHandler.is_email_available",
+    new_callable=AsyncMock,
+)
+def test_email_available(mock_is_email_available, client):
+    mock_is_email_available.return_value = {
+        "state": 1,
+        "msg": "success",
+        "data": {"email": "ada@example.com", "available": True},
+    }
+
+    response = client.get("/email-available?email=ada@example.com")
+
+    assert response.status_code == 200
+    assert response.json()["data"]["available"] is True
+    mock_is_email_available.assert_awaited_once_with("ada@example.com")
+    assert client.get("/email-available?email=").status_code == 422
+
+
+def test_list_users_requires_authentication(anonymous_client):
+    assert anonymous_client.get("/users").status_code == 401
+    assert anonymous_client.get("/users?ids=1").status_code == 401
+    assert anonymous_client.post("/lookup", json={"user_ids": [1]}).status_code == 401
+
+
+def test_register_users_bulk_requires_authentication(anonymous_client):
+    response = anonymous_client.post(
+        "/register/bulk",
+        content=b'{"name": "Ada", "email": "ada@example.com", "password": "secret"}\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 401
+
+
+def test_export_users_requires_authentication(anonymous_client):
+    assert anonymous_client.get("/export?format=csv").status_code == 401
+
+
+def test_export_users_streams_for_authenticated_callers(client):
+    async def rows(export_format):
+        yield b"user_id,name,email\r\n"
+
+    with patch(
+        "src.users.application.services_handlers.UserExportServiceHandler.export_users",
+        side_effect=rows,
+    ):
+        response = client.get("/export?format=csv")
+
+    assert response.status_code == 200
+    assert response.text == "user_id,name,email\r\n"
+
+
+def test_search_users_requires_authentication(anonymous_client):
+    assert anonymous_client.get("/search?q=ada").status_code == 401